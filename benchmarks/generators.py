@@ -0,0 +1,156 @@
+"""
+Модуль генераторов синтетических данных для замеров производительности
+"""
+
+import random
+from pathlib import Path
+
+import orjson
+
+from dpss.feed import get_advisory_file_name
+from dpss.utils import prepare_output_dir
+
+SOURCE_NAME = 'bench'
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+BORDERS = (('gte', 'lt'), ('gt', 'lt'), ('gte', 'lte'), ('gt', 'lte'))
+
+
+def make_package_name(index: int) -> str:
+    """
+    Функция получения имени синтетического пакета
+
+    :param index: Номер пакета
+    :return: Имя пакета
+    """
+
+    return f'bench-package-{index}'
+
+
+def make_version(rng: random.Random) -> str:
+    """
+    Функция получения случайной версии вида major.minor.patch
+
+    :param rng: Генератор случайных чисел
+    :return: Версия
+    """
+
+    return f'{rng.randint(0, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 30)}'
+
+
+def make_advisory(index: int, packages: int, intervals: int, rng: random.Random) -> dict:
+    """
+    Функция построения уязвимости в формате пакета уязвимостей
+
+    :param index: Номер уязвимости
+    :param packages: Количество пакетов, из которых выбираются уязвимые
+    :param intervals: Количество уязвимых интервалов в уязвимости
+    :param rng: Генератор случайных чисел
+    :return: Данные уязвимости
+    """
+
+    vulner_id = f'BENCH-{index:07d}'
+    affects = []
+    for _ in range(intervals):
+        left, right = sorted(
+            (make_version(rng), make_version(rng)),
+            key=lambda version: tuple(map(int, version.split('.'))),
+        )
+        start_condition, end_condition = rng.choice(BORDERS)
+        affects.append({
+            'name': make_package_name(rng.randrange(packages)),
+            'version': {
+                'start_condition': start_condition,
+                'start_value': left,
+                'end_value': 'inf' if rng.random() < 0.05 else right,
+                'end_condition': end_condition,
+            },
+        })
+
+    severity = rng.choice(SEVERITIES)
+    return {
+        'identifier': vulner_id,
+        'published': f'20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+        'description': f'Synthetic advisory {vulner_id} ' + 'lorem ipsum ' * rng.randint(5, 50),
+        'source': [{'source_name': SOURCE_NAME, 'source_url': f'https://example.com/advisories/{vulner_id}'}],
+        'affects': affects,
+        'cwes': [f'CWE-{rng.randint(1, 1000)}'],
+        'ratings': [{
+            'score': round(rng.uniform(0, 10), 1),
+            'severity': severity,
+            'source_name': SOURCE_NAME,
+            'source_url': 'https://example.com',
+            'vector': 'AV:N/AC:L',
+            'version': 3.1,
+        }],
+        'references': [{'url': f'https://example.com/references/{vulner_id}'}],
+    }
+
+
+def generate_feed(
+        output_dir: str | Path,
+        advisories: int,
+        packages: int,
+        intervals: int = 2,
+        seed: int = 0,
+) -> Path:
+    """
+    Функция генерации директории с синтетическим пакетом уязвимостей
+
+    :param output_dir: Директория для записи файлов уязвимостей
+    :param advisories: Количество уязвимостей
+    :param packages: Количество различных пакетов
+    :param intervals: Количество уязвимых интервалов в одной уязвимости
+    :param seed: Зерно генератора, одинаковое зерно дает одинаковые данные
+    :return: Путь до директории пакета
+    """
+
+    output_dir = Path(output_dir)
+    prepare_output_dir(output_dir)
+    rng = random.Random(seed)
+    for index in range(advisories):
+        advisory = make_advisory(index, packages, intervals, rng)
+        file_name = get_advisory_file_name(SOURCE_NAME, advisory['identifier'])
+        (output_dir / file_name).write_bytes(orjson.dumps(advisory))
+
+    return output_dir
+
+
+def generate_sbom(
+        output_file: str | Path,
+        components: int,
+        packages: int,
+        seed: int = 0,
+) -> Path:
+    """
+    Функция генерации синтетического SBOM в формате CycloneDX
+
+    :param output_file: Путь до файла SBOM
+    :param components: Количество компонентов
+    :param packages: Количество различных пакетов, из которых выбираются компоненты
+    :param seed: Зерно генератора, одинаковое зерно дает одинаковые данные
+    :return: Путь до файла SBOM
+    """
+
+    output_file = Path(output_file)
+    prepare_output_dir(output_file.parent)
+    rng = random.Random(seed)
+    sbom_components = []
+    for index in rng.sample(range(packages), min(components, packages)):
+        name = make_package_name(index)
+        version = make_version(rng)
+        sbom_components.append({
+            'name': name,
+            'purl': f'pkg:pypi/{name}@{version}',
+            'type': 'library',
+            'version': version,
+        })
+
+    sbom = {
+        'bomFormat': 'CycloneDX',
+        'specVersion': '1.6',
+        'version': 1,
+        'components': sbom_components,
+    }
+    output_file.write_bytes(orjson.dumps(sbom))
+
+    return output_file
@@ -0,0 +1,247 @@
+"""
+Скрипт замеров производительности dpss на синтетических данных
+
+Пример запуска из корня репозитория:
+
+    python -m benchmarks.run --scale medium --output bench_results.json
+    python -m benchmarks.run --scale medium --compare bench_results.json
+"""
+
+import argparse
+import io
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import orjson
+
+from benchmarks.generators import generate_feed, generate_sbom
+from dpss.const import ReportTypes
+from dpss.reporter import Reporter
+from dpss.sbom import ComponentsAnalyzer, ParserSBOM
+from dpss.utils import check_is_vulnerable, parse_version
+from dpss.vulnerdb import VulnerabilityDB
+
+# Масштабы: количество уязвимостей, различных пакетов, интервалов в уязвимости и компонентов SBOM
+SCALES = {
+    'small': {'advisories': 500, 'packages': 200, 'intervals': 2, 'components': 50},
+    'medium': {'advisories': 5000, 'packages': 2000, 'intervals': 2, 'components': 300},
+    'large': {'advisories': 50000, 'packages': 10000, 'intervals': 3, 'components': 1000},
+}
+
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 0.2
+
+
+def measure(func: Callable[[], object], repeats: int, setup: Callable[[], None] | None = None) -> dict:
+    """
+    Функция замера времени выполнения
+
+    :param func: Замеряемая функция
+    :param repeats: Количество повторов
+    :param setup: Функция подготовки, выполняется перед каждым повтором вне замера
+    :return: Статистика времени в секундах
+    """
+
+    timings = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings),
+        'max': max(timings),
+        'repeats': repeats,
+    }
+
+
+def get_revision() -> str | None:
+    """
+    Функция получения ревизии репозитория для привязки результатов к версии кода
+
+    :return: Хэш коммита или None, если он недоступен
+    """
+
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True)
+    except OSError:
+        return None
+
+    return result.stdout.strip() or None
+
+
+def run_benchmarks(scale: str, repeats: int, seed: int, work_dir: Path, processes: int = 1) -> dict:
+    """
+    Функция выполнения всех замеров
+
+    :param scale: Название масштаба из SCALES
+    :param repeats: Количество повторов каждого замера
+    :param seed: Зерно генераторов данных
+    :param work_dir: Рабочая директория для синтетических данных
+    :param processes: Количество процессов для замера сопоставления в пуле (1 - без замера)
+    :return: Результаты замеров
+    """
+
+    params = SCALES[scale]
+    feed_dir = generate_feed(
+        work_dir / 'feed',
+        advisories=params['advisories'],
+        packages=params['packages'],
+        intervals=params['intervals'],
+        seed=seed,
+    )
+    sbom_path = generate_sbom(
+        work_dir / 'sbom.json',
+        components=params['components'],
+        packages=params['packages'],
+        seed=seed,
+    )
+    db_path = work_dir / 'vulner.db'
+    components = ParserSBOM(sbom_path).get_components()
+    results = {}
+
+    def remove_db() -> None:
+        db_path.unlink(missing_ok=True)
+
+    def build_db() -> None:
+        with VulnerabilityDB(db_path=db_path, package_folder=feed_dir):
+            pass
+
+    results['db_build'] = measure(build_db, repeats, setup=remove_db)
+    build_db()
+
+    with VulnerabilityDB(db_path=db_path, package_folder=feed_dir) as vulner_db:
+        results['get_package_vulnerabilities'] = measure(
+            lambda: [vulner_db.get_package_vulnerabilities(component.name) for component in components],
+            repeats,
+        )
+        pairs = [
+            (component.version, vulnerability[3])
+            for component in components
+            for vulnerability in vulner_db.get_package_vulnerabilities(component.name)
+        ]
+
+    # Кэш разбора версий сбрасывается, чтобы каждый повтор проверял интервалы с нуля
+    results['check_is_vulnerable'] = measure(
+        lambda: [check_is_vulnerable(version, interval) for version, interval in pairs],
+        repeats,
+        setup=parse_version.cache_clear,
+    )
+
+    analyzer = ComponentsAnalyzer(sbom_source=sbom_path, db_path=db_path, package_folder=feed_dir)
+    results['fast_check'] = measure(analyzer.fast_check, repeats)
+    if processes > 1:
+        sharded_analyzer = ComponentsAnalyzer(
+            sbom_source=sbom_path,
+            db_path=db_path,
+            package_folder=feed_dir,
+            processes=processes,
+        )
+        results['match_sharded'] = measure(sharded_analyzer.find_vulnerabilities_in_components, repeats)
+
+    detected_vulnerabilities = analyzer.find_vulnerabilities_in_components()
+    for report_type in ReportTypes:
+        binary = report_type in (ReportTypes.JSON, ReportTypes.JSONL)
+        results[f'report_{report_type}'] = measure(
+            lambda: Reporter(
+                detected_vulnerabilities=detected_vulnerabilities,
+                vulnerabilities_package_path=feed_dir,
+                report_type=report_type,
+                db_path=db_path,
+                output=io.BytesIO() if binary else io.StringIO(),
+            ).generate_report(),
+            repeats,
+        )
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': get_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': scale,
+        'seed': seed,
+        'processes': processes,
+        'params': params,
+        'counts': {
+            'components': len(components),
+            'checked_intervals': len(pairs),
+            'detected_vulnerabilities': len(detected_vulnerabilities),
+        },
+        'results': results,
+    }
+
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Функция сравнения результатов с базовыми по медианному времени
+
+    :param current: Текущие результаты
+    :param baseline: Базовые результаты
+    :param threshold: Допустимое относительное замедление
+    :return: Список описаний замедлившихся замеров
+    """
+
+    regressions = []
+    for name, stats in current['results'].items():
+        baseline_stats = baseline['results'].get(name)
+        if baseline_stats is None:
+            continue
+
+        ratio = stats['median'] / baseline_stats['median'] if baseline_stats['median'] else 1
+        if ratio > 1 + threshold:
+            regressions.append(
+                f'{name}: {baseline_stats["median"]:.6f}s -> {stats["median"]:.6f}s ({ratio:.2f}x)'
+            )
+
+    return regressions
+
+
+def main() -> int:
+    """Главная функция скрипта"""
+
+    parser = argparse.ArgumentParser(description='dpss benchmarks on synthetic advisories and SBOMs')
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, help='file for JSON results')
+    parser.add_argument('--compare', type=Path, help='baseline JSON results to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='allowed median slowdown')
+    parser.add_argument('--work-dir', type=Path, help='directory for generated data (temporary by default)')
+    parser.add_argument('--processes', type=int, default=1, help='also measure sharded matching with N processes')
+    args = parser.parse_args()
+
+    if args.work_dir is not None:
+        results = run_benchmarks(args.scale, args.repeats, args.seed, args.work_dir, args.processes)
+    else:
+        with tempfile.TemporaryDirectory(prefix='dpss-bench-') as work_dir:
+            results = run_benchmarks(args.scale, args.repeats, args.seed, Path(work_dir), args.processes)
+
+    for name, stats in results['results'].items():
+        print(f'{name:32} median {stats["median"]:.6f}s  min {stats["min"]:.6f}s')
+
+    if args.output is not None:
+        args.output.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+
+    if args.compare is not None:
+        regressions = compare_results(results, orjson.loads(args.compare.read_bytes()), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
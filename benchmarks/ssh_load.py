@@ -0,0 +1,294 @@
+"""
+Скрипт нагрузочных замеров получения проектов по SSH на локальном сервере
+
+Режим fetch замеряет Scanner: несколько соединений параллельно читают
+requirements.txt проектов. Режим scan запускает DependencySecurityScanner
+на синтетическом пакете уязвимостей (нужен cyclonedx-py для генерации SBOM).
+
+Пример запуска из корня репозитория:
+
+    python -m benchmarks.ssh_load --projects 200 --concurrency 8 --latency 0.02
+    python -m benchmarks.ssh_load --mode scan --projects 20 --output ssh_results.json
+"""
+
+import argparse
+import math
+import platform
+import queue
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import orjson
+
+from benchmarks.generators import generate_feed
+from benchmarks.run import get_revision
+from benchmarks.ssh_server import FakeSSHServer, make_filesystem
+from dpss.dpss import DependencySecurityScanner
+from dpss.metrics import Metrics
+from dpss.models import ProjectConfigSchema
+from dpss.scanner import Scanner
+from dpss.tracing import Span, Tracer
+from dpss.vulnerdb import VulnerabilityDB
+
+TRACED_STAGES = ('connect', 'fetch', 'sbom', 'parse', 'match', 'report')
+
+
+def make_latency_stats(timings: list[float]) -> dict:
+    """
+    Функция расчета перцентилей длительности по ближайшему рангу
+
+    :param timings: Длительности в секундах
+    :return: Статистика длительности
+    """
+
+    if not timings:
+        return {'count': 0}
+
+    timings = sorted(timings)
+
+    def percentile(value: float) -> float:
+        return timings[max(math.ceil(value / 100 * len(timings)) - 1, 0)]
+
+    return {
+        'count': len(timings),
+        'p50': percentile(50),
+        'p90': percentile(90),
+        'p99': percentile(99),
+        'max': timings[-1],
+    }
+
+
+def split_projects(projects: list[ProjectConfigSchema], parts: int) -> list[list[ProjectConfigSchema]]:
+    """
+    Функция разбиения проектов на части для параллельных сканирований
+
+    :param projects: Конфигурации проектов
+    :param parts: Количество частей
+    :return: Непустые части списка проектов
+    """
+
+    return [chunk for chunk in (projects[index::parts] for index in range(parts)) if chunk]
+
+
+def run_fetch(
+        server: FakeSSHServer,
+        projects: list[ProjectConfigSchema],
+        concurrency: int,
+        data_dir: Path,
+        metrics: Metrics,
+) -> dict:
+    """
+    Функция замера получения файлов проектов через Scanner
+
+    Каждый поток открывает собственное соединение и берет проекты из общей очереди.
+
+    :param server: Запущенный SSH сервер
+    :param projects: Конфигурации проектов
+    :param concurrency: Количество параллельных соединений
+    :param data_dir: Директория для сохранения файлов проектов
+    :param metrics: Набор метрик сканера
+    :return: Длительности получения файлов по проектам
+    """
+
+    scan_config = server.make_scan_config(projects)
+    pending = queue.SimpleQueue()
+    for project in projects:
+        pending.put(project)
+
+    timings = []
+    errors = []
+    lock = threading.Lock()
+
+    def work() -> None:
+        scanner = Scanner(data_dir=data_dir, scan_config=scan_config, metrics=metrics)
+        try:
+            while True:
+                try:
+                    project = pending.get_nowait()
+                except queue.Empty:
+                    return
+
+                started = time.perf_counter()
+                local_project_dir = scanner.save_requirements(project)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    timings.append(elapsed)
+                    if local_project_dir is None:
+                        errors.append(project.name)
+        finally:
+            scanner.close_connection()
+
+    threads = [threading.Thread(target=work) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {'fetch': make_latency_stats(timings), 'errors': errors}
+
+
+def run_scan(
+        server: FakeSSHServer,
+        projects: list[ProjectConfigSchema],
+        concurrency: int,
+        work_dir: Path,
+        metrics: Metrics,
+        packages: int,
+        seed: int,
+) -> dict:
+    """
+    Функция замера полного сканирования через DependencySecurityScanner
+
+    Проекты делятся между concurrency одновременными сканированиями с собственными соединениями.
+
+    :param server: Запущенный SSH сервер
+    :param projects: Конфигурации проектов
+    :param concurrency: Количество одновременных сканирований
+    :param work_dir: Рабочая директория для пакета уязвимостей, БД и файлов проектов
+    :param metrics: Набор метрик сканирований
+    :param packages: Количество различных пакетов в пакете уязвимостей
+    :param seed: Зерно генератора пакета уязвимостей
+    :return: Перцентили длительности операций сканирования
+    """
+
+    feed_dir = generate_feed(work_dir / 'feed', advisories=packages * 2, packages=packages, seed=seed)
+    db_path = work_dir / 'vulner.db'
+    durations = {stage: [] for stage in TRACED_STAGES}
+    lock = threading.Lock()
+
+    def collect(span: Span) -> None:
+        if span.name in durations:
+            with lock:
+                durations[span.name].append(span.duration)
+
+    tracer = Tracer(hooks=[collect])
+    errors = []
+
+    def work(index: int, chunk: list[ProjectConfigSchema]) -> None:
+        try:
+            DependencySecurityScanner(
+                scan_config=server.make_scan_config(chunk, name=f'bench-{index}'),
+                db_path=db_path,
+                data_dir=work_dir / f'data-{index}',
+                vulners_package_dir=feed_dir,
+                metrics=metrics,
+                tracer=tracer,
+            ).run()
+        except Exception as error:
+            with lock:
+                errors.append(repr(error))
+
+    # БД строится заранее, чтобы сканирования не собирали ее одновременно
+    with VulnerabilityDB(db_path=db_path, package_folder=feed_dir, metrics=metrics):
+        pass
+
+    threads = [
+        threading.Thread(target=work, args=(index, chunk))
+        for index, chunk in enumerate(split_projects(projects, concurrency))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {**{stage: make_latency_stats(timings) for stage, timings in durations.items()}, 'errors': errors}
+
+
+def run_load(args: argparse.Namespace, work_dir: Path) -> dict:
+    """
+    Функция запуска сервера и замера в выбранном режиме
+
+    :param args: Аргументы командной строки
+    :param work_dir: Рабочая директория
+    :return: Результаты замера
+    """
+
+    files, projects = make_filesystem(args.projects, args.components, args.packages, seed=args.seed)
+    metrics = Metrics()
+    with FakeSSHServer(files, latency=args.latency, bandwidth=args.bandwidth) as server:
+        started = time.perf_counter()
+        if args.mode == 'fetch':
+            results = run_fetch(server, projects, args.concurrency, work_dir / 'data', metrics)
+        else:
+            results = run_scan(server, projects, args.concurrency, work_dir, metrics, args.packages, args.seed)
+        elapsed = time.perf_counter() - started
+        commands = server.commands
+        bytes_sent = server.bytes_sent
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': get_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'mode': args.mode,
+        'params': {
+            'projects': args.projects,
+            'components': args.components,
+            'concurrency': args.concurrency,
+            'latency': args.latency,
+            'bandwidth': args.bandwidth,
+            'seed': args.seed,
+        },
+        'elapsed': elapsed,
+        'throughput': {
+            'projects_per_second': args.projects / elapsed,
+            'bytes_per_second': bytes_sent / elapsed,
+        },
+        'round_trips': {
+            'client': metrics.get_counter('ssh_round_trips'),
+            'server': commands,
+            'connections': metrics.get_counter('ssh_connections'),
+        },
+        'results': results,
+        'metrics': metrics.to_dict(),
+    }
+
+
+def main() -> int:
+    """Главная функция скрипта"""
+
+    parser = argparse.ArgumentParser(description='dpss SSH fetch load test on a local paramiko server')
+    parser.add_argument('--mode', choices=('fetch', 'scan'), default='fetch')
+    parser.add_argument('--projects', type=int, default=100)
+    parser.add_argument('--components', type=int, default=30, help='dependencies per project')
+    parser.add_argument('--packages', type=int, default=1000, help='distinct package names')
+    parser.add_argument('--concurrency', type=int, default=4, help='parallel connections or scans')
+    parser.add_argument('--latency', type=float, default=0.0, help='server delay per command in seconds')
+    parser.add_argument('--bandwidth', type=int, help='channel bandwidth in bytes per second')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, help='file for JSON results')
+    parser.add_argument('--work-dir', type=Path, help='directory for generated data (temporary by default)')
+    args = parser.parse_args()
+
+    if args.work_dir is not None:
+        results = run_load(args, args.work_dir)
+    else:
+        with tempfile.TemporaryDirectory(prefix='dpss-ssh-') as work_dir:
+            results = run_load(args, Path(work_dir))
+
+    print(f'elapsed {results["elapsed"]:.3f}s  '
+          f'{results["throughput"]["projects_per_second"]:.1f} projects/s  '
+          f'{results["throughput"]["bytes_per_second"] / 1024:.1f} KiB/s')
+    print(f'round trips {results["round_trips"]["client"]}  connections {results["round_trips"]["connections"]}')
+    for name, stats in results['results'].items():
+        if name == 'errors' or not stats['count']:
+            continue
+        print(f'{name:10} n={stats["count"]:<6} p50 {stats["p50"]:.4f}s  p90 {stats["p90"]:.4f}s  '
+              f'p99 {stats["p99"]:.4f}s  max {stats["max"]:.4f}s')
+
+    if args.output is not None:
+        args.output.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+
+    if results['results']['errors']:
+        print(f'ERRORS {results["results"]["errors"][:10]}', file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Модуль локального SSH сервера на paramiko для нагрузочных замеров сканера
+
+Сервер обслуживает команды `cat <путь>` из словаря файлов в памяти и имитирует
+задержку ответа и ограниченную пропускную способность канала.
+"""
+
+import logging
+import random
+import shlex
+import socket
+import threading
+import time
+
+import paramiko
+
+from benchmarks.generators import make_package_name, make_version
+from dpss.const import REQUIREMENTS_FILE
+from dpss.models import ProjectConfigSchema, ScanConfigSchema
+
+SERVER_HOST = '127.0.0.1'
+SERVER_USER = 'bench'
+SERVER_SECRET = 'bench'
+PROJECTS_ROOT = '/srv/projects'
+CHUNK_SIZE = 16384
+HOST_KEY_BITS = 2048
+LOG_CHANNEL = 'benchmarks.ssh_server'
+
+# Разрывы соединений клиентами при остановке сервера не считаются ошибками
+logging.getLogger(LOG_CHANNEL).addHandler(logging.NullHandler())
+
+
+def make_filesystem(
+        projects: int,
+        components: int,
+        packages: int,
+        seed: int = 0,
+) -> tuple[dict[str, bytes], list[ProjectConfigSchema]]:
+    """
+    Функция построения файловой системы с requirements.txt синтетических проектов
+
+    Имена пакетов совпадают с пакетом уязвимостей из generate_feed, поэтому
+    проекты можно сопоставлять с синтетической БД.
+
+    :param projects: Количество проектов
+    :param components: Количество зависимостей в проекте
+    :param packages: Количество различных пакетов, из которых выбираются зависимости
+    :param seed: Зерно генератора, одинаковое зерно дает одинаковые данные
+    :return: Словарь содержимого файлов по пути и конфигурации проектов
+    """
+
+    rng = random.Random(seed)
+    files = {}
+    project_configs = []
+    for index in range(projects):
+        project_dir = f'{PROJECTS_ROOT}/project-{index}'
+        lines = (
+            f'{make_package_name(package)}=={make_version(rng)}'
+            for package in rng.sample(range(packages), min(components, packages))
+        )
+        files[f'{project_dir}/{REQUIREMENTS_FILE}'] = ('\n'.join(lines) + '\n').encode()
+        project_configs.append(ProjectConfigSchema(name=f'project-{index}', dir=project_dir))
+
+    return files, project_configs
+
+
+class FakeServerInterface(paramiko.ServerInterface):
+    """Класс обработчика запросов SSH сервера: парольная аутентификация и exec каналы"""
+
+    def __init__(self, server: 'FakeSSHServer') -> None:
+        """
+        Инициализация обработчика
+
+        :param server: SSH сервер с файлами и параметрами канала
+        """
+
+        self.server = server
+
+    def get_allowed_auths(self, username: str) -> str:
+        """Метод получения поддерживаемых способов аутентификации"""
+
+        return 'password'
+
+    def check_auth_password(self, username: str, password: str) -> int:
+        """Метод проверки пароля"""
+
+        if username == self.server.user and password == self.server.secret:
+            return paramiko.AUTH_SUCCESSFUL
+
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind: str, chanid: int) -> int:
+        """Метод проверки запроса на открытие канала"""
+
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel: paramiko.Channel, command: bytes) -> bool:
+        """Метод запуска команды в отдельном потоке"""
+
+        threading.Thread(
+            target=self.server.execute,
+            args=(channel, command.decode()),
+            daemon=True,
+        ).start()
+
+        return True
+
+
+class FakeSSHServer:
+    """
+    Класс локального SSH сервера с файлами в памяти
+
+    Используется как контекстный менеджер, порт выбирается свободный
+    и доступен в атрибуте port после запуска.
+    """
+
+    def __init__(
+            self,
+            files: dict[str, bytes],
+            latency: float = 0.0,
+            bandwidth: int | None = None,
+            user: str = SERVER_USER,
+            secret: str = SERVER_SECRET,
+            host: str = SERVER_HOST,
+            port: int = 0,
+    ) -> None:
+        """
+        Инициализация сервера
+
+        :param files: Содержимое файлов по абсолютному пути
+        :param latency: Задержка ответа на каждую команду в секундах
+        :param bandwidth: Пропускная способность канала в байтах в секунду (по умолчанию без ограничения)
+        :param user: Имя пользователя
+        :param secret: Пароль пользователя
+        :param host: Адрес для прослушивания
+        :param port: Порт для прослушивания (по умолчанию любой свободный)
+        """
+
+        self.files = files
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.user = user
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.host_key = None
+        self.socket = None
+        self.thread = None
+        self.transports = []
+        self.lock = threading.Lock()
+        self.is_stopped = threading.Event()
+        self.commands = 0
+        self.bytes_sent = 0
+
+    def __enter__(self) -> 'FakeSSHServer':
+        """Инициализация контекста, запуск сервера"""
+
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Выход из контекста, остановка сервера"""
+
+        self.stop()
+
+    def start(self) -> None:
+        """Метод запуска сервера в фоновом потоке"""
+
+        self.host_key = paramiko.RSAKey.generate(HOST_KEY_BITS)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(128)
+        self.socket.settimeout(0.2)
+        self.port = self.socket.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve, name='fake-ssh-server', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Метод остановки сервера и закрытия соединений"""
+
+        self.is_stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.socket is not None:
+            self.socket.close()
+        with self.lock:
+            for transport in self.transports:
+                transport.close()
+            self.transports.clear()
+
+    def serve(self) -> None:
+        """Метод приема входящих соединений"""
+
+        while not self.is_stopped.is_set():
+            try:
+                client, _ = self.socket.accept()
+            except socket.timeout:
+                continue
+
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transport = paramiko.Transport(client)
+            transport.set_log_channel(LOG_CHANNEL)
+            transport.add_server_key(self.host_key)
+            with self.lock:
+                self.transports.append(transport)
+            transport.start_server(server=FakeServerInterface(self))
+
+    def execute(self, channel: paramiko.Channel, command: str) -> None:
+        """
+        Метод выполнения команды: поддерживается только чтение файла через cat
+
+        Канал закрывается клиентом: закрытие со стороны сервера может обогнать
+        подтверждение exec запроса, которое paramiko отправляет после запуска потока.
+
+        :param channel: Канал команды
+        :param command: Текст команды
+        """
+
+        with self.lock:
+            self.commands += 1
+
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+
+            args = shlex.split(command)
+            if len(args) != 2 or args[0] != 'cat':
+                channel.sendall_stderr(f'{args[0] if args else command}: command not found\n'.encode())
+                channel.send_exit_status(127)
+                return
+
+            data = self.files.get(args[1])
+            if data is None:
+                channel.sendall_stderr(f'cat: {args[1]}: No such file or directory\n'.encode())
+                channel.send_exit_status(1)
+                return
+
+            self.send(channel, data)
+            channel.send_exit_status(0)
+        finally:
+            channel.shutdown_write()
+
+    def send(self, channel: paramiko.Channel, data: bytes) -> None:
+        """
+        Метод отправки данных с ограничением пропускной способности
+
+        :param channel: Канал команды
+        :param data: Данные
+        """
+
+        for offset in range(0, len(data), CHUNK_SIZE):
+            chunk = data[offset:offset + CHUNK_SIZE]
+            channel.sendall(chunk)
+            if self.bandwidth:
+                time.sleep(len(chunk) / self.bandwidth)
+
+        with self.lock:
+            self.bytes_sent += len(data)
+
+    def make_scan_config(self, projects: list[ProjectConfigSchema], name: str = 'bench') -> ScanConfigSchema:
+        """
+        Метод создания конфигурации сканирования сервера
+
+        :param projects: Конфигурации проектов
+        :param name: Имя сканирования
+        :return: Конфигурация сканирования
+        """
+
+        return ScanConfigSchema(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            secret=self.secret,
+            name=name,
+            projects=projects,
+        )
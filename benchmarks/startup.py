@@ -0,0 +1,107 @@
+"""
+Скрипт замера времени холодного старта консольной утилиты dpss
+
+Каждый замер запускает отдельный интерпретатор. Скрипт завершается с ошибкой,
+если медианное время превышает бюджет или при локальном анализе загружаются
+модули SSH стека.
+
+Пример запуска из корня репозитория:
+
+    python -m benchmarks.startup --budget 0.5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_REPEATS = 10
+DEFAULT_BUDGET = 0.5
+
+# Модули, которые не должны загружаться при анализе локального SBOM
+FORBIDDEN_MODULES = ('paramiko', 'cryptography', 'asyncio', 'dpss.scanner', 'dpss.dpss')
+
+COMMANDS = {
+    'import': [sys.executable, '-c', 'import dpss.cli'],
+    'help': [sys.executable, '-m', 'dpss.cli', '--help'],
+    'analysis_imports': [
+        sys.executable,
+        '-c',
+        'import dpss.cli, dpss.sbom, dpss.reporter, dpss.vulnerdb',
+    ],
+}
+
+CHECK_MODULES_CODE = (
+    'import sys, dpss.cli, dpss.sbom, dpss.reporter, dpss.vulnerdb\n'
+    'print(",".join(name for name in {modules!r} if name in sys.modules))'
+)
+
+
+def measure_command(command: list[str], repeats: int) -> dict:
+    """
+    Функция замера времени выполнения команды в новом процессе
+
+    :param command: Команда
+    :param repeats: Количество повторов
+    :return: Статистика времени в секундах
+    """
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True)
+        timings.append(time.perf_counter() - started)
+
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+        'repeats': repeats,
+    }
+
+
+def find_loaded_forbidden_modules() -> list[str]:
+    """
+    Функция поиска тяжелых модулей, загруженных модулями локального анализа
+
+    :return: Список загруженных запрещенных модулей
+    """
+
+    result = subprocess.run(
+        [sys.executable, '-c', CHECK_MODULES_CODE.format(modules=FORBIDDEN_MODULES)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    return [name for name in result.stdout.strip().split(',') if name]
+
+
+def main() -> int:
+    """Главная функция скрипта"""
+
+    parser = argparse.ArgumentParser(description='dpss CLI cold start benchmark')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='allowed median time in seconds')
+    args = parser.parse_args()
+
+    is_failed = False
+    for name, command in COMMANDS.items():
+        stats = measure_command(command, args.repeats)
+        status = 'ok'
+        if stats['median'] > args.budget:
+            status = 'OVER BUDGET'
+            is_failed = True
+        print(f'{name:20} median {stats["median"]:.4f}s  min {stats["min"]:.4f}s  {status}')
+
+    loaded_modules = find_loaded_forbidden_modules()
+    if loaded_modules:
+        print(f'FORBIDDEN MODULES LOADED {", ".join(loaded_modules)}', file=sys.stderr)
+        is_failed = True
+
+    return 1 if is_failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Модуль асинхронного API сканирования
+"""
+
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+from dpss.const import SBOM_WORKERS, SSH_OPERATIONS
+from dpss.dpss import DependencySecurityScanner
+from dpss.metrics import Metrics
+from dpss.models import (
+    ScanConfigSchema,
+    ProjectConfigSchema,
+    SoftComponentSchema,
+    ProjectFindingsSchema,
+)
+from dpss.records import make_detected_vulnerabilities, make_project_findings, merge_found_vulnerabilities
+from dpss.reporter import Reporter
+from dpss.sbom import GeneratorSBOM, ParserSBOM
+from dpss.scanner import Scanner
+from dpss.utils import delete_dir
+from dpss.vulnerdb import VulnerabilityDB
+
+
+class AsyncScanLimits:
+    """Класс ограничений параллелизма, общих для всех сканирований в цикле событий"""
+
+    def __init__(
+            self,
+            ssh_operations: int = SSH_OPERATIONS,
+            sbom_processes: int = SBOM_WORKERS,
+    ) -> None:
+        """
+        Инициализация ограничений
+
+        :param ssh_operations: Максимальное количество одновременных SSH операций: установок соединения
+            и команд; количество открытых соединений не ограничивается, у каждого сканирования оно свое
+        :param sbom_processes: Максимальное количество одновременных процессов генерации SBOM
+        """
+
+        self.ssh = asyncio.Semaphore(ssh_operations)
+        self.sbom = asyncio.Semaphore(sbom_processes)
+
+
+class AsyncVulnerabilityDB:
+    """Класс асинхронного доступа к БД уязвимостей"""
+
+    def __init__(
+            self,
+            db_path: Path | str,
+            package_folder: str | Path = None,
+            cache_path: Path | str | None = None,
+            metrics: Metrics | None = None,
+    ) -> None:
+        """
+        Инициализация класса
+
+        :param db_path: Путь до файла с БД
+        :param package_folder: Путь до директории с БД
+        :param cache_path: Путь до файла с кэшем результатов сопоставления (по умолчанию кэш отключен)
+        :param metrics: Набор метрик для учета запросов к БД
+        """
+
+        self.vulner_db = VulnerabilityDB(
+            db_path=db_path,
+            package_folder=package_folder,
+            cache_path=cache_path,
+            metrics=metrics,
+        )
+        # Соединение sqlite привязано к потоку, поэтому все запросы выполняются в одном выделенном потоке
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dpss-db')
+
+    async def __aenter__(self):
+        """Инициализация контекста"""
+
+        await self._run(self.vulner_db.__enter__)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Финализация контекста"""
+
+        try:
+            await self._run(self.vulner_db.__exit__, exc_type, exc_val, exc_tb)
+        finally:
+            self.executor.shutdown(wait=False)
+
+    async def get_matched_vulnerabilities(self, pkg_name: str, pkg_version: str) -> list:
+        """
+        Метод получения уязвимостей, в интервал которых попадает версия пакета
+
+        :param pkg_name: Имя пакета
+        :param pkg_version: Версия пакета
+        :return: Список найденных уязвимостей
+        """
+
+        return await self._run(self.vulner_db.get_matched_vulnerabilities, pkg_name, pkg_version)
+
+    async def match_components(self, components: list[SoftComponentSchema]) -> dict:
+        """
+        Метод сопоставления списка компонентов с БД за один переход в поток БД
+
+        :param components: Список компонентов
+        :return: Найденные уязвимости, сгруппированные по идентификатору
+        """
+
+        return await self._run(DependencySecurityScanner.match_components, components, self.vulner_db)
+
+    async def _run(self, func: Callable, *args):
+        """
+        Метод выполнения функции в потоке БД
+
+        :param func: Функция
+        :param args: Аргументы функции
+        :return: Результат функции
+        """
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+
+class AsyncDependencySecurityScanner:
+    """Класс асинхронной работы с анализатором компонентов"""
+
+    def __init__(
+            self,
+            scan_config: ScanConfigSchema,
+            db_path: str | Path,
+            data_dir: Path,
+            vulners_package_dir: Path,
+            cache_path: str | Path | None = None,
+            limits: AsyncScanLimits | None = None,
+            on_findings: Callable[[ProjectFindingsSchema], None] | None = None,
+            metrics: Metrics | None = None,
+    ) -> None:
+        """
+        Инициализация объекта класса
+
+        :param scan_config: Конфигурация сканирования
+        :param db_path: Путь до файла с БД
+        :param data_dir: Директория для сохранения данных проектов
+        :param vulners_package_dir: Директория с пакетом уязвимостей
+        :param cache_path: Путь до файла с кэшем результатов сопоставления (по умолчанию кэш отключен)
+        :param limits: Ограничения параллелизма, можно передать один объект нескольким сканированиям
+        :param on_findings: Обработчик, вызываемый с уязвимостями каждого проекта сразу после их нахождения
+        :param metrics: Набор метрик сканирования (по умолчанию создается новый и доступен в metrics)
+        """
+
+        self.config = scan_config
+        self.metrics = metrics or Metrics()
+        self.data_dir = data_dir
+        self.db_path = db_path
+        self.vulners_package_dir = vulners_package_dir
+        self.cache_path = cache_path
+        self.limits = limits
+        self.on_findings = on_findings
+        self.scanner = None
+        self.scan_dir = None
+        self.found_vulnerabilities = {}
+        self.report_type = scan_config.report_type
+        self.report = None
+
+    async def run(self) -> None:
+        """Метод запуска сканирования"""
+
+        async for project, found_vulnerabilities in self._iter_project_vulnerabilities():
+            merge_found_vulnerabilities(self.found_vulnerabilities, found_vulnerabilities)
+            if self.on_findings is not None:
+                self.on_findings(make_project_findings(project.name, found_vulnerabilities, host=self.config.host))
+
+        await self.make_report()
+
+    async def iter_findings(self) -> AsyncIterator[ProjectFindingsSchema]:
+        """
+        Метод потокового получения уязвимостей по проектам
+
+        :return: Асинхронный генератор уязвимостей проектов в порядке готовности
+        """
+
+        async for project, found_vulnerabilities in self._iter_project_vulnerabilities():
+            findings = make_project_findings(project.name, found_vulnerabilities, host=self.config.host)
+            if self.on_findings is not None:
+                self.on_findings(findings)
+
+            yield findings
+
+    async def _iter_project_vulnerabilities(self) -> AsyncIterator[tuple[ProjectConfigSchema, dict]]:
+        """
+        Метод параллельного сканирования проектов
+
+        Файлы проектов сохраняются в отдельную директорию сканирования, поэтому одновременные
+        сканирования хостов с одноименными проектами не перезаписывают файлы друг друга.
+
+        :return: Асинхронный генератор проектов и найденных в них уязвимостей, сгруппированных по идентификатору
+        """
+
+        if self.limits is None:
+            self.limits = AsyncScanLimits()
+
+        self.scan_dir = self.data_dir / 'scans' / uuid.uuid4().hex
+        await self.connect()
+        try:
+            async with AsyncVulnerabilityDB(
+                    db_path=self.db_path,
+                    package_folder=self.vulners_package_dir,
+                    cache_path=self.cache_path,
+                    metrics=self.metrics,
+            ) as vulner_db:
+                tasks = [
+                    asyncio.create_task(self.scan_project(project, vulner_db))
+                    for project in self.config.projects
+                ]
+                try:
+                    for task in asyncio.as_completed(tasks):
+                        project_vulnerabilities = await task
+                        if project_vulnerabilities is not None:
+                            yield project_vulnerabilities
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await self.close_connection()
+            await asyncio.to_thread(delete_dir, self.scan_dir)
+
+    async def connect(self) -> None:
+        """Метод установки соединения со сканируемым хостом"""
+
+        async with self.limits.ssh:
+            self.scanner = await asyncio.to_thread(
+                Scanner,
+                scan_config=self.config,
+                data_dir=self.data_dir,
+                metrics=self.metrics,
+            )
+
+    async def close_connection(self) -> None:
+        """Метод закрытия соединения со сканируемым хостом"""
+
+        if self.scanner is not None:
+            await asyncio.to_thread(self.scanner.close_connection)
+            self.scanner = None
+
+    async def scan_project(
+            self,
+            project: ProjectConfigSchema,
+            vulner_db: AsyncVulnerabilityDB,
+    ) -> tuple[ProjectConfigSchema, dict] | None:
+        """
+        Метод сканирования одного проекта
+
+        :param project: Конфигурация проекта
+        :param vulner_db: Открытое подключение к БД уязвимостей
+        :return: Проект и найденные уязвимости или None, если файлы проекта получить не удалось
+        """
+
+        async with self.limits.ssh:
+            local_project_dir = await asyncio.to_thread(
+                self.scanner.save_requirements,
+                project,
+                self.scan_dir / project.type / project.name,
+            )
+
+        if local_project_dir is None:
+            return None
+
+        components = await self.get_components(local_project_dir)
+        return project, await vulner_db.match_components(components)
+
+    async def get_components(self, local_project_dir: Path) -> list[SoftComponentSchema]:
+        """
+        Метод генерации SBOM проекта и получения его компонентов
+
+        :param local_project_dir: Локальная директория проекта
+        :return: Список компонентов проекта
+        """
+
+        sbom_generator = GeneratorSBOM(
+            source_path=local_project_dir,
+            output_path=local_project_dir,
+            metrics=self.metrics,
+        )
+
+        async with self.limits.sbom:
+            await sbom_generator.generate_sbom_async(is_need_dump_file=True)
+
+        return ParserSBOM(local_project_dir / 'sbom.json').get_components()
+
+    async def make_report(self) -> None:
+        """Метод составления отчета о результатах сканирования"""
+
+        reporter = Reporter(
+            detected_vulnerabilities=make_detected_vulnerabilities(self.found_vulnerabilities),
+            vulnerabilities_package_path=self.vulners_package_dir,
+            report_type=self.report_type,
+            db_path=self.db_path,
+            metrics=self.metrics,
+        )
+
+        self.report = await asyncio.to_thread(reporter.generate_report)
@@ -0,0 +1,110 @@
+"""
+Модуль постоянного кэша результатов сопоставления пакетов с уязвимостями
+"""
+
+import sqlite3
+from pathlib import Path
+
+import orjson
+
+from dpss.utils import make_path_from_str, prepare_output_dir
+
+
+class MatchCache:
+    """
+    Класс кэша вердиктов по паре (пакет, версия) для конкретного поколения БД
+
+    Имя пакета сохраняется в том виде, в котором по нему выполняется поиск в БД,
+    поэтому разные написания имени делят запись только если БД их не различает.
+    """
+
+    CREATE_TABLE_MATCHES = '''
+    CREATE TABLE IF NOT EXISTS matches (
+        name TEXT NOT NULL,
+        version TEXT NOT NULL,
+        generation TEXT NOT NULL,
+        vulnerabilities BLOB NOT NULL,
+        PRIMARY KEY (name, version)
+    );
+    '''
+
+    DELETE_STALE_MATCHES = 'DELETE FROM matches WHERE generation != ?;'
+
+    SELECT_MATCH = '''
+    SELECT vulnerabilities
+    FROM matches
+    WHERE name = ? AND version = ? AND generation = ?;
+    '''
+
+    INSERT_MATCH = '''
+    INSERT OR REPLACE INTO matches (name, version, generation, vulnerabilities)
+    VALUES (?, ?, ?, ?);
+    '''
+
+    def __init__(self, cache_path: Path | str, generation: str) -> None:
+        """
+        Инициализация класса
+
+        :param cache_path: Путь до файла с кэшем
+        :param generation: Поколение БД уязвимостей, для которого действительны записи кэша
+        """
+
+        self.cache_path = make_path_from_str(cache_path)
+        self.generation = generation
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        """Инициализация контекста"""
+
+        prepare_output_dir(self.cache_path.parent)
+        self.connection = sqlite3.connect(self.cache_path)
+        cursor = self.connection.cursor()
+        cursor.execute(self.CREATE_TABLE_MATCHES)
+        # Записи, посчитанные для прошлых поколений БД, больше недействительны
+        cursor.execute(self.DELETE_STALE_MATCHES, (self.generation,))
+        self.connection.commit()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Финализация контекста"""
+
+        self.connection.commit()
+        self.connection.close()
+
+    def get(self, lookup_name: str, pkg_version: str) -> list[tuple] | None:
+        """
+        Метод получения сохраненного вердикта
+
+        :param lookup_name: Имя пакета, по которому выполняется поиск в БД
+        :param pkg_version: Версия пакета
+        :return: Список строк совпавших уязвимостей или None, если вердикта нет в кэше
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            self.SELECT_MATCH,
+            (lookup_name, pkg_version, self.generation),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return [tuple(vulner) for vulner in orjson.loads(row[0])]
+
+    def put(self, lookup_name: str, pkg_version: str, vulnerabilities: list[tuple]) -> None:
+        """
+        Метод сохранения вердикта
+
+        :param lookup_name: Имя пакета, по которому выполняется поиск в БД
+        :param pkg_version: Версия пакета
+        :param vulnerabilities: Список строк совпавших уязвимостей
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            self.INSERT_MATCH,
+            (lookup_name, pkg_version, self.generation, orjson.dumps(vulnerabilities)),
+        )
@@ -0,0 +1,113 @@
+"""
+Модуль консольной утилиты для анализа локальных SBOM и requirements.txt
+
+Модули анализа загружаются после разбора аргументов, поэтому справка и ошибки
+аргументов выводятся без загрузки БД, отчетов и SSH стека.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from dpss.const import REQUIREMENTS_FILE, ReportTypes
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """
+    Функция создания парсера аргументов командной строки
+
+    :return: Парсер аргументов
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='dpss',
+        description='Поиск уязвимых зависимостей в локальном SBOM или requirements.txt',
+    )
+    parser.add_argument(
+        'source',
+        type=Path,
+        help=f'путь до SBOM файла в формате CycloneDX, файла {REQUIREMENTS_FILE} или директории с ним',
+    )
+    parser.add_argument('--db', type=Path, required=True, help='путь до файла с БД уязвимостей')
+    parser.add_argument(
+        '--feed',
+        type=Path,
+        help=(
+            'путь до пакета уязвимостей: используется при сборке новой БД (по умолчанию директория БД) '
+            'и обязателен для пересборки БД устаревшей схемы'
+        ),
+    )
+    parser.add_argument('--cache', type=Path, help='путь до файла с кэшем результатов сопоставления')
+    parser.add_argument('--type', choices=list(ReportTypes), default=ReportTypes.JSON, help='тип отчета')
+    parser.add_argument('--output', type=Path, help='файл для записи отчета (по умолчанию stdout)')
+    parser.add_argument('--processes', type=int, default=1, help='количество процессов сопоставления')
+
+    return parser
+
+
+def load_sbom(source: Path) -> Path | dict:
+    """
+    Функция получения SBOM источника
+
+    :param source: Путь до SBOM файла, файла requirements.txt или директории с ним
+    :return: Путь до SBOM файла или SBOM, сгенерированный из requirements.txt
+    """
+
+    if source.is_dir():
+        source = source / REQUIREMENTS_FILE
+    if source.name != REQUIREMENTS_FILE:
+        return source
+
+    from dpss.sbom import GeneratorSBOM
+
+    return GeneratorSBOM(source_path=source.parent).generate_sbom()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Главная функция утилиты
+
+    :param argv: Аргументы командной строки (по умолчанию sys.argv)
+    :return: Код завершения
+    """
+
+    parser = make_parser()
+    args = parser.parse_args(argv)
+
+    from dpss.reporter import Reporter
+    from dpss.sbom import ComponentsAnalyzer
+    from dpss.vulnerdb import OutdatedSchemaError
+
+    analyzer = ComponentsAnalyzer(
+        sbom_source=load_sbom(args.source),
+        db_path=args.db,
+        package_folder=args.feed,
+        cache_path=args.cache,
+        processes=args.processes,
+    )
+    try:
+        detected_vulnerabilities = analyzer.find_vulnerabilities_in_components()
+    except OutdatedSchemaError as error:
+        # Заполненная БД не заменяется пустой, поэтому без пакета уязвимостей анализ невозможен
+        if args.feed is None:
+            parser.error(f'{error}: укажите пакет уязвимостей в --feed')
+        parser.error(f'{error}: пакет уязвимостей {args.feed} не найден или не содержит уязвимостей')
+
+    output = args.output
+    if output is None:
+        binary = args.type in (ReportTypes.JSON, ReportTypes.JSONL)
+        output = sys.stdout.buffer if binary else sys.stdout
+
+    Reporter(
+        detected_vulnerabilities=detected_vulnerabilities,
+        vulnerabilities_package_path=args.feed,
+        report_type=args.type,
+        db_path=args.db,
+        output=output,
+    ).generate_report()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
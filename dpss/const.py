@@ -2,7 +2,33 @@
 Модуль с константными значениями
 """
 
+import enum
+
 REQUIREMENTS_FILE = 'requirements.txt'
 TIMESTAMP_FORMAT = '%d_%m_%Y_%H_%M_%S'
 INFINITE_VERSION = '9' * 10
 INF = 'inf'
+PIPELINE_QUEUE_SIZE = 8
+SBOM_WORKERS = 4
+SSH_OPERATIONS = 16
+SEVERITY_LEVELS = ('none', 'low', 'medium', 'high', 'critical')
+VERSION_CACHE_SIZE = 65536
+DAEMON_HOST = '127.0.0.1'
+DAEMON_PORT = 8765
+JOB_LEASE_TIMEOUT = 600
+JOB_MAX_ATTEMPTS = 3
+JOB_POLL_INTERVAL = 1.0
+JOB_QUEUE_TIMEOUT = 30
+SCHEDULER_WORKERS = 8
+SCHEDULER_HOST_CONCURRENCY = 2
+METRICS_PREFIX = 'dpss'
+MATCH_SHARDS_PER_PROCESS = 4
+
+
+class ReportTypes(enum.StrEnum):
+    """Типы отчетов"""
+
+    JSON: str = 'json'
+    JSONL: str = 'jsonl'
+    HTML: str = 'html'
+    MARKDOWN: str = 'markdown'
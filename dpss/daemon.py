@@ -0,0 +1,348 @@
+"""
+Модуль долгоживущего сервиса сканирования с локальным HTTP API
+
+Сервис держит открытыми БД уязвимостей, кэши разбора версий и SSH сессии,
+поэтому запрос не тратит время на импорт зависимостей и холодный старт.
+"""
+
+import socketserver
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+
+import orjson
+from pydantic import ValidationError
+
+from dpss.const import DAEMON_HOST, DAEMON_PORT, REQUIREMENTS_FILE
+from dpss.dpss import DependencySecurityScanner
+from dpss.metrics import Metrics
+from dpss.models import (
+    ScanConfigSchema,
+    SoftComponentSchema,
+    DetectedVulnerabilitySchema,
+    ProjectFindingsSchema,
+)
+from dpss.records import make_detected_vulnerabilities
+from dpss.sbom import GeneratorSBOM, ParserSBOM
+from dpss.scanner import Scanner
+from dpss.utils import delete_dir, make_path_from_str, write_file
+from dpss.vulnerdb import VulnerabilityDB
+
+
+class SessionPool:
+    """Класс пула SSH сессий, переиспользуемых между запросами к одному хосту"""
+
+    def __init__(self, data_dir: Path, metrics: Metrics | None = None) -> None:
+        """
+        Инициализация пула
+
+        :param data_dir: Директория для сохранения данных проектов
+        :param metrics: Набор метрик для учета SSH операций
+        """
+
+        self.data_dir = data_dir
+        self.metrics = metrics
+        self.sessions = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def get(self, scan_config: ScanConfigSchema) -> Scanner:
+        """
+        Метод получения открытой сессии к хосту из конфигурации
+
+        :param scan_config: Конфигурация сканирования
+        :return: Сканер с активным соединением
+        """
+
+        key = (scan_config.host, scan_config.port, scan_config.user)
+        with self.lock:
+            host_lock = self.locks.setdefault(key, threading.Lock())
+
+        # Соединения к разным хостам устанавливаются параллельно, к одному хосту - один раз
+        with host_lock:
+            scanner = self.sessions.get(key)
+            if scanner is None or not self.is_active(scanner):
+                if scanner is not None:
+                    scanner.close_connection()
+                scanner = Scanner(scan_config=scan_config, data_dir=self.data_dir, metrics=self.metrics)
+                self.sessions[key] = scanner
+
+        return scanner
+
+    @staticmethod
+    def is_active(scanner: Scanner) -> bool:
+        """
+        Метод проверки, что соединение сканера не разорвано
+
+        :param scanner: Сканер
+        :return: Активно ли соединение
+        """
+
+        transport = scanner.client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def close(self) -> None:
+        """Метод закрытия всех сессий пула"""
+
+        with self.lock:
+            for scanner in self.sessions.values():
+                scanner.close_connection()
+            self.sessions.clear()
+
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    """Класс HTTP сервера на Unix сокете"""
+
+    daemon_threads = True
+
+
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    """
+    Класс обработчика запросов к сервису
+
+    POST /sbom - тело содержит SBOM в формате CycloneDX JSON
+    POST /requirements - тело содержит файл requirements.txt
+    POST /project - тело содержит конфигурацию сканирования в формате JSON
+    GET /health - проверка доступности сервиса
+    GET /metrics - метрики сервиса в текстовом формате Prometheus
+    """
+
+    server_version = 'dpss'
+
+    def do_GET(self) -> None:
+        """Метод обработки GET запроса"""
+
+        if self.path == '/metrics':
+            body = self.server.scan_daemon.metrics.to_prometheus().encode()
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.path != '/health':
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': f'Unknown path: {self.path}'})
+            return
+
+        self.send_json(HTTPStatus.OK, {'status': 'ok'})
+
+    def do_POST(self) -> None:
+        """Метод обработки POST запроса"""
+
+        daemon = self.server.scan_daemon
+        handlers = {
+            '/sbom': lambda body: daemon.analyze_sbom(orjson.loads(body)),
+            '/requirements': lambda body: daemon.analyze_requirements(body.decode()),
+            '/project': lambda body: daemon.analyze_project(ScanConfigSchema.model_validate_json(body)),
+        }
+        handler = handlers.get(self.path)
+        if handler is None:
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': f'Unknown path: {self.path}'})
+            return
+
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            result = handler(body)
+        except (orjson.JSONDecodeError, ValidationError, KeyError, UnicodeDecodeError) as error:
+            self.send_json(HTTPStatus.BAD_REQUEST, {'error': str(error)})
+            return
+        except Exception as error:
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(error)})
+            return
+
+        self.send_json(HTTPStatus.OK, [item.model_dump(mode='json') for item in result])
+
+    def send_json(self, status: HTTPStatus, data: dict | list) -> None:
+        """
+        Метод отправки ответа в формате JSON
+
+        :param status: Код ответа
+        :param data: Данные ответа
+        """
+
+        body = orjson.dumps(data)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        """Метод получения адреса клиента для журнала, у клиентов Unix сокета адреса нет"""
+
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+
+        return 'unix'
+
+
+class ScanDaemon:
+    """Класс долгоживущего сервиса сканирования"""
+
+    def __init__(
+            self,
+            db_path: Path | str,
+            data_dir: Path | str,
+            package_folder: str | Path = None,
+            cache_path: str | Path | None = None,
+            host: str = DAEMON_HOST,
+            port: int = DAEMON_PORT,
+            socket_path: str | Path | None = None,
+    ) -> None:
+        """
+        Инициализация сервиса
+
+        :param db_path: Путь до файла с БД
+        :param data_dir: Директория для сохранения данных проектов
+        :param package_folder: Путь до пакета уязвимостей: директории, zip или tar архива
+        :param cache_path: Путь до файла с кэшем результатов сопоставления (по умолчанию кэш отключен)
+        :param host: Адрес для HTTP API
+        :param port: Порт для HTTP API
+        :param socket_path: Путь до Unix сокета; если задан, API доступен только через него
+        """
+
+        self.data_dir = make_path_from_str(data_dir)
+        self.metrics = Metrics()
+        self.vulner_db = VulnerabilityDB(
+            db_path=db_path,
+            package_folder=package_folder,
+            cache_path=cache_path,
+            metrics=self.metrics,
+        )
+        self.address = (host, port)
+        self.socket_path = socket_path
+        self.sessions = SessionPool(self.data_dir, self.metrics)
+        # Соединение sqlite привязано к потоку, поэтому все запросы к БД выполняются в одном выделенном потоке
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dpss-db')
+        self.server = None
+
+    def __enter__(self):
+        """Инициализация контекста"""
+
+        self._run(self.vulner_db.__enter__)
+        if self.socket_path is not None:
+            socket_path = make_path_from_str(self.socket_path)
+            socket_path.unlink(missing_ok=True)
+            self.server = UnixHTTPServer(str(socket_path), ScanRequestHandler)
+        else:
+            self.server = ThreadingHTTPServer(self.address, ScanRequestHandler)
+
+        self.server.scan_daemon = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Финализация контекста"""
+
+        try:
+            self.server.server_close()
+            self.sessions.close()
+            self._run(self.vulner_db.__exit__, exc_type, exc_val, exc_tb)
+        finally:
+            self.executor.shutdown(wait=False)
+            if self.socket_path is not None:
+                make_path_from_str(self.socket_path).unlink(missing_ok=True)
+
+    def serve_forever(self) -> None:
+        """Метод обработки запросов до вызова shutdown"""
+
+        self.server.serve_forever()
+
+    def shutdown(self) -> None:
+        """Метод остановки обработки запросов, вызывается из другого потока"""
+
+        self.server.shutdown()
+
+    def analyze_sbom(self, sbom: dict) -> list[DetectedVulnerabilitySchema]:
+        """
+        Метод поиска уязвимостей в компонентах SBOM
+
+        :param sbom: SBOM в формате CycloneDX
+        :return: Список найденных уязвимостей
+        """
+
+        return self.match(ParserSBOM(sbom).get_components())
+
+    def analyze_requirements(self, requirements: str) -> list[DetectedVulnerabilitySchema]:
+        """
+        Метод поиска уязвимостей в зависимостях из файла requirements.txt
+
+        :param requirements: Содержимое файла requirements.txt
+        :return: Список найденных уязвимостей
+        """
+
+        request_dir = self.data_dir / 'requests' / uuid.uuid4().hex
+        try:
+            write_file(output_dir=request_dir, filename=REQUIREMENTS_FILE, data=requirements)
+            sbom = GeneratorSBOM(
+                source_path=request_dir,
+                output_path=request_dir,
+                metrics=self.metrics,
+            ).generate_sbom()
+        finally:
+            delete_dir(request_dir)
+
+        return self.analyze_sbom(sbom)
+
+    def analyze_project(self, scan_config: ScanConfigSchema) -> list[ProjectFindingsSchema]:
+        """
+        Метод сканирования проектов удаленного хоста через переиспользуемую SSH сессию
+
+        Файлы проектов сохраняются в отдельную директорию запроса, поэтому одновременные
+        запросы к одноименным проектам не перезаписывают файлы друг друга.
+
+        :param scan_config: Конфигурация сканирования
+        :return: Список уязвимостей по проектам
+        """
+
+        scanner = self.sessions.get(scan_config)
+        request_dir = self.data_dir / 'requests' / uuid.uuid4().hex
+        project_findings = []
+        try:
+            for project in scan_config.projects:
+                local_project_dir = scanner.save_requirements(
+                    project,
+                    output_dir=request_dir / project.type / project.name,
+                )
+                if local_project_dir is None:
+                    continue
+
+                DependencySecurityScanner.generate_sbom(local_project_dir, self.metrics)
+                components = DependencySecurityScanner.get_components_from_sbom(local_project_dir)
+                project_findings.append(
+                    ProjectFindingsSchema.model_construct(
+                        project=project.name,
+                        vulnerabilities=self.match(components),
+                        host=scan_config.host,
+                    )
+                )
+        finally:
+            delete_dir(request_dir)
+
+        return project_findings
+
+    def match(self, components: list[SoftComponentSchema]) -> list[DetectedVulnerabilitySchema]:
+        """
+        Метод сопоставления компонентов с открытой БД уязвимостей
+
+        :param components: Список компонентов
+        :return: Список найденных уязвимостей
+        """
+
+        found_vulnerabilities = self._run(DependencySecurityScanner.match_components, components, self.vulner_db)
+        return make_detected_vulnerabilities(found_vulnerabilities)
+
+    def _run(self, func: Callable, *args):
+        """
+        Метод выполнения функции в потоке БД
+
+        :param func: Функция
+        :param args: Аргументы функции
+        :return: Результат функции
+        """
+
+        return self.executor.submit(func, *args).result()
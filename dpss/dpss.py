@@ -1,11 +1,35 @@
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, Iterator
 
 from dpss.scanner import Scanner
 from dpss.sbom import GeneratorSBOM, ParserSBOM
-from dpss.models import ScanConfigSchema, SoftComponentSchema, DetectedVulnerabilitySchema, DetectedSoftSchema
+from dpss.models import (
+    ScanConfigSchema,
+    ProjectConfigSchema,
+    SoftComponentSchema,
+    DetectedVulnerabilitySchema,
+    DetectedSoftSchema,
+    ProjectFindingsSchema,
+    ProjectDeltaSchema,
+    ScanDeltaSchema,
+)
+from dpss.history import ScanHistory
+from dpss.metrics import Metrics
+from dpss.tracing import Tracer, NULL_TRACER
 from dpss.vulnerdb import VulnerabilityDB
-from dpss.reporter import Reporter
-from dpss.utils import check_is_vulnerable
+from dpss.reporter import Reporter, LazyReport
+from dpss.utils import check_is_vulnerable, normalize_package_name
+from dpss.records import (
+    DetectedSoft,
+    make_detected_vulnerabilities,
+    make_finding_rows,
+    make_found_vulnerabilities,
+    make_project_findings,
+    merge_found_vulnerabilities,
+)
+from dpss.pipeline import StagedPipeline, PipelineStage
+from dpss.const import PIPELINE_QUEUE_SIZE, SBOM_WORKERS
 
 
 class OldDependencySecurityScanner:
@@ -132,13 +156,46 @@ class DependencySecurityScanner:
             db_path: str | Path,
             data_dir: Path,
             vulners_package_dir: Path,
+            cache_path: str | Path | None = None,
+            sbom_workers: int = SBOM_WORKERS,
+            queue_size: int = PIPELINE_QUEUE_SIZE,
+            on_findings: Callable[[ProjectFindingsSchema], None] | None = None,
+            history_path: str | Path | None = None,
+            metrics: Metrics | None = None,
+            tracer: Tracer | None = None,
     ) -> None:
-        """Инициализация объекта класса"""
+        """
+        Инициализация объекта класса
+
+        :param scan_config: Конфигурация сканирования
+        :param db_path: Путь до файла с БД
+        :param data_dir: Директория для сохранения данных проектов
+        :param vulners_package_dir: Директория с пакетом уязвимостей
+        :param cache_path: Путь до файла с кэшем результатов сопоставления (по умолчанию кэш отключен)
+        :param sbom_workers: Количество параллельных генераций SBOM
+        :param queue_size: Размер очередей между стадиями сканирования
+        :param on_findings: Обработчик, вызываемый с уязвимостями каждого проекта сразу после их нахождения
+        :param history_path: Путь до файла с историей сканирований; если задан, заново сопоставляются
+            только новые и измененные компоненты, а в delta сохраняются новые и устраненные уязвимости
+        :param metrics: Набор метрик сканирования (по умолчанию создается новый и доступен в metrics)
+        :param tracer: Трассировщик операций сканирования с профилированием по запросу
+            (по умолчанию выключен, доступен в tracer)
+        """
 
-        self.scanner = Scanner(scan_config=scan_config, data_dir=data_dir)
+        self.metrics = metrics or Metrics()
+        self.tracer = tracer or NULL_TRACER
+        self.scanner = Scanner(scan_config=scan_config, data_dir=data_dir, metrics=self.metrics, tracer=self.tracer)
         self.data_dir = data_dir
         self.db_path = db_path
         self.vulners_package_dir = vulners_package_dir
+        self.cache_path = cache_path
+        self.sbom_workers = sbom_workers
+        self.queue_size = queue_size
+        self.on_findings = on_findings
+        self.history_path = history_path
+        self.scan_id = None
+        self.project_deltas = []
+        self.delta = None
         self.found_vulnerabilities = {}
         self.report_type = scan_config.report_type
         self.report = None
@@ -146,30 +203,249 @@ class DependencySecurityScanner:
     def run(self) -> None:
         """Метод запуска сканирования"""
 
-        components = []
+        self.tracer.start()
+        try:
+            for project, found_vulnerabilities in self.iter_project_vulnerabilities():
+                merge_found_vulnerabilities(self.found_vulnerabilities, found_vulnerabilities)
+                if self.on_findings is not None:
+                    self.on_findings(
+                        make_project_findings(project.name, found_vulnerabilities, host=self.scanner.config.host)
+                    )
 
-        self.scanner.save_project_requirements()
+            self.make_report()
+        finally:
+            self.tracer.finish()
 
-        local_project_dirs = []
-        for project in self.scanner.config.projects:
-            local_project_dirs.append(self.data_dir / project.type / project.name)
+    def iter_findings(self) -> Iterator[ProjectFindingsSchema]:
+        """
+        Метод потокового получения уязвимостей по проектам
 
-        for local_project_dir in local_project_dirs:
-            self.generate_sbom(local_project_dir)
-            components.extend(
-                self.get_components_from_sbom(local_project_dir)
+        Уязвимости проекта отдаются сразу после его сопоставления с БД,
+        не дожидаясь остальных проектов.
+
+        :return: Генератор уязвимостей проектов в порядке готовности
+        """
+
+        self.tracer.start()
+        try:
+            for project, found_vulnerabilities in self.iter_project_vulnerabilities():
+                findings = make_project_findings(project.name, found_vulnerabilities, host=self.scanner.config.host)
+                if self.on_findings is not None:
+                    self.on_findings(findings)
+
+                yield findings
+        finally:
+            self.tracer.finish()
+
+    def iter_project_vulnerabilities(self) -> Iterator[tuple[ProjectConfigSchema, dict]]:
+        """
+        Метод запуска конвейера сканирования
+
+        Получение файлов, генерация SBOM и сопоставление с БД выполняются конвейером:
+        проект переходит на следующую стадию сразу после завершения предыдущей.
+        В отличие от iter_findings уязвимости отдаются во внутренних записях без построения схем.
+
+        :return: Генератор проектов и найденных в них уязвимостей, сгруппированных по идентификатору
+        """
+
+        self.scan_id = None
+        self.project_deltas = []
+        pipeline = StagedPipeline(
+            stages=[
+                PipelineStage(name='fetch', handler=self.fetch_project),
+                PipelineStage(name='sbom', handler=self.prepare_components, workers=self.sbom_workers),
+                PipelineStage(name='match', handler=self.match_project, context=self.open_match_context),
+            ],
+            queue_size=self.queue_size,
+        )
+
+        yield from pipeline.run(self.scanner.config.projects)
+
+        if self.history_path is not None:
+            self.delta = ScanDeltaSchema.model_construct(
+                name=self.scanner.config.name,
+                date=self.scanner.config.date,
+                projects=self.project_deltas,
             )
 
-        self.find_vulnerabilities_by_components(components)
-        self.make_report()
+    def open_vulner_db(self) -> VulnerabilityDB:
+        """Метод создания подключения к БД уязвимостей"""
+
+        return VulnerabilityDB(
+            db_path=self.db_path,
+            package_folder=self.vulners_package_dir,
+            cache_path=self.cache_path,
+            metrics=self.metrics,
+            tracer=self.tracer,
+        )
+
+    @contextmanager
+    def open_match_context(self) -> Iterator[tuple[VulnerabilityDB, ScanHistory | None]]:
+        """Метод открытия подключений стадии сопоставления: БД уязвимостей и истории сканирований"""
+
+        with self.open_vulner_db() as vulner_db:
+            if self.history_path is None:
+                yield vulner_db, None
+                return
+
+            with ScanHistory(self.history_path) as history:
+                if self.scan_id is None:
+                    self.scan_id = history.start_scan(self.scanner.config.name, self.scanner.config.date)
+                yield vulner_db, history
+
+    def fetch_project(self, project: ProjectConfigSchema) -> tuple[ProjectConfigSchema, Path] | None:
+        """
+        Метод получения файлов проекта с удаленного хоста
+
+        :param project: Конфигурация проекта
+        :return: Проект и его локальная директория или None, если файлы получить не удалось
+        """
+
+        with (
+            self.metrics.timer('stage', stage='fetch', project=project.name),
+            self.tracer.span('fetch', project=project.name),
+        ):
+            local_project_dir = self.scanner.save_requirements(project)
+        if local_project_dir is None:
+            return None
+
+        return project, local_project_dir
+
+    def prepare_components(
+            self,
+            fetched_project: tuple[ProjectConfigSchema, Path],
+    ) -> tuple[ProjectConfigSchema, list[SoftComponentSchema]]:
+        """
+        Метод генерации SBOM проекта и получения его компонентов
+
+        :param fetched_project: Проект и его локальная директория
+        :return: Проект и список его компонентов
+        """
+
+        project, local_project_dir = fetched_project
+        with (
+            self.metrics.timer('stage', stage='sbom', project=project.name),
+            self.tracer.span('sbom', project=project.name),
+        ):
+            self.generate_sbom(local_project_dir, self.metrics)
+        with (
+            self.metrics.timer('stage', stage='parse', project=project.name),
+            self.tracer.span('parse', project=project.name),
+        ):
+            components = self.get_components_from_sbom(local_project_dir)
+
+        return project, components
+
+    def match_project(
+            self,
+            project_components: tuple[ProjectConfigSchema, list[SoftComponentSchema]],
+            match_context: tuple[VulnerabilityDB, ScanHistory | None],
+    ) -> tuple[ProjectConfigSchema, dict]:
+        """
+        Метод сопоставления компонентов проекта с БД уязвимостей
+
+        :param project_components: Проект и список его компонентов
+        :param match_context: Открытые подключения к БД уязвимостей и истории сканирований
+        :return: Проект и найденные уязвимости, сгруппированные по идентификатору
+        """
+
+        project, components = project_components
+        vulner_db, history = match_context
+        with (
+            self.metrics.timer('stage', stage='match', project=project.name),
+            self.tracer.span('match', project=project.name),
+        ):
+            if history is None:
+                return project, self.match_components(components, vulner_db)
+
+            return project, self.match_components_incrementally(project, components, vulner_db, history)
+
+    def match_components_incrementally(
+            self,
+            project: ProjectConfigSchema,
+            components: list[SoftComponentSchema],
+            vulner_db: VulnerabilityDB,
+            history: ScanHistory,
+    ) -> dict:
+        """
+        Метод сопоставления с БД только новых и измененных с прошлого сканирования компонентов
+
+        Результаты для неизменных компонентов берутся из истории, если БД уязвимостей
+        с тех пор не пересобиралась. Изменения относительно прошлого сканирования
+        сохраняются в project_deltas.
+
+        :param project: Конфигурация проекта
+        :param components: Список компонентов проекта
+        :param vulner_db: Открытое подключение к БД уязвимостей
+        :param history: Открытое подключение к истории сканирований
+        :return: Найденные уязвимости, сгруппированные по идентификатору
+        """
+
+        generation = vulner_db.generation
+        host = self.scanner.config.host
+        previous_scan = history.get_last_project_scan(host, project.name, self.scan_id)
+        previous_findings = []
+        reused_findings = []
+        changed_components = components
+        if previous_scan is not None:
+            previous_scan_id, previous_generation = previous_scan
+            previous_findings = history.get_findings(previous_scan_id, host, project.name)
+            if previous_generation == generation:
+                previous_components = {
+                    (normalize_package_name(name), version)
+                    for name, version in history.get_components(previous_scan_id, host, project.name)
+                }
+                changed_components = [
+                    component for component in components
+                    if (normalize_package_name(component.name), component.version) not in previous_components
+                ]
+                current_components = {
+                    (normalize_package_name(component.name), component.version) for component in components
+                }
+                reused_findings = [
+                    finding for finding in previous_findings
+                    if (normalize_package_name(finding[2]), finding[3]) in current_components
+                ]
+
+        findings = reused_findings + make_finding_rows(self.match_components(changed_components, vulner_db))
+        history.save_project(
+            scan_id=self.scan_id,
+            host=host,
+            project=project.name,
+            generation=generation,
+            components=[(component.name, component.version) for component in components],
+            findings=findings,
+        )
+
+        current_set = set(findings)
+        previous_set = set(previous_findings)
+        self.project_deltas.append(
+            ProjectDeltaSchema.model_construct(
+                project=project.name,
+                new=make_detected_vulnerabilities(
+                    make_found_vulnerabilities([finding for finding in findings if finding not in previous_set])
+                ),
+                resolved=make_detected_vulnerabilities(
+                    make_found_vulnerabilities([finding for finding in previous_findings if finding not in current_set])
+                ),
+            )
+        )
+
+        return make_found_vulnerabilities(findings)
 
     @staticmethod
-    def generate_sbom(local_project_dir: Path) -> None:
-        """Метода генерации SBOM данных"""
+    def generate_sbom(local_project_dir: Path, metrics: Metrics | None = None) -> None:
+        """
+        Метода генерации SBOM данных
+
+        :param local_project_dir: Локальная директория проекта
+        :param metrics: Набор метрик для учета запусков генератора
+        """
 
         sbom_generator = GeneratorSBOM(
             source_path=local_project_dir,
             output_path=local_project_dir,
+            metrics=metrics,
         )
 
         sbom_generator.generate_sbom(is_need_dump_file=True)
@@ -188,51 +464,70 @@ class DependencySecurityScanner:
         :return: Список уязвимостей, включающий уязвимый компоненты
         """
 
+        with self.open_vulner_db() as vulner_db:
+            found_vulnerabilities = self.match_components(components, vulner_db)
+
+        merge_found_vulnerabilities(self.found_vulnerabilities, found_vulnerabilities)
+        return make_detected_vulnerabilities(found_vulnerabilities)
+
+    @staticmethod
+    def match_components(components: list[SoftComponentSchema], vulner_db: VulnerabilityDB) -> dict:
+        """
+        Метод сопоставления компонентов с БД уязвимостей
+
+        :param components: Список компонентов
+        :param vulner_db: Открытое подключение к БД уязвимостей
+        :return: Найденные уязвимости, сгруппированные по идентификатору
+        """
+
+        found_vulnerabilities = {}
         for component in components:
             pkg_version = component.version
             pkg_name = component.name
-
-            with VulnerabilityDB(db_path=self.db_path, package_folder=self.vulners_package_dir) as vulner_db:
-                vulnerabilities = vulner_db.get_package_vulnerabilities(pkg_name)
+            vulnerabilities = vulner_db.get_matched_vulnerabilities(pkg_name, pkg_version)
 
             for vulner in vulnerabilities:
                 vulnerability, source, pkg_name, vulnerable_interval = vulner
-                is_vulnerable = check_is_vulnerable(pkg_version, vulnerable_interval)
-                if not is_vulnerable:
-                    continue
-
-                if not self.found_vulnerabilities.get(vulnerability):
-                    self.found_vulnerabilities[vulnerability] = dict(
+                if not found_vulnerabilities.get(vulnerability):
+                    found_vulnerabilities[vulnerability] = dict(
                         id=vulnerability,
                         source=source,
                         soft=[],
                     )
 
-                self.found_vulnerabilities[vulnerability]['soft'].append(
-                    DetectedSoftSchema(
-                        vulnerable_interval=vulnerable_interval,
+                found_vulnerabilities[vulnerability]['soft'].append(
+                    DetectedSoft(
                         name=pkg_name,
                         version=pkg_version,
+                        vulnerable_interval=vulnerable_interval,
                     )
                 )
 
+        return found_vulnerabilities
+
     def make_report(self) -> None:
         """Метод составления отчета о результатах сканирования"""
 
-        detected_vulnerabilities = []
-        for vulner, data in self.found_vulnerabilities.items():
-            detected_vulnerabilities.append(
-                DetectedVulnerabilitySchema(
-                    vulner_id=vulner,
-                    source_name=data['source'],
-                    affected_soft=data['soft'],
-                )
-            )
-
         reporter = Reporter(
-            detected_vulnerabilities=detected_vulnerabilities,
+            detected_vulnerabilities=make_detected_vulnerabilities(self.found_vulnerabilities),
             vulnerabilities_package_path=self.vulners_package_dir,
             report_type=self.report_type,
+            db_path=self.db_path,
+            metrics=self.metrics,
         )
 
-        self.report = reporter.generate_report()
+        with self.tracer.span('report', report_type=self.report_type):
+            self.report = reporter.generate_report()
+
+    def make_lazy_report(self) -> LazyReport:
+        """
+        Метод составления ленивого отчета с постраничным доступом
+
+        :return: Ленивый отчет о результатах сканирования
+        """
+
+        return LazyReport(
+            detected_vulnerabilities=make_detected_vulnerabilities(self.found_vulnerabilities),
+            vulnerabilities_package_path=self.vulners_package_dir,
+            db_path=self.db_path,
+        )
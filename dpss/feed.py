@@ -0,0 +1,214 @@
+"""
+Модуль чтения пакета уязвимостей из директории или архива
+"""
+
+import tarfile
+import zipfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator
+
+import orjson
+
+from dpss.utils import make_path_from_str
+
+ADVISORY_SUFFIX = '.json'
+
+
+class AdvisoryFeed(ABC):
+    """Базовый класс пакета уязвимостей"""
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Инициализация пакета
+
+        :param path: Путь до пакета
+        """
+
+        self.path = make_path_from_str(path)
+
+    def __enter__(self):
+        """Инициализация контекста"""
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Финализация контекста"""
+
+        self.close()
+
+    def close(self) -> None:
+        """Метод освобождения ресурсов пакета"""
+
+    @abstractmethod
+    def iter_advisories(self) -> Iterator[dict]:
+        """Метод последовательного чтения всех уязвимостей пакета"""
+
+    @abstractmethod
+    def load(self, file_name: str) -> dict:
+        """
+        Метод чтения одной уязвимости по имени файла
+
+        :param file_name: Имя файла уязвимости
+        :return: Данные уязвимости
+        """
+
+
+class DirectoryFeed(AdvisoryFeed):
+    """Класс пакета уязвимостей в виде распакованной директории"""
+
+    def iter_advisories(self) -> Iterator[dict]:
+        """Метод последовательного чтения всех уязвимостей пакета"""
+
+        for file_path in self.path.iterdir():
+            if file_path.suffix == ADVISORY_SUFFIX and file_path.is_file():
+                yield orjson.loads(file_path.read_bytes())
+
+    def load(self, file_name: str) -> dict:
+        """
+        Метод чтения одной уязвимости по имени файла
+
+        :param file_name: Имя файла уязвимости
+        :return: Данные уязвимости
+        """
+
+        return orjson.loads((self.path / file_name).read_bytes())
+
+
+class ZipFeed(AdvisoryFeed):
+    """Класс пакета уязвимостей в zip архиве"""
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Инициализация пакета
+
+        :param path: Путь до архива
+        """
+
+        super().__init__(path)
+        self.archive = zipfile.ZipFile(self.path)
+        self.index = None
+
+    def close(self) -> None:
+        """Метод освобождения ресурсов пакета"""
+
+        self.archive.close()
+
+    def iter_advisories(self) -> Iterator[dict]:
+        """Метод последовательного чтения всех уязвимостей пакета"""
+
+        for member in self.archive.infolist():
+            if not member.is_dir() and member.filename.endswith(ADVISORY_SUFFIX):
+                yield orjson.loads(self.archive.read(member))
+
+    def load(self, file_name: str) -> dict:
+        """
+        Метод чтения одной уязвимости по имени файла
+
+        :param file_name: Имя файла уязвимости
+        :return: Данные уязвимости
+        """
+
+        if self.index is None:
+            # Файлы могут лежать во вложенной директории архива, поэтому индексируем по имени файла
+            self.index = {
+                Path(member.filename).name: member
+                for member in self.archive.infolist()
+                if not member.is_dir()
+            }
+
+        if file_name not in self.index:
+            raise FileNotFoundError(f'{file_name} not found in {self.path}')
+
+        return orjson.loads(self.archive.read(self.index[file_name]))
+
+
+class TarFeed(AdvisoryFeed):
+    """
+    Класс пакета уязвимостей в tar архиве
+
+    Последовательное чтение идет потоком без распаковки на диск. Для произвольного доступа
+    один раз строится индекс членов архива; для сжатых tar он требует распаковки до нужного
+    смещения, поэтому для отчетов предпочтителен несжатый tar или zip.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Инициализация пакета
+
+        :param path: Путь до архива
+        """
+
+        super().__init__(path)
+        self.archive = None
+        self.index = None
+
+    def close(self) -> None:
+        """Метод освобождения ресурсов пакета"""
+
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    def iter_advisories(self) -> Iterator[dict]:
+        """Метод последовательного чтения всех уязвимостей пакета"""
+
+        with tarfile.open(self.path, mode='r|*') as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(ADVISORY_SUFFIX):
+                    yield orjson.loads(archive.extractfile(member).read())
+
+    def load(self, file_name: str) -> dict:
+        """
+        Метод чтения одной уязвимости по имени файла
+
+        :param file_name: Имя файла уязвимости
+        :return: Данные уязвимости
+        """
+
+        if self.index is None:
+            self.archive = tarfile.open(self.path, mode='r:*')
+            self.index = {
+                Path(member.name).name: member
+                for member in self.archive.getmembers()
+                if member.isfile()
+            }
+
+        if file_name not in self.index:
+            raise FileNotFoundError(f'{file_name} not found in {self.path}')
+
+        return orjson.loads(self.archive.extractfile(self.index[file_name]).read())
+
+
+def get_advisory_file_name(source_name: str, vulner_id: str) -> str:
+    """
+    Функция получения имени файла уязвимости в пакете
+
+    :param source_name: Источник уязвимости
+    :param vulner_id: Идентификатор уязвимости
+    :return: Имя файла
+    """
+
+    return f'{source_name}.{vulner_id}.{vulner_id}{ADVISORY_SUFFIX}'
+
+
+def open_feed(path: str | Path) -> AdvisoryFeed:
+    """
+    Функция открытия пакета уязвимостей по его пути
+
+    :param path: Путь до директории, zip или tar архива
+    :return: Объект пакета уязвимостей
+    """
+
+    path = make_path_from_str(path)
+
+    if path.is_dir():
+        return DirectoryFeed(path)
+
+    if zipfile.is_zipfile(path):
+        return ZipFeed(path)
+
+    if tarfile.is_tarfile(path):
+        return TarFeed(path)
+
+    raise ValueError(f'Unsupported vulnerabilities package: {path}')
@@ -0,0 +1,289 @@
+"""
+Модуль хранилища истории сканирований
+"""
+
+import sqlite3
+from pathlib import Path
+
+from dpss.utils import make_path_from_str, normalize_package_name, prepare_output_dir
+
+
+class ScanHistory:
+    """
+    Класс работы с историей сканирований проектов
+
+    Проекты различаются по паре (хост, имя проекта), поэтому одноименные проекты
+    разных хостов не перезаписывают историю друг друга.
+    """
+
+    CREATE_TABLES = (
+        '''
+        CREATE TABLE IF NOT EXISTS scans (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            date TEXT NOT NULL
+        );
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS project_scans (
+            scan_id INTEGER NOT NULL,
+            host TEXT NOT NULL DEFAULT '',
+            project TEXT NOT NULL,
+            generation TEXT NOT NULL,
+            PRIMARY KEY (host, project, scan_id)
+        );
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS project_components (
+            scan_id INTEGER NOT NULL,
+            host TEXT NOT NULL DEFAULT '',
+            project TEXT NOT NULL,
+            name TEXT NOT NULL,
+            version TEXT NOT NULL
+        );
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS project_findings (
+            scan_id INTEGER NOT NULL,
+            host TEXT NOT NULL DEFAULT '',
+            project TEXT NOT NULL,
+            vulnerability TEXT NOT NULL,
+            source TEXT NOT NULL,
+            name TEXT NOT NULL,
+            version TEXT NOT NULL,
+            opener TEXT NOT NULL,
+            version_left TEXT NOT NULL,
+            version_right TEXT NOT NULL,
+            closer TEXT NOT NULL
+        );
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS project_inventory (
+            host TEXT NOT NULL DEFAULT '',
+            project TEXT NOT NULL,
+            name TEXT NOT NULL,
+            version TEXT NOT NULL
+        );
+        ''',
+    )
+
+    # Таблицы, в которые столбец хоста добавляется при открытии истории, записанной без него
+    HOST_TABLES = ('project_scans', 'project_components', 'project_findings', 'project_inventory')
+
+    ADD_HOST_COLUMN = "ALTER TABLE {table} ADD COLUMN host TEXT NOT NULL DEFAULT '';"
+
+    CREATE_INDEXES = (
+        'CREATE INDEX IF NOT EXISTS idx_components_host_scan ON project_components (host, project, scan_id);',
+        'CREATE INDEX IF NOT EXISTS idx_findings_host_scan ON project_findings (host, project, scan_id);',
+        # Обратный индекс последнего известного состава проектов по нормализованному имени пакета
+        'CREATE INDEX IF NOT EXISTS idx_inventory_name ON project_inventory (name);',
+        'CREATE INDEX IF NOT EXISTS idx_inventory_host_project ON project_inventory (host, project);',
+    )
+
+    INSERT_SCAN = 'INSERT INTO scans (name, date) VALUES (?, ?);'
+
+    INSERT_PROJECT_SCAN = 'INSERT INTO project_scans (scan_id, host, project, generation) VALUES (?, ?, ?, ?);'
+
+    INSERT_COMPONENT = '''
+    INSERT INTO project_components (scan_id, host, project, name, version)
+    VALUES (?, ?, ?, ?, ?);
+    '''
+
+    INSERT_FINDING = '''
+    INSERT INTO project_findings (
+        scan_id, host, project, vulnerability, source, name, version, opener, version_left, version_right, closer
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+    '''
+
+    DELETE_INVENTORY = 'DELETE FROM project_inventory WHERE host = ? AND project = ?;'
+
+    INSERT_INVENTORY = 'INSERT INTO project_inventory (host, project, name, version) VALUES (?, ?, ?, ?);'
+
+    SELECT_INVENTORY = '''
+    SELECT host, project, name, version
+    FROM project_inventory
+    WHERE name IN ({placeholders});
+    '''
+
+    # Ограничение количества параметров в одном запросе sqlite
+    QUERY_BATCH_SIZE = 900
+
+    SELECT_LAST_PROJECT_SCAN = '''
+    SELECT scan_id, generation
+    FROM project_scans
+    WHERE host = ? AND project = ? AND scan_id != ?
+    ORDER BY scan_id DESC
+    LIMIT 1;
+    '''
+
+    SELECT_LAST_SCAN_DATES = '''
+    SELECT project_scans.host, project_scans.project, scans.date
+    FROM project_scans
+    JOIN scans ON scans.id = project_scans.scan_id
+    WHERE project_scans.scan_id = (
+        SELECT MAX(last_scans.scan_id)
+        FROM project_scans AS last_scans
+        WHERE last_scans.host = project_scans.host AND last_scans.project = project_scans.project
+    );
+    '''
+
+    SELECT_COMPONENTS = '''
+    SELECT name, version
+    FROM project_components
+    WHERE host = ? AND project = ? AND scan_id = ?;
+    '''
+
+    SELECT_FINDINGS = '''
+    SELECT vulnerability, source, name, version, opener, version_left, version_right, closer
+    FROM project_findings
+    WHERE host = ? AND project = ? AND scan_id = ?;
+    '''
+
+    def __init__(self, history_path: Path | str) -> None:
+        """
+        Инициализация класса
+
+        :param history_path: Путь до файла с историей сканирований
+        """
+
+        self.history_path = make_path_from_str(history_path)
+
+    def __enter__(self):
+        """Инициализация контекста"""
+
+        prepare_output_dir(self.history_path.parent)
+        self.connection = sqlite3.connect(self.history_path)
+        cursor = self.connection.cursor()
+        for query in self.CREATE_TABLES:
+            cursor.execute(query)
+        for table in self.HOST_TABLES:
+            cursor.execute(f'PRAGMA table_info({table});')
+            if 'host' not in {column[1] for column in cursor.fetchall()}:
+                cursor.execute(self.ADD_HOST_COLUMN.format(table=table))
+        for query in self.CREATE_INDEXES:
+            cursor.execute(query)
+        self.connection.commit()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Финализация контекста"""
+
+        self.connection.commit()
+        self.connection.close()
+
+    def start_scan(self, name: str, date: str) -> int:
+        """
+        Метод регистрации нового сканирования
+
+        :param name: Имя сканирования
+        :param date: Дата сканирования
+        :return: Идентификатор сканирования
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.INSERT_SCAN, (name, date))
+        self.connection.commit()
+        return cursor.lastrowid
+
+    def get_last_project_scan(self, host: str, project: str, current_scan_id: int = -1) -> tuple[int, str] | None:
+        """
+        Метод получения последнего предыдущего сканирования проекта
+
+        :param host: Хост проекта
+        :param project: Имя проекта
+        :param current_scan_id: Идентификатор текущего сканирования, которое не учитывается
+        :return: Идентификатор сканирования и поколение БД или None, если проект еще не сканировался
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.SELECT_LAST_PROJECT_SCAN, (host, project, current_scan_id))
+        return cursor.fetchone()
+
+    def get_last_scan_dates(self) -> dict[tuple[str, str], str]:
+        """
+        Метод получения даты последнего сканирования каждого проекта
+
+        :return: Словарь с датой сканирования по хосту и имени проекта
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.SELECT_LAST_SCAN_DATES)
+        return {(host, project): scan_date for host, project, scan_date in cursor.fetchall()}
+
+    def get_components(self, scan_id: int, host: str, project: str) -> list[tuple[str, str]]:
+        """
+        Метод получения компонентов проекта в сканировании
+
+        :param scan_id: Идентификатор сканирования
+        :param host: Хост проекта
+        :param project: Имя проекта
+        :return: Список пар (имя, версия)
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.SELECT_COMPONENTS, (host, project, scan_id))
+        return cursor.fetchall()
+
+    def get_findings(self, scan_id: int, host: str, project: str) -> list[tuple]:
+        """
+        Метод получения найденных уязвимостей проекта в сканировании
+
+        :param scan_id: Идентификатор сканирования
+        :param host: Хост проекта
+        :param project: Имя проекта
+        :return: Список строк (уязвимость, источник, имя, версия, границы интервала)
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.SELECT_FINDINGS, (host, project, scan_id))
+        return cursor.fetchall()
+
+    def save_project(
+            self,
+            scan_id: int,
+            host: str,
+            project: str,
+            generation: str,
+            components: list[tuple[str, str]],
+            findings: list[tuple],
+    ) -> None:
+        """
+        Метод сохранения результатов сканирования проекта
+
+        :param scan_id: Идентификатор сканирования
+        :param host: Хост проекта
+        :param project: Имя проекта
+        :param generation: Поколение БД уязвимостей, с которой сопоставлялся проект
+        :param components: Список пар (имя, версия)
+        :param findings: Список строк найденных уязвимостей
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.INSERT_PROJECT_SCAN, (scan_id, host, project, generation))
+        cursor.executemany(self.INSERT_COMPONENT, [(scan_id, host, project, *component) for component in components])
+        cursor.executemany(self.INSERT_FINDING, [(scan_id, host, project, *finding) for finding in findings])
+        cursor.execute(self.DELETE_INVENTORY, (host, project))
+        cursor.executemany(
+            self.INSERT_INVENTORY,
+            {(host, project, normalize_package_name(name), version) for name, version in components},
+        )
+        self.connection.commit()
+
+    def find_inventory(self, pkg_names: list[str]) -> list[tuple[str, str, str, str]]:
+        """
+        Метод поиска проектов, в последнем сканировании которых были пакеты с указанными именами
+
+        :param pkg_names: Список имен пакетов
+        :return: Список строк (хост, проект, нормализованное имя пакета, версия)
+        """
+
+        rows = []
+        cursor = self.connection.cursor()
+        pkg_names = list(dict.fromkeys(normalize_package_name(name) for name in pkg_names))
+        for index in range(0, len(pkg_names), self.QUERY_BATCH_SIZE):
+            batch = pkg_names[index:index + self.QUERY_BATCH_SIZE]
+            cursor.execute(self.SELECT_INVENTORY.format(placeholders=', '.join('?' * len(batch))), batch)
+            rows.extend(cursor.fetchall())
+
+        return rows
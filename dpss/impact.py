@@ -0,0 +1,121 @@
+"""
+Модуль обратного поиска проектов, затронутых обновлением пакета уязвимостей
+"""
+
+from pathlib import Path
+
+from dpss.history import ScanHistory
+from dpss.models import ProjectFindingsSchema
+from dpss.records import DetectedSoft, make_project_findings
+from dpss.utils import check_is_vulnerable, normalize_package_name
+from dpss.vulnerdb import VulnerabilityDB
+
+
+class ImpactAnalyzer:
+    """
+    Класс поиска затронутых проектов по последнему известному составу из истории сканирований
+
+    Сопоставляются только новые и измененные уязвимости, подключение к хостам не требуется.
+    """
+
+    def __init__(
+            self,
+            db_path: Path | str,
+            history_path: Path | str,
+            package_folder: str | Path,
+    ) -> None:
+        """
+        Инициализация класса
+
+        :param db_path: Путь до файла с БД
+        :param history_path: Путь до файла с историей сканирований
+        :param package_folder: Путь до пакета уязвимостей: директории, zip или tar архива;
+            обязателен, так как уязвимости, отсутствующие в пакете, удаляются из БД
+        """
+
+        self.db_path = db_path
+        self.history_path = history_path
+        self.package_folder = package_folder
+        self.changed_vulnerabilities = []
+
+    def update(self) -> list[ProjectFindingsSchema]:
+        """
+        Метод загрузки обновлений пакета уязвимостей в БД и поиска затронутых ими проектов
+
+        :return: Список проектов с уязвимостями, появившимися или измененными в пакете
+        :raises ValueError: Если пакет уязвимостей не найден или пуст
+        """
+
+        with VulnerabilityDB(db_path=self.db_path, package_folder=self.package_folder) as vulner_db:
+            self.changed_vulnerabilities = vulner_db.ingest_advisories()
+            if not self.changed_vulnerabilities:
+                return []
+
+            with ScanHistory(self.history_path) as history:
+                return self.find_affected_projects(self.changed_vulnerabilities, vulner_db, history)
+
+    def check(self, vulner_ids: list[str]) -> list[ProjectFindingsSchema]:
+        """
+        Метод поиска проектов, затронутых указанными уязвимостями
+
+        :param vulner_ids: Список идентификаторов уязвимостей
+        :return: Список проектов с найденными уязвимостями
+        """
+
+        with (
+            VulnerabilityDB(db_path=self.db_path, package_folder=self.package_folder) as vulner_db,
+            ScanHistory(self.history_path) as history,
+        ):
+            return self.find_affected_projects(vulner_ids, vulner_db, history)
+
+    @staticmethod
+    def find_affected_projects(
+            vulner_ids: list[str],
+            vulner_db: VulnerabilityDB,
+            history: ScanHistory,
+    ) -> list[ProjectFindingsSchema]:
+        """
+        Метод сопоставления уязвимостей с последним известным составом проектов
+
+        Одноименные проекты разных хостов сопоставляются и возвращаются отдельно.
+
+        :param vulner_ids: Список идентификаторов уязвимостей
+        :param vulner_db: Открытое подключение к БД уязвимостей
+        :param history: Открытое подключение к истории сканирований
+        :return: Список проектов с найденными уязвимостями
+        """
+
+        vulnerabilities = vulner_db.get_vulnerabilities_packages(vulner_ids)
+        if not vulnerabilities:
+            return []
+
+        inventory = {}
+        for host, project, pkg_name, pkg_version in history.find_inventory([vulner[2] for vulner in vulnerabilities]):
+            inventory.setdefault(pkg_name, []).append(((host, project), pkg_version))
+
+        projects = {}
+        for vulnerability, source, pkg_name, vulnerable_interval in vulnerabilities:
+            for project, pkg_version in inventory.get(normalize_package_name(pkg_name), []):
+                if not check_is_vulnerable(pkg_version, vulnerable_interval):
+                    continue
+
+                found_vulnerabilities = projects.setdefault(project, {})
+                if not found_vulnerabilities.get(vulnerability):
+                    found_vulnerabilities[vulnerability] = dict(
+                        id=vulnerability,
+                        source=source,
+                        soft=[],
+                    )
+
+                found_vulnerabilities[vulnerability]['soft'].append(
+                    DetectedSoft(
+                        name=pkg_name,
+                        version=pkg_version,
+                        vulnerable_interval=vulnerable_interval,
+                    )
+                )
+
+        return [
+            make_project_findings(project, found_vulnerabilities, host=host)
+            for (host, project), found_vulnerabilities in sorted(projects.items())
+        ]
@@ -0,0 +1,516 @@
+"""
+Модуль распределенного сканирования через локальную очередь заданий
+
+Координатор кладет задания (хост и его проекты) в очередь sqlite, любое количество
+процессов-обработчиков забирают их во временную аренду и возвращают найденные
+уязвимости, которые координатор объединяет в один отчет.
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import orjson
+
+from dpss.const import JOB_LEASE_TIMEOUT, JOB_MAX_ATTEMPTS, JOB_POLL_INTERVAL, JOB_QUEUE_TIMEOUT, ReportTypes
+from dpss.dpss import DependencySecurityScanner
+from dpss.models import ScanConfigSchema
+from dpss.records import (
+    make_detected_vulnerabilities,
+    make_finding_rows,
+    make_found_vulnerabilities,
+    merge_found_vulnerabilities,
+)
+from dpss.reporter import Reporter
+from dpss.utils import delete_dir, make_path_from_str, prepare_output_dir
+
+
+class JobStatus:
+    """Статусы заданий"""
+
+    PENDING = 'pending'
+    LEASED = 'leased'
+    DONE = 'done'
+    FAILED = 'failed'
+
+
+class JobQueue:
+    """Класс долговременной очереди заданий сканирования в sqlite"""
+
+    CREATE_TABLE_JOBS = '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        batch TEXT NOT NULL,
+        config BLOB NOT NULL,
+        status TEXT NOT NULL,
+        worker TEXT,
+        lease_until REAL NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        result BLOB,
+        error TEXT
+    );
+    '''
+
+    CREATE_INDEX_JOBS = 'CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, lease_until);'
+
+    INSERT_JOB = 'INSERT INTO jobs (batch, config, status) VALUES (?, ?, ?);'
+
+    # Просроченная аренда означает, что обработчик завис или завершился, задание выдается повторно
+    SELECT_AVAILABLE_JOB = '''
+    SELECT id, config
+    FROM jobs
+    WHERE status = ? OR (status = ? AND lease_until < ?)
+    ORDER BY id
+    LIMIT 1;
+    '''
+
+    # Задание, аренда которого истекла на последней попытке, больше не выдается
+    EXPIRE_JOBS = '''
+    UPDATE jobs
+    SET status = ?, error = ?
+    WHERE status = ? AND lease_until < ? AND attempts >= ?;
+    '''
+
+    UPDATE_LEASE = '''
+    UPDATE jobs
+    SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1
+    WHERE id = ?;
+    '''
+
+    EXTEND_LEASE = 'UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?;'
+
+    COMPLETE_JOB = '''
+    UPDATE jobs
+    SET status = ?, result = ?, error = NULL
+    WHERE id = ? AND worker = ? AND status = ?;
+    '''
+
+    FAIL_JOB = '''
+    UPDATE jobs
+    SET status = CASE WHEN attempts < ? THEN ? ELSE ? END, lease_until = 0, error = ?
+    WHERE id = ? AND worker = ? AND status = ?;
+    '''
+
+    SELECT_STATUS_COUNTS = 'SELECT status, COUNT(*) FROM jobs WHERE batch = ? GROUP BY status;'
+
+    SELECT_RESULTS = 'SELECT id, result FROM jobs WHERE batch = ? AND status = ? ORDER BY id;'
+
+    SELECT_ERRORS = 'SELECT id, error FROM jobs WHERE batch = ? AND status = ? ORDER BY id;'
+
+    def __init__(
+            self,
+            queue_path: Path | str,
+            lease_timeout: float = JOB_LEASE_TIMEOUT,
+            max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> None:
+        """
+        Инициализация класса
+
+        :param queue_path: Путь до файла очереди
+        :param lease_timeout: Время аренды задания в секундах, после которого оно выдается другому обработчику
+        :param max_attempts: Максимальное количество попыток выполнения задания
+        """
+
+        self.queue_path = make_path_from_str(queue_path)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+
+    def __enter__(self):
+        """Инициализация контекста"""
+
+        prepare_output_dir(self.queue_path.parent)
+        # Транзакции управляются явно, чтобы аренда задания была атомарной между процессами
+        self.connection = sqlite3.connect(self.queue_path, timeout=JOB_QUEUE_TIMEOUT, isolation_level=None)
+        cursor = self.connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL;')
+        cursor.execute(self.CREATE_TABLE_JOBS)
+        cursor.execute(self.CREATE_INDEX_JOBS)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Финализация контекста"""
+
+        self.connection.close()
+
+    def put(self, batch: str, scan_config: ScanConfigSchema) -> int:
+        """
+        Метод добавления задания в очередь
+
+        :param batch: Идентификатор набора заданий одного запуска координатора
+        :param scan_config: Конфигурация сканирования хоста
+        :return: Идентификатор задания
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.INSERT_JOB, (batch, scan_config.model_dump_json(), JobStatus.PENDING))
+        return cursor.lastrowid
+
+    def lease(self, worker: str) -> tuple[int, ScanConfigSchema] | None:
+        """
+        Метод получения задания в аренду
+
+        :param worker: Идентификатор обработчика
+        :return: Идентификатор задания и конфигурация сканирования или None, если заданий нет
+        """
+
+        now = time.time()
+        cursor = self.connection.cursor()
+        cursor.execute('BEGIN IMMEDIATE;')
+        try:
+            self.expire_leases(cursor, now)
+            cursor.execute(self.SELECT_AVAILABLE_JOB, (JobStatus.PENDING, JobStatus.LEASED, now))
+            row = cursor.fetchone()
+            if row is not None:
+                cursor.execute(self.UPDATE_LEASE, (JobStatus.LEASED, worker, now + self.lease_timeout, row[0]))
+        except BaseException:
+            cursor.execute('ROLLBACK;')
+            raise
+
+        cursor.execute('COMMIT;')
+
+        if row is None:
+            return None
+
+        job_id, config = row
+        return job_id, ScanConfigSchema.model_validate_json(config)
+
+    def expire_leases(self, cursor: sqlite3.Cursor, now: float) -> None:
+        """
+        Метод перевода в ошибку заданий, аренда которых истекла на последней попытке
+
+        :param cursor: Курсор открытой транзакции
+        :param now: Текущее время
+        """
+
+        cursor.execute(
+            self.EXPIRE_JOBS,
+            (JobStatus.FAILED, 'Lease expired', JobStatus.LEASED, now, self.max_attempts),
+        )
+
+    def extend_lease(self, job_id: int, worker: str) -> bool:
+        """
+        Метод продления аренды задания
+
+        :param job_id: Идентификатор задания
+        :param worker: Идентификатор обработчика
+        :return: Продлена ли аренда; False, если задание уже передано другому обработчику
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.EXTEND_LEASE, (time.time() + self.lease_timeout, job_id, worker, JobStatus.LEASED))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: dict) -> bool:
+        """
+        Метод сохранения результата задания
+
+        :param job_id: Идентификатор задания
+        :param worker: Идентификатор обработчика
+        :param result: Строки найденных уязвимостей по имени проекта
+        :return: Принят ли результат; False, если аренда была потеряна
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            self.COMPLETE_JOB,
+            (JobStatus.DONE, orjson.dumps(result), job_id, worker, JobStatus.LEASED),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str) -> None:
+        """
+        Метод возврата задания в очередь после ошибки
+
+        :param job_id: Идентификатор задания
+        :param worker: Идентификатор обработчика
+        :param error: Описание ошибки
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            self.FAIL_JOB,
+            (self.max_attempts, JobStatus.PENDING, JobStatus.FAILED, error, job_id, worker, JobStatus.LEASED),
+        )
+
+    def get_status_counts(self, batch: str) -> dict[str, int]:
+        """
+        Метод получения количества заданий по статусам
+
+        Задания с истекшей на последней попытке арендой предварительно переводятся в ошибку,
+        иначе при отсутствии обработчиков они навсегда остались бы в аренде.
+
+        :param batch: Идентификатор набора заданий
+        :return: Словарь с количеством заданий по статусу
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute('BEGIN IMMEDIATE;')
+        try:
+            self.expire_leases(cursor, time.time())
+            cursor.execute(self.SELECT_STATUS_COUNTS, (batch,))
+            counts = dict(cursor.fetchall())
+        except BaseException:
+            cursor.execute('ROLLBACK;')
+            raise
+
+        cursor.execute('COMMIT;')
+        return counts
+
+    def get_results(self, batch: str) -> list[tuple[int, dict]]:
+        """
+        Метод получения результатов выполненных заданий
+
+        :param batch: Идентификатор набора заданий
+        :return: Список из идентификатора задания и строк найденных уязвимостей по имени проекта
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.SELECT_RESULTS, (batch, JobStatus.DONE))
+        return [(job_id, orjson.loads(result)) for job_id, result in cursor.fetchall()]
+
+    def get_errors(self, batch: str) -> list[tuple[int, str]]:
+        """
+        Метод получения ошибок заданий, исчерпавших попытки
+
+        :param batch: Идентификатор набора заданий
+        :return: Список из идентификатора задания и описания ошибки
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.SELECT_ERRORS, (batch, JobStatus.FAILED))
+        return cursor.fetchall()
+
+
+class ScanCoordinator:
+    """Класс координатора распределенного сканирования"""
+
+    def __init__(
+            self,
+            scan_configs: list[ScanConfigSchema],
+            queue_path: Path | str,
+            db_path: str | Path,
+            vulners_package_dir: Path,
+            report_type: str = ReportTypes.JSON,
+            max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> None:
+        """
+        Инициализация объекта класса
+
+        :param scan_configs: Конфигурации сканирования хостов, каждая становится отдельным заданием
+        :param queue_path: Путь до файла очереди
+        :param db_path: Путь до файла с БД
+        :param vulners_package_dir: Директория с пакетом уязвимостей
+        :param report_type: Тип итогового отчета
+        :param max_attempts: Максимальное количество попыток выполнения задания, после которого
+            задание с истекшей арендой считается завершенным с ошибкой
+        """
+
+        self.scan_configs = scan_configs
+        self.queue_path = queue_path
+        self.db_path = db_path
+        self.vulners_package_dir = vulners_package_dir
+        self.report_type = report_type
+        self.max_attempts = max_attempts
+        self.batch = None
+        self.errors = []
+        self.found_vulnerabilities = {}
+        self.report = None
+
+    def run(self, poll_interval: float = JOB_POLL_INTERVAL, timeout: float | None = None) -> None:
+        """
+        Метод постановки заданий, ожидания обработчиков и составления отчета
+
+        :param poll_interval: Интервал опроса очереди в секундах
+        :param timeout: Максимальное время ожидания в секундах, по истечении отчет строится по готовым заданиям
+        """
+
+        self.submit()
+        self.wait(poll_interval=poll_interval, timeout=timeout)
+        self.collect()
+        self.make_report()
+
+    def submit(self) -> str:
+        """
+        Метод постановки заданий в очередь
+
+        :return: Идентификатор набора заданий
+        """
+
+        self.batch = uuid.uuid4().hex
+        with JobQueue(self.queue_path) as queue:
+            for scan_config in self.scan_configs:
+                queue.put(self.batch, scan_config)
+
+        return self.batch
+
+    def wait(self, poll_interval: float = JOB_POLL_INTERVAL, timeout: float | None = None) -> bool:
+        """
+        Метод ожидания завершения всех заданий набора
+
+        :param poll_interval: Интервал опроса очереди в секундах
+        :param timeout: Максимальное время ожидания в секундах
+        :return: Завершены ли все задания
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with JobQueue(self.queue_path, max_attempts=self.max_attempts) as queue:
+            while True:
+                counts = queue.get_status_counts(self.batch)
+                if not counts.get(JobStatus.PENDING) and not counts.get(JobStatus.LEASED):
+                    return True
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+
+                time.sleep(poll_interval)
+
+    def collect(self) -> None:
+        """Метод объединения результатов выполненных заданий"""
+
+        with JobQueue(self.queue_path) as queue:
+            for _, result in queue.get_results(self.batch):
+                for rows in result.values():
+                    merge_found_vulnerabilities(self.found_vulnerabilities, make_found_vulnerabilities(rows))
+
+            self.errors = queue.get_errors(self.batch)
+
+    def make_report(self) -> None:
+        """Метод составления отчета о результатах сканирования"""
+
+        reporter = Reporter(
+            detected_vulnerabilities=make_detected_vulnerabilities(self.found_vulnerabilities),
+            vulnerabilities_package_path=self.vulners_package_dir,
+            report_type=self.report_type,
+            db_path=self.db_path,
+        )
+
+        self.report = reporter.generate_report()
+
+
+class ScanWorker:
+    """Класс обработчика заданий распределенного сканирования"""
+
+    def __init__(
+            self,
+            queue_path: Path | str,
+            db_path: str | Path,
+            data_dir: Path,
+            vulners_package_dir: Path,
+            cache_path: str | Path | None = None,
+            worker_id: str | None = None,
+            lease_timeout: float = JOB_LEASE_TIMEOUT,
+    ) -> None:
+        """
+        Инициализация объекта класса
+
+        :param queue_path: Путь до файла очереди
+        :param db_path: Путь до файла с БД
+        :param data_dir: Директория для сохранения данных проектов
+        :param vulners_package_dir: Директория с пакетом уязвимостей
+        :param cache_path: Путь до файла с кэшем результатов сопоставления (по умолчанию кэш отключен)
+        :param worker_id: Идентификатор обработчика (по умолчанию имя хоста и PID)
+        :param lease_timeout: Время аренды задания в секундах
+        """
+
+        self.queue_path = queue_path
+        self.db_path = db_path
+        self.data_dir = data_dir
+        self.vulners_package_dir = vulners_package_dir
+        self.cache_path = cache_path
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.lease_timeout = lease_timeout
+        self.processed = 0
+        # Задания, аренда которых была потеряна до сохранения результата: их результаты отброшены
+        self.lost_jobs = []
+
+    def run(
+            self,
+            max_jobs: int | None = None,
+            idle_timeout: float | None = None,
+            poll_interval: float = JOB_POLL_INTERVAL,
+    ) -> None:
+        """
+        Метод обработки заданий из очереди
+
+        :param max_jobs: Максимальное количество заданий, после которого обработчик завершается
+        :param idle_timeout: Время без заданий в секундах, после которого обработчик завершается
+        :param poll_interval: Интервал опроса пустой очереди в секундах
+        """
+
+        idle_since = time.monotonic()
+        with JobQueue(self.queue_path, lease_timeout=self.lease_timeout) as queue:
+            while max_jobs is None or self.processed < max_jobs:
+                job = queue.lease(self.worker_id)
+                if job is None:
+                    if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                        return
+
+                    time.sleep(poll_interval)
+                    continue
+
+                job_id, scan_config = job
+                try:
+                    result = self.process(job_id, scan_config)
+                except Exception as error:
+                    queue.fail(job_id, self.worker_id, repr(error))
+                else:
+                    # Задание уже передано другому обработчику, его результат важнее устаревшего
+                    if not queue.complete(job_id, self.worker_id, result):
+                        self.lost_jobs.append(job_id)
+
+                self.processed += 1
+                idle_since = time.monotonic()
+
+    def process(self, job_id: int, scan_config: ScanConfigSchema) -> dict[str, list[tuple]]:
+        """
+        Метод выполнения одного задания с продлением аренды на время сканирования
+
+        Файлы проектов сохраняются в отдельную директорию задания, поэтому обработчики
+        с общей data_dir не перезаписывают файлы одноименных проектов друг друга.
+
+        :param job_id: Идентификатор задания
+        :param scan_config: Конфигурация сканирования
+        :return: Строки найденных уязвимостей по имени проекта
+        """
+
+        stopped = threading.Event()
+        keeper = threading.Thread(target=self.keep_lease, args=(job_id, stopped), daemon=True)
+        keeper.start()
+        job_dir = self.data_dir / 'jobs' / uuid.uuid4().hex
+        try:
+            scanner = DependencySecurityScanner(
+                scan_config=scan_config,
+                db_path=self.db_path,
+                data_dir=job_dir,
+                vulners_package_dir=self.vulners_package_dir,
+                cache_path=self.cache_path,
+            )
+            try:
+                return {
+                    project.name: make_finding_rows(found_vulnerabilities)
+                    for project, found_vulnerabilities in scanner.iter_project_vulnerabilities()
+                }
+            finally:
+                scanner.scanner.close_connection()
+        finally:
+            stopped.set()
+            keeper.join()
+            delete_dir(job_dir)
+
+    def keep_lease(self, job_id: int, stopped: threading.Event) -> None:
+        """
+        Метод периодического продления аренды задания
+
+        :param job_id: Идентификатор задания
+        :param stopped: Событие завершения задания
+        """
+
+        # Соединение sqlite привязано к потоку, поэтому у продления свое подключение к очереди
+        with JobQueue(self.queue_path, lease_timeout=self.lease_timeout) as queue:
+            while not stopped.wait(self.lease_timeout / 3):
+                if not queue.extend_lease(job_id, self.worker_id):
+                    return
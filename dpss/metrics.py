@@ -0,0 +1,186 @@
+"""
+Модуль сбора метрик сканирования: счетчиков и длительностей этапов
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import orjson
+
+from dpss.const import METRICS_PREFIX
+
+
+class Metrics:
+    """
+    Класс потокобезопасного набора счетчиков и таймеров с метками
+
+    Один объект передается всем компонентам сканирования, поэтому метрики
+    собираются в одном месте и выгружаются в формате Prometheus или JSON.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация набора метрик"""
+
+        self.counters = {}
+        self.timers = {}
+        self.lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1, **labels: str) -> None:
+        """
+        Метод увеличения счетчика
+
+        :param name: Имя счетчика
+        :param value: Величина увеличения
+        :param labels: Метки счетчика (например, host или project)
+        """
+
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """
+        Метод учета длительности операции
+
+        :param name: Имя таймера
+        :param seconds: Длительность в секундах
+        :param labels: Метки таймера
+        """
+
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            count, total, maximum = self.timers.get(key, (0, 0.0, 0.0))
+            self.timers[key] = (count + 1, total + seconds, max(maximum, seconds))
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """
+        Метод замера длительности блока кода
+
+        :param name: Имя таймера
+        :param labels: Метки таймера
+        """
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def get_counter(self, name: str, **labels: str) -> int:
+        """
+        Метод получения значения счетчика
+
+        :param name: Имя счетчика
+        :param labels: Метки счетчика; без меток возвращается сумма по всем меткам
+        :return: Значение счетчика
+        """
+
+        with self.lock:
+            if labels:
+                return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+            return sum(value for (counter_name, _), value in self.counters.items() if counter_name == name)
+
+    def pop_counters(self) -> dict[tuple[str, tuple], int]:
+        """
+        Метод получения накопленных счетчиков с их обнулением
+
+        :return: Словарь значений счетчиков по имени и меткам
+        """
+
+        with self.lock:
+            counters, self.counters = self.counters, {}
+
+        return counters
+
+    def merge_counters(self, counters: dict[tuple[str, tuple], int]) -> None:
+        """
+        Метод добавления счетчиков, собранных в другом процессе
+
+        :param counters: Словарь значений счетчиков по имени и меткам (см. pop_counters)
+        """
+
+        with self.lock:
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def to_dict(self) -> dict:
+        """
+        Метод выгрузки метрик в виде словаря
+
+        :return: Словарь со списками счетчиков и таймеров
+        """
+
+        with self.lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                'timers': [
+                    {'name': name, 'labels': dict(labels), 'count': count, 'sum': total, 'max': maximum}
+                    for (name, labels), (count, total, maximum) in sorted(self.timers.items())
+                ],
+            }
+
+    def to_json(self) -> bytes:
+        """
+        Метод выгрузки метрик в формате JSON
+
+        :return: Сериализованные метрики
+        """
+
+        return orjson.dumps(self.to_dict())
+
+    def to_prometheus(self) -> str:
+        """
+        Метод выгрузки метрик в текстовом формате Prometheus
+
+        :return: Текст метрик
+        """
+
+        data = self.to_dict()
+        lines = []
+        for name in dict.fromkeys(counter['name'] for counter in data['counters']):
+            metric = f'{METRICS_PREFIX}_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            for counter in data['counters']:
+                if counter['name'] == name:
+                    lines.append(f'{metric}{self.format_labels(counter["labels"])} {counter["value"]}')
+
+        for name in dict.fromkeys(timer['name'] for timer in data['timers']):
+            metric = f'{METRICS_PREFIX}_{name}_seconds'
+            lines.append(f'# TYPE {metric} summary')
+            for timer in data['timers']:
+                if timer['name'] == name:
+                    labels = self.format_labels(timer['labels'])
+                    lines.append(f'{metric}_count{labels} {timer["count"]}')
+                    lines.append(f'{metric}_sum{labels} {timer["sum"]:.6f}')
+
+            lines.append(f'# TYPE {metric}_max gauge')
+            for timer in data['timers']:
+                if timer['name'] == name:
+                    lines.append(f'{metric}_max{self.format_labels(timer["labels"])} {timer["max"]:.6f}')
+
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def format_labels(labels: dict) -> str:
+        """
+        Метод форматирования меток для Prometheus
+
+        :param labels: Метки
+        :return: Строка меток в фигурных скобках или пустая строка
+        """
+
+        if not labels:
+            return ''
+
+        escaped = (
+            '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in labels.items()
+        )
+        return '{' + ','.join(escaped) + '}'
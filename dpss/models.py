@@ -5,7 +5,6 @@
 import enum
 from datetime import datetime
 
-import paramiko
 from pydantic import (
     BaseModel,
     AnyUrl,
@@ -13,8 +12,7 @@ from pydantic import (
     ConfigDict,
 )
 
-from dpss.const import TIMESTAMP_FORMAT
-from dpss.reporter import ReportTypes
+from dpss.const import TIMESTAMP_FORMAT, ReportTypes
 
 
 class ProjectTypes(enum.StrEnum):
@@ -30,6 +28,7 @@ class ProjectConfigSchema(BaseModel):
     type: str = ProjectTypes.PYTHON
     dir: str
     description: str = ''
+    priority: int = 0
 
     model_config = ConfigDict(extra='forbid', arbitrary_types_allowed=True)
 
@@ -50,16 +49,6 @@ class ScanConfigSchema(BaseModel):
     model_config = ConfigDict(extra='forbid', arbitrary_types_allowed=True)
 
 
-class SSHResponseSchema(BaseModel):
-    """Схема ответа выполнения команды"""
-
-    stdin: paramiko.channel.ChannelStdinFile
-    stdout: paramiko.channel.ChannelFile
-    stderr: paramiko.channel.ChannelStderrFile
-
-    model_config = ConfigDict(extra='forbid', arbitrary_types_allowed=True)
-
-
 class SoftComponentSchema(BaseModel):
     """Схема описания программного компонента"""
 
@@ -109,6 +98,37 @@ class DetectedVulnerabilitySchema(BaseModel):
     model_config = ConfigDict(extra='forbid', arbitrary_types_allowed=True)
 
 
+class ProjectFindingsSchema(BaseModel):
+    """Схема найденных уязвимостей одного проекта"""
+
+    project: str
+    vulnerabilities: list[DetectedVulnerabilitySchema]
+    # Одноименные проекты разных хостов различаются по хосту
+    host: str | None = None
+
+    model_config = ConfigDict(extra='forbid', arbitrary_types_allowed=True)
+
+
+class ProjectDeltaSchema(BaseModel):
+    """Схема изменения уязвимостей проекта относительно предыдущего сканирования"""
+
+    project: str
+    new: list[DetectedVulnerabilitySchema]
+    resolved: list[DetectedVulnerabilitySchema]
+
+    model_config = ConfigDict(extra='forbid', arbitrary_types_allowed=True)
+
+
+class ScanDeltaSchema(BaseModel):
+    """Схема отчета об изменениях между сканированиями"""
+
+    name: str
+    date: str
+    projects: list[ProjectDeltaSchema]
+
+    model_config = ConfigDict(extra='forbid', arbitrary_types_allowed=True)
+
+
 class AffectedSoftSchema(BaseModel):
     """Схема валидации уязвимого софта"""
 
@@ -159,3 +179,22 @@ class ReportModelSchema(BaseModel):
     author: str | None = None
 
     model_config = ConfigDict(extra='forbid', arbitrary_types_allowed=True)
+
+
+def __getattr__(name: str) -> type:
+    """
+    Функция ленивого доступа к схемам, требующим тяжелых зависимостей
+
+    Схема ответа SSH команды объявлена в модуле сканера, чтобы paramiko
+    загружался только при сканировании удаленных хостов.
+
+    :param name: Имя атрибута модуля
+    :return: Класс схемы
+    """
+
+    if name == 'SSHResponseSchema':
+        from dpss.scanner import SSHResponseSchema
+
+        return SSHResponseSchema
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,189 @@
+"""
+Модуль конвейера с перекрывающимися стадиями обработки
+"""
+
+import queue
+import threading
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any, Callable, Iterable, Iterator
+
+from dpss.const import PIPELINE_QUEUE_SIZE
+
+_STOP = object()
+
+
+class PipelineStage:
+    """Класс описания стадии конвейера"""
+
+    def __init__(
+            self,
+            name: str,
+            handler: Callable[..., Any],
+            workers: int = 1,
+            context: Callable[[], AbstractContextManager] | None = None,
+    ) -> None:
+        """
+        Инициализация стадии
+
+        :param name: Имя стадии
+        :param handler: Обработчик элемента, возвращает результат для следующей стадии или None, чтобы его отбросить
+        :param workers: Количество потоков стадии
+        :param context: Фабрика контекста, который открывается в каждом потоке стадии и передается
+            обработчику вторым аргументом (например, соединение с БД)
+        """
+
+        if workers < 1:
+            raise ValueError(f'Stage {name} must have at least one worker')
+
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.context = context
+
+
+class StagedPipeline:
+    """Класс конвейера производитель/потребитель с ограниченными очередями между стадиями"""
+
+    def __init__(self, stages: list[PipelineStage], queue_size: int = PIPELINE_QUEUE_SIZE) -> None:
+        """
+        Инициализация конвейера
+
+        :param stages: Список стадий в порядке обработки
+        :param queue_size: Максимальный размер очереди между стадиями
+        """
+
+        if not stages:
+            raise ValueError('Pipeline must have at least one stage')
+
+        self.stages = stages
+        self.queue_size = queue_size
+        self.error: BaseException | None = None
+        self._abort = threading.Event()
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        """
+        Метод запуска конвейера
+
+        :param items: Входные элементы первой стадии
+        :return: Генератор результатов последней стадии в порядке их готовности
+        """
+
+        self.error = None
+        self._abort.clear()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)]
+        for index, stage in enumerate(self.stages):
+            next_workers = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for _ in range(stage.workers):
+                threads.append(
+                    threading.Thread(
+                        target=self._work,
+                        args=(stage, queues[index], queues[index + 1], next_workers, remaining, lock),
+                        name=f'dpss-{stage.name}',
+                        daemon=True,
+                    )
+                )
+
+        for thread in threads:
+            thread.start()
+
+        output = queues[-1]
+        item = None
+        try:
+            while (item := output.get()) is not _STOP:
+                yield item
+        finally:
+            if item is not _STOP:
+                # Потребитель прекратил чтение раньше времени, дочитываем очередь, чтобы потоки завершились
+                self._abort.set()
+                while output.get() is not _STOP:
+                    pass
+
+            for thread in threads:
+                thread.join()
+
+        if self.error is not None:
+            raise self.error
+
+    def _feed(self, items: Iterable[Any], first_queue: queue.Queue) -> None:
+        """
+        Метод подачи входных элементов в первую стадию
+
+        :param items: Входные элементы
+        :param first_queue: Очередь первой стадии
+        """
+
+        try:
+            for item in items:
+                if self._abort.is_set():
+                    break
+                first_queue.put(item)
+        except BaseException as error:
+            self._fail(error)
+        finally:
+            for _ in range(self.stages[0].workers):
+                first_queue.put(_STOP)
+
+    def _work(
+            self,
+            stage: PipelineStage,
+            input_queue: queue.Queue,
+            output_queue: queue.Queue,
+            next_workers: int,
+            remaining: list[int],
+            lock: threading.Lock,
+    ) -> None:
+        """
+        Метод работы одного потока стадии
+
+        :param stage: Стадия
+        :param input_queue: Входная очередь стадии
+        :param output_queue: Очередь следующей стадии
+        :param next_workers: Количество потоков следующей стадии
+        :param remaining: Счетчик еще работающих потоков стадии
+        :param lock: Блокировка счетчика
+        """
+
+        is_stopped = False
+        try:
+            with stage.context() if stage.context else nullcontext() as context:
+                while (item := input_queue.get()) is not _STOP:
+                    if self._abort.is_set():
+                        continue
+
+                    try:
+                        result = stage.handler(item, context) if stage.context else stage.handler(item)
+                    except BaseException as error:
+                        self._fail(error)
+                        continue
+
+                    if result is not None:
+                        output_queue.put(result)
+
+                is_stopped = True
+        except BaseException as error:
+            self._fail(error)
+            # Ошибка контекста стадии: освобождаем входную очередь, чтобы не блокировать предыдущую стадию
+            while not is_stopped and input_queue.get() is not _STOP:
+                pass
+        finally:
+            with lock:
+                remaining[0] -= 1
+                is_last_worker = not remaining[0]
+
+            if is_last_worker:
+                for _ in range(next_workers):
+                    output_queue.put(_STOP)
+
+    def _fail(self, error: BaseException) -> None:
+        """
+        Метод фиксации первой ошибки и остановки обработки
+
+        :param error: Возникшая ошибка
+        """
+
+        if self.error is None:
+            self.error = error
+        self._abort.set()
@@ -0,0 +1,239 @@
+"""
+Модуль легковесных внутренних записей для горячего пути сопоставления
+
+Записи не проходят валидацию pydantic, схемы из dpss.models создаются
+из них только на границе публичного API.
+"""
+
+from dpss.models import (
+    VulnerableIntervalSchema,
+    DetectedSoftSchema,
+    DetectedVulnerabilitySchema,
+    ProjectFindingsSchema,
+    VersionBorder,
+)
+
+
+class VulnerableInterval:
+    """Запись границ уязвимого интервала"""
+
+    __slots__ = ('left_border', 'left_version', 'right_version', 'right_border')
+
+    def __init__(self, left_border: str, left_version: str, right_version: str, right_border: str) -> None:
+        """
+        Инициализация записи
+
+        :param left_border: Условие левой границы
+        :param left_version: Версия левой границы
+        :param right_version: Версия правой границы
+        :param right_border: Условие правой границы
+        """
+
+        self.left_border = left_border
+        self.left_version = left_version
+        self.right_version = right_version
+        self.right_border = right_border
+
+    def __repr__(self) -> str:
+        """Строковое представление записи"""
+
+        return (
+            f'VulnerableInterval({self.left_border} {self.left_version}, '
+            f'{self.right_border} {self.right_version})'
+        )
+
+    def to_schema(self, validate: bool = False) -> VulnerableIntervalSchema:
+        """
+        Метод преобразования в схему
+
+        :param validate: Флаг необходимости валидации (по умолчанию данные из БД считаются корректными)
+        :return: Схема уязвимого интервала
+        """
+
+        factory = VulnerableIntervalSchema if validate else VulnerableIntervalSchema.model_construct
+        return factory(
+            left_border=VersionBorder(self.left_border),
+            right_version=self.right_version,
+            left_version=self.left_version,
+            right_border=VersionBorder(self.right_border),
+        )
+
+
+class DetectedSoft:
+    """Запись найденного уязвимого софта"""
+
+    __slots__ = ('name', 'version', 'vulnerable_interval')
+
+    def __init__(self, name: str, version: str, vulnerable_interval: VulnerableInterval) -> None:
+        """
+        Инициализация записи
+
+        :param name: Имя пакета
+        :param version: Версия пакета
+        :param vulnerable_interval: Уязвимый интервал
+        """
+
+        self.name = name
+        self.version = version
+        self.vulnerable_interval = vulnerable_interval
+
+    def __repr__(self) -> str:
+        """Строковое представление записи"""
+
+        return f'DetectedSoft({self.name}=={self.version}, {self.vulnerable_interval!r})'
+
+    def to_schema(self, validate: bool = False) -> DetectedSoftSchema:
+        """
+        Метод преобразования в схему
+
+        :param validate: Флаг необходимости валидации
+        :return: Схема найденного уязвимого софта
+        """
+
+        factory = DetectedSoftSchema if validate else DetectedSoftSchema.model_construct
+        return factory(
+            vulnerable_interval=self.vulnerable_interval.to_schema(validate),
+            name=self.name,
+            version=self.version,
+        )
+
+
+def make_detected_vulnerability(
+        vulner_id: str,
+        source_name: str,
+        affected_soft: list[DetectedSoft],
+        validate: bool = False,
+) -> DetectedVulnerabilitySchema:
+    """
+    Функция построения схемы найденной уязвимости из внутренних записей
+
+    :param vulner_id: Идентификатор уязвимости
+    :param source_name: Источник уязвимости
+    :param affected_soft: Записи уязвимого софта
+    :param validate: Флаг необходимости валидации
+    :return: Схема найденной уязвимости
+    """
+
+    factory = DetectedVulnerabilitySchema if validate else DetectedVulnerabilitySchema.model_construct
+    return factory(
+        vulner_id=vulner_id,
+        source_name=source_name,
+        affected_soft=[soft.to_schema(validate) for soft in affected_soft],
+    )
+
+
+def make_detected_vulnerabilities(found_vulnerabilities: dict) -> list[DetectedVulnerabilitySchema]:
+    """
+    Функция преобразования сгруппированных уязвимостей в схемы
+
+    :param found_vulnerabilities: Найденные уязвимости, сгруппированные по идентификатору
+    :return: Список найденных уязвимостей
+    """
+
+    return [
+        make_detected_vulnerability(
+            vulner_id=vulnerability,
+            source_name=data['source'],
+            affected_soft=data['soft'],
+        )
+        for vulnerability, data in found_vulnerabilities.items()
+    ]
+
+
+def make_project_findings(
+        project_name: str,
+        found_vulnerabilities: dict,
+        host: str | None = None,
+) -> ProjectFindingsSchema:
+    """
+    Функция построения схемы уязвимостей проекта
+
+    :param project_name: Имя проекта
+    :param found_vulnerabilities: Найденные уязвимости, сгруппированные по идентификатору
+    :param host: Хост проекта
+    :return: Схема уязвимостей проекта
+    """
+
+    return ProjectFindingsSchema.model_construct(
+        project=project_name,
+        vulnerabilities=make_detected_vulnerabilities(found_vulnerabilities),
+        host=host,
+    )
+
+
+def merge_found_vulnerabilities(merged_vulnerabilities: dict, found_vulnerabilities: dict) -> None:
+    """
+    Функция объединения найденных уязвимостей с общим результатом сканирования
+
+    :param merged_vulnerabilities: Общий результат сканирования, сгруппированный по идентификатору; дополняется на месте
+    :param found_vulnerabilities: Найденные уязвимости, сгруппированные по идентификатору
+    """
+
+    for vulnerability, data in found_vulnerabilities.items():
+        if not merged_vulnerabilities.get(vulnerability):
+            merged_vulnerabilities[vulnerability] = dict(
+                id=vulnerability,
+                source=data['source'],
+                soft=[],
+            )
+
+        merged_vulnerabilities[vulnerability]['soft'].extend(data['soft'])
+
+
+def make_finding_rows(found_vulnerabilities: dict) -> list[tuple]:
+    """
+    Функция преобразования сгруппированных уязвимостей в плоские строки для хранения
+
+    :param found_vulnerabilities: Найденные уязвимости, сгруппированные по идентификатору
+    :return: Список строк (уязвимость, источник, имя, версия, границы интервала)
+    """
+
+    rows = []
+    for vulnerability, data in found_vulnerabilities.items():
+        for soft in data['soft']:
+            interval = soft.vulnerable_interval
+            rows.append((
+                vulnerability,
+                data['source'],
+                soft.name,
+                soft.version,
+                interval.left_border,
+                interval.left_version,
+                interval.right_version,
+                interval.right_border,
+            ))
+
+    return rows
+
+
+def make_found_vulnerabilities(rows: list[tuple]) -> dict:
+    """
+    Функция группировки плоских строк найденных уязвимостей по идентификатору
+
+    :param rows: Список строк (уязвимость, источник, имя, версия, границы интервала)
+    :return: Найденные уязвимости, сгруппированные по идентификатору
+    """
+
+    found_vulnerabilities = {}
+    for vulnerability, source, name, version, opener, version_left, version_right, closer in rows:
+        if not found_vulnerabilities.get(vulnerability):
+            found_vulnerabilities[vulnerability] = dict(
+                id=vulnerability,
+                source=source,
+                soft=[],
+            )
+
+        found_vulnerabilities[vulnerability]['soft'].append(
+            DetectedSoft(
+                name=name,
+                version=version,
+                vulnerable_interval=VulnerableInterval(
+                    left_border=opener,
+                    left_version=version_left,
+                    right_version=version_right,
+                    right_border=closer,
+                ),
+            )
+        )
+
+    return found_vulnerabilities
@@ -1,9 +1,22 @@
-import enum
+import io
+import itertools
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
+from typing import Iterable, Iterator, TextIO
 
-from dpss.const import TIMESTAMP_FORMAT
-from dpss.utils import orjson_load_file
+from dpss.const import TIMESTAMP_FORMAT, SEVERITY_LEVELS, ReportTypes
+from dpss.feed import open_feed, get_advisory_file_name
+from dpss.metrics import Metrics
+from dpss.utils import make_path_from_str, prepare_output_dir, get_max_severity, normalize_package_name
+from dpss.writers import (
+    ReportWriter,
+    HTMLReportWriter,
+    MarkdownReportWriter,
+    JSONReportWriter,
+    JSONLinesReportWriter,
+)
+from dpss.vulnerdb import VulnerabilityDB
 from dpss.models import (
     DetectedVulnerabilitySchema,
     ReportModelSchema,
@@ -13,28 +26,29 @@ from dpss.models import (
 )
 
 
-class ReportTypes(enum.StrEnum):
-    """Типы отчетов"""
-
-    JSON: str = 'json'
-    HTML: str = 'html'
-    MARKDOWN: str = 'markdown'
-
-
 class Reporter:
     """Класс работы с отчетами"""
 
     def __init__(
             self,
-            detected_vulnerabilities: list[DetectedVulnerabilitySchema],
-            vulnerabilities_package_path: str | Path,
+            detected_vulnerabilities: Iterable[DetectedVulnerabilitySchema],
+            vulnerabilities_package_path: str | Path | None = None,
             report_type: str = ReportTypes.JSON,
+            db_path: str | Path | None = None,
+            output: str | Path | TextIO | None = None,
+            metrics: Metrics | None = None,
     ) -> None:
         """
         Инициализация класса
 
-        :param detected_vulnerabilities: Список найденных уязвимостей
+        :param detected_vulnerabilities: Найденные уязвимости, можно передать генератор для потоковых отчетов
+        :param vulnerabilities_package_path: Путь до пакета уязвимостей: директории, zip или tar архива
         :param report_type: Тип отчета
+        :param db_path: Путь до файла с БД, из которой берется подробная информация об уязвимостях
+        :param output: Путь до файла или поток для записи отчета (бинарный для JSON и JSON Lines).
+            JSON отчет без output возвращается схемой ReportModelSchema, остальные строкой.
+            JSON Lines дописывается в конец существующего файла
+        :param metrics: Набор метрик для учета времени генерации и прочитанных файлов пакета
         """
 
         self.type = report_type
@@ -42,30 +56,92 @@ class Reporter:
         self.vulnerabilities_package_path = vulnerabilities_package_path
         if isinstance(self.vulnerabilities_package_path, str):
             self.vulnerabilities_package_path = Path(vulnerabilities_package_path)
+        self.db_path = db_path
+        self.output = output
+        self.metrics = metrics or Metrics()
+        self.feed = None
 
     def generate_report(self) -> ReportModelSchema | str | None:
         """Метод генерации отчета"""
 
         report = None
-        match self.type:
-            case ReportTypes.JSON:
-                report = self.__generate_report_json()
-            case ReportTypes.HTML:
-                report = self.__generate_report_html()
-            case ReportTypes.MARKDOWN:
-                report = self.__generate_report_markdown()
+        try:
+            with self.metrics.timer('report_generate', type=self.type):
+                match self.type:
+                    case ReportTypes.JSON if self.output is None:
+                        report = self.__generate_report_json()
+                    case ReportTypes.JSON:
+                        report = self.__write_report(JSONReportWriter)
+                    case ReportTypes.JSONL:
+                        report = self.__write_report(JSONLinesReportWriter)
+                    case ReportTypes.HTML:
+                        report = self.__generate_report_html()
+                    case ReportTypes.MARKDOWN:
+                        report = self.__generate_report_markdown()
+        finally:
+            if self.feed is not None:
+                self.feed.close()
+                self.feed = None
 
         return report
 
-    def __generate_report_html(self) -> str:
-        """Метод генерации отчета HTML"""
+    def __generate_report_html(self) -> str | None:
+        """
+        Метод генерации отчета HTML
+
+        :return: Текст отчета или None, если отчет записан в output
+        """
 
-        pass
+        return self.__write_report(HTMLReportWriter)
 
-    def __generate_report_markdown(self) -> str:
-        """Метод генерации отчета MARKDOWN"""
+    def __generate_report_markdown(self) -> str | None:
+        """
+        Метод генерации отчета MARKDOWN
+
+        :return: Текст отчета или None, если отчет записан в output
+        """
+
+        return self.__write_report(MarkdownReportWriter)
+
+    def __write_report(self, writer_class: type[ReportWriter]) -> str | None:
+        """
+        Метод потоковой записи отчета по мере обработки уязвимостей
+
+        :param writer_class: Класс записи отчета
+        :return: Текст отчета или None, если отчет записан в output
+        """
 
-        pass
+        if isinstance(self.output, (str, Path)):
+            output_path = make_path_from_str(self.output)
+            prepare_output_dir(output_path.parent)
+            mode = ('a' if writer_class.append else 'w') + ('b' if writer_class.binary else '')
+            encoding = None if writer_class.binary else 'UTF-8'
+            with output_path.open(mode, encoding=encoding) as output:
+                self.__write_report_to(writer_class(output))
+            return None
+
+        if self.output is not None:
+            self.__write_report_to(writer_class(self.output))
+            return None
+
+        output = io.BytesIO() if writer_class.binary else io.StringIO()
+        self.__write_report_to(writer_class(output))
+        report = output.getvalue()
+
+        return report.decode() if writer_class.binary else report
+
+    def __write_report_to(self, writer: ReportWriter) -> None:
+        """
+        Метод записи отчета
+
+        :param writer: Объект записи отчета
+        """
+
+        make_vulner = self.__make_vulner_dict if writer.binary else self.__make_vulner_data
+        writer.write_header(datetime.now().strftime(TIMESTAMP_FORMAT))
+        for vulner, pkg_vulner_data in self.__iter_vulner_details():
+            writer.write_vulnerability(make_vulner(vulner, pkg_vulner_data))
+        writer.write_footer()
 
     def __generate_report_json(self) -> ReportModelSchema:
         """
@@ -75,29 +151,141 @@ class Reporter:
         """
 
         report = ReportModelSchema(creation_date=datetime.now().strftime(TIMESTAMP_FORMAT))
-        for vulner in self.vulnerabilities:
-            file_name = f'{vulner.source_name}.{vulner.vulner_id}.{vulner.vulner_id}.json'
-            pkg_vulner_data = orjson_load_file(self.vulnerabilities_package_path / file_name)
-
-            ratings = self.__get_ratings_data(pkg_vulner_data['ratings'])
-            affected_soft = self.__get_affected_pkgs_data(vulner)
-
-            report.vulnerabilities.append(
-                VulnerDataSchema(
-                    identifier=pkg_vulner_data['identifier'],
-                    published=pkg_vulner_data['published'],
-                    source_name=pkg_vulner_data['source'][0]['source_name'],
-                    source_url=pkg_vulner_data['source'][0]['source_url'],
-                    description=pkg_vulner_data['description'],
-                    affected_packages=affected_soft,
-                    cwes=pkg_vulner_data['cwes'],
-                    ratings=ratings,
-                    references=pkg_vulner_data['references'],
-                )
-            )
+        for vulner, pkg_vulner_data in self.__iter_vulner_details():
+            report.vulnerabilities.append(self.__make_vulner_data(vulner, pkg_vulner_data))
 
         return report
 
+    def __iter_vulner_details(self) -> Iterator[tuple[DetectedVulnerabilitySchema, dict]]:
+        """
+        Метод получения подробной информации об уязвимостях отчета
+
+        Подробности запрашиваются из БД пачками, поэтому в памяти одновременно
+        находится информация только об одной пачке уязвимостей.
+
+        :return: Генератор найденных уязвимостей и подробной информации о них
+        """
+
+        vulnerabilities = iter(self.vulnerabilities)
+        vulner_db = None
+        if self.db_path is not None:
+            vulner_db = VulnerabilityDB(
+                db_path=self.db_path,
+                package_folder=self.vulnerabilities_package_path,
+                metrics=self.metrics,
+            )
+
+        with vulner_db or nullcontext():
+            while batch := list(itertools.islice(vulnerabilities, VulnerabilityDB.QUERY_BATCH_SIZE)):
+                vulnerabilities_details = {}
+                if vulner_db is not None:
+                    vulnerabilities_details = vulner_db.get_vulnerability_details(
+                        [vulner.vulner_id for vulner in batch]
+                    )
+
+                for vulner in batch:
+                    pkg_vulner_data = vulnerabilities_details.get(vulner.vulner_id)
+                    if pkg_vulner_data is None:
+                        pkg_vulner_data = self.__load_vulnerability_details(vulner)
+
+                    yield vulner, pkg_vulner_data
+
+    def __make_vulner_data(self, vulner: DetectedVulnerabilitySchema, pkg_vulner_data: dict) -> VulnerDataSchema:
+        """
+        Метод построения информации об уязвимости для отчета
+
+        :param vulner: Объект найденной уязвимости
+        :param pkg_vulner_data: Подробная информация об уязвимости
+        :return: Информация об уязвимости
+        """
+
+        ratings = self.__get_ratings_data(pkg_vulner_data['ratings'])
+        affected_soft = self.__get_affected_pkgs_data(vulner)
+
+        return VulnerDataSchema(
+            identifier=pkg_vulner_data['identifier'],
+            published=pkg_vulner_data['published'],
+            source_name=pkg_vulner_data['source_name'],
+            source_url=pkg_vulner_data['source_url'],
+            description=pkg_vulner_data['description'],
+            affected_packages=affected_soft,
+            cwes=pkg_vulner_data['cwes'],
+            ratings=ratings,
+            references=pkg_vulner_data['references'],
+        )
+
+    @staticmethod
+    def __make_vulner_dict(vulner: DetectedVulnerabilitySchema, pkg_vulner_data: dict) -> dict:
+        """
+        Метод построения информации об уязвимости в виде словаря без схем pydantic
+
+        :param vulner: Объект найденной уязвимости
+        :param pkg_vulner_data: Подробная информация об уязвимости
+        :return: Словарь той же структуры, что и VulnerDataSchema
+        """
+
+        return {
+            'identifier': pkg_vulner_data['identifier'],
+            'published': pkg_vulner_data['published'],
+            'source_name': pkg_vulner_data['source_name'],
+            'source_url': pkg_vulner_data['source_url'],
+            'description': pkg_vulner_data['description'],
+            'affected_packages': [
+                {
+                    'name': soft.name,
+                    'version': soft.version,
+                    'type': None,
+                    'vendor': None,
+                    'vulnerable_interval': {
+                        'left_border': soft.vulnerable_interval.left_border,
+                        'right_version': soft.vulnerable_interval.right_version,
+                        'left_version': soft.vulnerable_interval.left_version,
+                        'right_border': soft.vulnerable_interval.right_border,
+                    },
+                }
+                for soft in vulner.affected_soft
+            ],
+            'cwes': pkg_vulner_data['cwes'],
+            'ratings': [
+                {
+                    'method': 'CVSS',
+                    'score': rating['score'],
+                    'severity': rating['severity'],
+                    'source_name': rating['source_name'],
+                    'source_url': rating['source_url'],
+                    'vector': rating['vector'],
+                    'version': rating['version'],
+                }
+                for rating in pkg_vulner_data['ratings']
+            ],
+            'references': pkg_vulner_data['references'],
+        }
+
+    def __load_vulnerability_details(self, vulner: DetectedVulnerabilitySchema) -> dict:
+        """
+        Метод чтения подробной информации об уязвимости из файла пакета
+
+        :param vulner: Объект найденной уязвимости
+        :return: Словарь с информацией для отчета
+        """
+
+        if self.feed is None:
+            self.feed = open_feed(self.vulnerabilities_package_path)
+
+        pkg_vulner_data = self.feed.load(get_advisory_file_name(vulner.source_name, vulner.vulner_id))
+        self.metrics.increment('advisory_files_read')
+
+        return {
+            'identifier': pkg_vulner_data['identifier'],
+            'published': pkg_vulner_data['published'],
+            'source_name': pkg_vulner_data['source'][0]['source_name'],
+            'source_url': pkg_vulner_data['source'][0]['source_url'],
+            'description': pkg_vulner_data['description'],
+            'cwes': pkg_vulner_data['cwes'],
+            'ratings': pkg_vulner_data['ratings'],
+            'references': pkg_vulner_data['references'],
+        }
+
     @staticmethod
     def __get_ratings_data(pkg_vulner_rating: dict) -> list:
         """
@@ -143,3 +331,160 @@ class Reporter:
             )
 
         return affected_soft
+
+
+class LazyReport:
+    """
+    Класс ленивого отчета с постраничным доступом
+
+    Хранит только компактные сведения о найденных уязвимостях, а подробная
+    информация загружается лишь для запрошенной страницы.
+    """
+
+    def __init__(
+            self,
+            detected_vulnerabilities: Iterable[DetectedVulnerabilitySchema],
+            vulnerabilities_package_path: str | Path | None = None,
+            db_path: str | Path | None = None,
+            severities: dict[str, str] | None = None,
+    ) -> None:
+        """
+        Инициализация класса
+
+        :param detected_vulnerabilities: Найденные уязвимости
+        :param vulnerabilities_package_path: Путь до пакета уязвимостей: директории, zip или tar архива
+        :param db_path: Путь до файла с БД, из которой берется подробная информация об уязвимостях
+        :param severities: Уже известная критичность уязвимостей по идентификатору
+        """
+
+        self.vulnerabilities = list(detected_vulnerabilities)
+        self.vulnerabilities_package_path = vulnerabilities_package_path
+        self.db_path = db_path
+        self.severities = severities
+
+    def __len__(self) -> int:
+        """Количество уязвимостей в отчете"""
+
+        return len(self.vulnerabilities)
+
+    def get_severities(self) -> dict[str, str]:
+        """
+        Метод получения наивысшей критичности уязвимостей отчета
+
+        Критичность берется из БД одним пачечным запросом без загрузки описаний,
+        из пакета уязвимостей читаются только отсутствующие в БД уязвимости.
+
+        :return: Словарь с критичностью по идентификатору уязвимости
+        """
+
+        if self.severities is not None:
+            return self.severities
+
+        vulner_ids = [vulner.vulner_id for vulner in self.vulnerabilities]
+        self.severities = {}
+        if self.db_path is not None:
+            with VulnerabilityDB(db_path=self.db_path, package_folder=self.vulnerabilities_package_path) as vulner_db:
+                self.severities = vulner_db.get_vulnerability_severities(vulner_ids)
+
+        missing_vulnerabilities = [
+            vulner for vulner in self.vulnerabilities if vulner.vulner_id not in self.severities
+        ]
+        if missing_vulnerabilities:
+            with open_feed(self.vulnerabilities_package_path) as feed:
+                for vulner in missing_vulnerabilities:
+                    pkg_vulner_data = feed.load(get_advisory_file_name(vulner.source_name, vulner.vulner_id))
+                    self.severities[vulner.vulner_id] = get_max_severity(
+                        rating.get('severity') for rating in pkg_vulner_data.get('ratings') or []
+                    )
+
+        return self.severities
+
+    def summary(self) -> dict[str, int]:
+        """
+        Метод подсчета количества уязвимостей по критичности
+
+        :return: Словарь с количеством уязвимостей для каждого уровня критичности
+        """
+
+        severities = self.get_severities()
+        counts = dict.fromkeys(SEVERITY_LEVELS, 0)
+        for vulner in self.vulnerabilities:
+            counts[severities[vulner.vulner_id]] += 1
+
+        return counts
+
+    def filter(
+            self,
+            severity: str | Iterable[str] | None = None,
+            package: str | None = None,
+    ) -> 'LazyReport':
+        """
+        Метод фильтрации уязвимостей отчета
+
+        :param severity: Уровень или уровни критичности
+        :param package: Имя уязвимого пакета
+        :return: Новый ленивый отчет с отфильтрованными уязвимостями
+        """
+
+        vulnerabilities = self.vulnerabilities
+        if package is not None:
+            pkg_name = normalize_package_name(package)
+            vulnerabilities = [
+                vulner for vulner in vulnerabilities
+                if any(normalize_package_name(soft.name) == pkg_name for soft in vulner.affected_soft)
+            ]
+
+        if severity is not None:
+            levels = {severity} if isinstance(severity, str) else set(severity)
+            levels = {level.lower() for level in levels}
+            severities = self.get_severities()
+            vulnerabilities = [vulner for vulner in vulnerabilities if severities[vulner.vulner_id] in levels]
+
+        return LazyReport(
+            detected_vulnerabilities=vulnerabilities,
+            vulnerabilities_package_path=self.vulnerabilities_package_path,
+            db_path=self.db_path,
+            severities=self.severities,
+        )
+
+    def page(self, number: int, size: int = 50) -> ReportModelSchema:
+        """
+        Метод получения страницы отчета с подробной информацией
+
+        :param number: Номер страницы, начиная с 1
+        :param size: Количество уязвимостей на странице
+        :return: Отчет с уязвимостями страницы
+        """
+
+        if number < 1 or size < 1:
+            raise ValueError('Page number and size must be positive')
+
+        start = (number - 1) * size
+        reporter = Reporter(
+            detected_vulnerabilities=self.vulnerabilities[start:start + size],
+            vulnerabilities_package_path=self.vulnerabilities_package_path,
+            db_path=self.db_path,
+        )
+
+        return reporter.generate_report()
+
+    def pages(self, size: int = 50) -> Iterator[ReportModelSchema]:
+        """
+        Метод последовательного получения всех страниц отчета
+
+        :param size: Количество уязвимостей на странице
+        :return: Генератор страниц отчета
+        """
+
+        for number in range(1, self.page_count(size) + 1):
+            yield self.page(number, size)
+
+    def page_count(self, size: int = 50) -> int:
+        """
+        Метод подсчета количества страниц
+
+        :param size: Количество уязвимостей на странице
+        :return: Количество страниц
+        """
+
+        return -(-len(self.vulnerabilities) // size)
@@ -3,15 +3,50 @@
 """
 
 import json
+import math
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator
 
 from dpss.utils import orjson_dump_file, orjson_load_file
-from dpss.models import SoftComponentSchema, DetectedSoftSchema, DetectedVulnerabilitySchema, ReportModelSchema
-from dpss.const import REQUIREMENTS_FILE
-from dpss.vulnerdb import VulnerabilityDB
-from dpss.utils import check_is_vulnerable
-from dpss.reporter import Reporter
+from dpss.models import SoftComponentSchema, DetectedVulnerabilitySchema, ReportModelSchema
+from dpss.records import DetectedSoft, make_detected_vulnerability
+from dpss.const import REQUIREMENTS_FILE, MATCH_SHARDS_PER_PROCESS
+from dpss.metrics import Metrics
+
+if TYPE_CHECKING:
+    from dpss.reporter import LazyReport
+    from dpss.vulnerdb import VulnerabilityDB
+
+# Подключение к БД процесса сопоставления, открывается при запуске процесса пула
+_match_worker_db = None
+
+
+def init_match_worker(db_path: str | Path) -> None:
+    """
+    Функция инициализации процесса сопоставления: открытие БД только для чтения
+
+    :param db_path: Путь до файла с БД
+    """
+
+    from dpss.vulnerdb import VulnerabilityDB
+
+    global _match_worker_db
+    _match_worker_db = VulnerabilityDB(db_path=db_path, read_only=True, metrics=Metrics()).__enter__()
+
+
+def match_shard(components: list[tuple[str, str]]) -> tuple[list[list[tuple]], dict[tuple[str, tuple], int]]:
+    """
+    Функция сопоставления части уникальных компонентов в процессе пула
+
+    :param components: Список пар из имени и версии пакета
+    :return: Строки БД с подходящими интервалами для каждой пары и счетчики сопоставления этой части
+    """
+
+    shard_rows = [_match_worker_db.get_matched_rows(name, version) for name, version in components]
+    return shard_rows, _match_worker_db.metrics.pop_counters()
+
 
 class GeneratorSBOM:
     """Класс генератора SBOM"""
@@ -22,6 +57,7 @@ class GeneratorSBOM:
             source_path: str | Path = './',
             output_path: str | Path = './',
             sbom_generator_app: str = 'cyclonedx-py',
+            metrics: Metrics | None = None,
     ) -> None:
         """
         Инициализация генератора SBOM
@@ -30,12 +66,14 @@ class GeneratorSBOM:
         :param source_path: Путь до источника информации для SBOM
         :param output_path: Путь для сохранения информации SBOM
         :param sbom_generator_app: Способ генерации SBOM
+        :param metrics: Набор метрик для учета запусков генератора
         """
 
         self.source_type = source_type
         self.sbom_generator_app = sbom_generator_app
         self.source_path = Path(source_path) if isinstance(source_path, str) else source_path
         self.output_path = Path(output_path) if isinstance(output_path, str) else output_path
+        self.metrics = metrics or Metrics()
 
     def generate_sbom(self, is_need_dump_file: bool = False) -> None:
         """
@@ -45,32 +83,72 @@ class GeneratorSBOM:
         :return: Словарь полученный при генерации SBOM
         """
 
-        requirements_file_path = self.source_path / REQUIREMENTS_FILE
-        command = [self.sbom_generator_app, self.source_type, requirements_file_path]
-        command_result = subprocess.run(command, capture_output=True, text=True)
+        self.metrics.increment('sbom_subprocesses')
+        with self.metrics.timer('sbom_generate'):
+            command_result = subprocess.run(self.get_command(), capture_output=True, text=True)
         sbom_data = json.loads(command_result.stdout)
 
         if is_need_dump_file:
-            orjson_dump_file(
-                output_dir=self.output_path,
-                filename='sbom.json',
-                data=sbom_data,
+            self.dump_sbom(sbom_data)
+
+        return sbom_data
+
+    async def generate_sbom_async(self, is_need_dump_file: bool = False) -> dict:
+        """
+        Метод асинхронной генерации SBOM
+
+        :param is_need_dump_file: Флаг необходимости записи SBOM в файл
+        :return: Словарь полученный при генерации SBOM
+        """
+
+        import asyncio
+
+        self.metrics.increment('sbom_subprocesses')
+        with self.metrics.timer('sbom_generate'):
+            process = await asyncio.create_subprocess_exec(
+                *self.get_command(),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
             )
+            stdout, _ = await process.communicate()
+        sbom_data = json.loads(stdout)
+
+        if is_need_dump_file:
+            await asyncio.to_thread(self.dump_sbom, sbom_data)
 
         return sbom_data
 
+    def get_command(self) -> list[str | Path]:
+        """Метод получения команды генерации SBOM"""
+
+        requirements_file_path = self.source_path / REQUIREMENTS_FILE
+        return [self.sbom_generator_app, self.source_type, requirements_file_path]
+
+    def dump_sbom(self, sbom_data: dict) -> None:
+        """
+        Метод записи SBOM в файл
+
+        :param sbom_data: Словарь SBOM
+        """
+
+        orjson_dump_file(
+            output_dir=self.output_path,
+            filename='sbom.json',
+            data=sbom_data,
+        )
+
 
 class ParserSBOM:
     """Класс парсера SBOM файлов и объектов"""
 
-    def __init__(self, source: str | Path) -> None:
+    def __init__(self, source: str | Path | dict) -> None:
         """
         Метод инициализации объекта
 
-        :param source: Путь до SBOM файла
+        :param source: Путь до SBOM файла или уже загруженный SBOM
         """
 
-        self.sbom = orjson_load_file(source)
+        self.sbom = source if isinstance(source, dict) else orjson_load_file(source)
 
     def get_components(self) -> list[SoftComponentSchema]:
         """Метод получения компонентов из SBOM"""
@@ -93,21 +171,34 @@ class ComponentsAnalyzer:
 
     def __init__(
             self,
-            sbom_source: str | Path,
+            sbom_source: str | Path | dict,
             db_path: Path | str,
             package_folder: str | Path = None,
+            cache_path: str | Path | None = None,
+            on_findings: Callable[[DetectedVulnerabilitySchema], None] | None = None,
+            metrics: Metrics | None = None,
+            processes: int = 1,
     ) -> None:
         """
         Инициализация класса
 
-        :param sbom_source: Путь до SBOM файла
+        :param sbom_source: Путь до SBOM файла или уже загруженный SBOM
         :param db_path: Путь до файла с БД
         :param package_folder: Путь до директории с БД
+        :param cache_path: Путь до файла с кэшем результатов сопоставления (по умолчанию кэш отключен)
+        :param on_findings: Обработчик, вызываемый для каждой уязвимости компонента сразу после ее нахождения
+        :param metrics: Набор метрик анализа
+        :param processes: Количество процессов сопоставления; при значении больше 1 уникальные
+            компоненты делятся на части и сопоставляются в пуле процессов
         """
 
-        self.sbom = orjson_load_file(sbom_source)
+        self.sbom = sbom_source if isinstance(sbom_source, dict) else orjson_load_file(sbom_source)
         self.db_path = db_path
         self.package_folder = package_folder
+        self.cache_path = cache_path
+        self.on_findings = on_findings
+        self.metrics = metrics or Metrics()
+        self.processes = processes
 
     def get_components(self) -> list[SoftComponentSchema]:
         """Метод получения компонентов из SBOM"""
@@ -125,6 +216,114 @@ class ComponentsAnalyzer:
 
         return components
 
+    def iter_vulnerabilities(self) -> Iterator[DetectedVulnerabilitySchema]:
+        """
+        Метод потокового поиска уязвимостей в компонентах
+
+        Каждая уязвимость отдается отдельно для каждого компонента сразу после сопоставления,
+        не дожидаясь проверки остальных компонентов.
+
+        :return: Генератор найденных уязвимостей с одним уязвимым компонентом
+        """
+
+        for vulnerability, source, detected_soft in self._iter_matches():
+            detected_vulnerability = make_detected_vulnerability(
+                vulner_id=vulnerability,
+                source_name=source,
+                affected_soft=[detected_soft],
+            )
+            if self.on_findings is not None:
+                self.on_findings(detected_vulnerability)
+
+            yield detected_vulnerability
+
+    def _iter_matches(self) -> Iterator[tuple[str, str, DetectedSoft]]:
+        """
+        Метод сопоставления компонентов с БД уязвимостей
+
+        :return: Генератор из идентификатора уязвимости, источника и записи уязвимого софта
+        """
+
+        from dpss.vulnerdb import VulnerabilityDB
+
+        with VulnerabilityDB(
+                db_path=self.db_path,
+                package_folder=self.package_folder,
+                cache_path=self.cache_path,
+                metrics=self.metrics,
+        ) as vulner_db:
+            components = self.get_components()
+            sharded_matches = self.match_sharded(components, vulner_db) if self.processes > 1 else None
+            for component in components:
+                pkg_version = component.version
+                if sharded_matches is not None:
+                    vulnerabilities = sharded_matches[(component.name, pkg_version)]
+                else:
+                    with self.metrics.timer('match'):
+                        vulnerabilities = vulner_db.get_matched_vulnerabilities(component.name, pkg_version)
+                self.metrics.increment('components_matched')
+                for vulner in vulnerabilities:
+                    vulnerability, source, pkg_name, vulnerable_interval = vulner
+                    yield vulnerability, source, DetectedSoft(
+                        name=pkg_name,
+                        version=pkg_version,
+                        vulnerable_interval=vulnerable_interval,
+                    )
+
+    def match_sharded(
+            self,
+            components: list[SoftComponentSchema],
+            vulner_db: 'VulnerabilityDB',
+    ) -> dict[tuple[str, str], list[tuple]]:
+        """
+        Метод сопоставления уникальных компонентов в пуле процессов
+
+        Компоненты, отсутствующие в кэше, сортируются по имени и делятся на части,
+        каждая часть сопоставляется в процессе со своим подключением к БД только для чтения.
+
+        :param components: Список компонентов
+        :param vulner_db: Открытое подключение к БД уязвимостей
+        :return: Найденные уязвимости для каждой пары из имени и версии пакета
+        """
+
+        matches = {}
+        pending = []
+        for name, version in sorted({(component.name, component.version) for component in components}):
+            matched_rows = None
+            if vulner_db.match_cache is not None:
+                matched_rows = vulner_db.match_cache.get(vulner_db.get_lookup_name(name), version)
+                self.metrics.increment('match_cache_hits' if matched_rows is not None else 'match_cache_misses')
+
+            if matched_rows is None:
+                pending.append((name, version))
+            else:
+                matches[(name, version)] = [vulner_db.make_vulnerability(row) for row in matched_rows]
+
+        if not pending:
+            return matches
+
+        shard_size = math.ceil(len(pending) / (self.processes * MATCH_SHARDS_PER_PROCESS))
+        shards = [pending[index:index + shard_size] for index in range(0, len(pending), shard_size)]
+        with (
+            self.metrics.timer('match_sharded'),
+            ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=init_match_worker,
+                initargs=(vulner_db.db_path,),
+            ) as executor,
+        ):
+            for shard, (shard_rows, shard_counters) in zip(shards, executor.map(match_shard, shards)):
+                # Счетчики БД процессов пула (запросы, проверенные интервалы) учитываются в общих метриках
+                self.metrics.merge_counters(shard_counters)
+                for (name, version), matched_rows in zip(shard, shard_rows):
+                    if vulner_db.match_cache is not None:
+                        vulner_db.match_cache.put(vulner_db.get_lookup_name(name), version, matched_rows)
+                    matches[(name, version)] = [vulner_db.make_vulnerability(row) for row in matched_rows]
+
+        self.metrics.increment('match_shards', len(shards))
+
+        return matches
+
     def find_vulnerabilities_in_components(self) ->  list[DetectedVulnerabilitySchema]:
         """
         Метод поиска уязвимостей в компонентах
@@ -133,35 +332,28 @@ class ComponentsAnalyzer:
         """
 
         found_vulnerabilities = {}
-        with VulnerabilityDB(db_path=self.db_path, package_folder=self.package_folder) as vulner_db:
-            for component in self.get_components():
-                pkg_version = component.version
-                pkg_name = component.name
-                vulnerabilities = vulner_db.get_package_vulnerabilities(pkg_name)
-                for vulner in vulnerabilities:
-                    vulnerability, source, pkg_name, vulnerable_interval = vulner
-                    is_vulnerable = check_is_vulnerable(pkg_version, vulnerable_interval)
-                    if not is_vulnerable:
-                        continue
-
-                    if not found_vulnerabilities.get(vulnerability):
-                        found_vulnerabilities[vulnerability] = {
-                            'id': vulnerability,
-                            'source': source,
-                            'soft': []
-                        }
-                    found_vulnerabilities[vulnerability]['soft'].append(
-                        DetectedSoftSchema(
-                            vulnerable_interval=vulnerable_interval,
-                            name=pkg_name,
-                            version=pkg_version,
-                        )
+        for vulnerability, source, detected_soft in self._iter_matches():
+            if self.on_findings is not None:
+                self.on_findings(
+                    make_detected_vulnerability(
+                        vulner_id=vulnerability,
+                        source_name=source,
+                        affected_soft=[detected_soft],
                     )
+                )
+
+            if not found_vulnerabilities.get(vulnerability):
+                found_vulnerabilities[vulnerability] = {
+                    'id': vulnerability,
+                    'source': source,
+                    'soft': []
+                }
+            found_vulnerabilities[vulnerability]['soft'].append(detected_soft)
 
         detected_vulnerabilities = []
         for vulner, data in found_vulnerabilities.items():
             detected_vulnerabilities.append(
-                DetectedVulnerabilitySchema(
+                make_detected_vulnerability(
                     vulner_id=vulner,
                     source_name=data['source'],
                     affected_soft=data['soft'],
@@ -173,10 +365,26 @@ class ComponentsAnalyzer:
     def fast_check(self) -> ReportModelSchema:
         """Метод для быстрой проверки"""
 
+        from dpss.reporter import Reporter
+
         detected_vulnerabilities = self.find_vulnerabilities_in_components()
 
         reporter = Reporter(
-            detected_vulnerabilities=detected_vulnerabilities
+            detected_vulnerabilities=detected_vulnerabilities,
+            vulnerabilities_package_path=self.package_folder,
+            db_path=self.db_path,
+            metrics=self.metrics,
         )
 
         return reporter.generate_report()
+
+    def lazy_check(self) -> 'LazyReport':
+        """Метод проверки с ленивым отчетом, подробности уязвимостей загружаются постранично"""
+
+        from dpss.reporter import LazyReport
+
+        return LazyReport(
+            detected_vulnerabilities=self.find_vulnerabilities_in_components(),
+            vulnerabilities_package_path=self.package_folder,
+            db_path=self.db_path,
+        )
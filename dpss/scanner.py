@@ -2,15 +2,29 @@
 Модуль сканера удаленных хостов
 """
 
+import socket
 from pathlib import Path
 
 import paramiko
+from pydantic import BaseModel, ConfigDict
 
-from dpss.models import ScanConfigSchema, SSHResponseSchema
+from dpss.metrics import Metrics
+from dpss.models import ScanConfigSchema, ProjectConfigSchema
+from dpss.tracing import Tracer, NULL_TRACER
 from dpss.utils import write_file
 from dpss.const import REQUIREMENTS_FILE
 
 
+class SSHResponseSchema(BaseModel):
+    """Схема ответа выполнения команды"""
+
+    stdin: paramiko.channel.ChannelStdinFile
+    stdout: paramiko.channel.ChannelFile
+    stderr: paramiko.channel.ChannelStderrFile
+
+    model_config = ConfigDict(extra='forbid', arbitrary_types_allowed=True)
+
+
 class Scanner:
     """Класс сканера проекта"""
 
@@ -18,11 +32,15 @@ class Scanner:
         self,
         data_dir: str | Path,
         scan_config: ScanConfigSchema,
+        metrics: Metrics | None = None,
+        tracer: Tracer | None = None,
     ) -> None:
         """
         Метод инициализации объекта
 
         :param scan_config: Конфигурация сканирования
+        :param metrics: Набор метрик для учета SSH операций
+        :param tracer: Трассировщик операций (по умолчанию выключен)
         """
 
         if isinstance(data_dir, str):
@@ -30,7 +48,11 @@ class Scanner:
 
         self.config = scan_config
         self.data_dir = data_dir
-        self.client = self._get_connection()
+        self.metrics = metrics or Metrics()
+        self.tracer = tracer or NULL_TRACER
+        with self.metrics.timer('ssh_connect', host=self.config.host), self.tracer.span('connect', host=self.config.host):
+            self.client = self._get_connection()
+        self.metrics.increment('ssh_connections', host=self.config.host)
 
     def _get_connection(self) -> paramiko.SSHClient:
         """
@@ -48,6 +70,11 @@ class Scanner:
             port=self.config.port,
         )
 
+        # Без TCP_NODELAY каждая команда ждет отложенного подтверждения TCP (около 40 мс)
+        transport_socket = client.get_transport().sock
+        if isinstance(transport_socket, socket.socket):
+            transport_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
         return client
 
     def close_connection(self) -> None:
@@ -64,6 +91,7 @@ class Scanner:
         """
 
         stdin, stdout, stderr = self.client.exec_command(command)
+        self.metrics.increment('ssh_round_trips', host=self.config.host)
 
         return SSHResponseSchema(
             stdin=stdin,
@@ -75,14 +103,34 @@ class Scanner:
         """Метод сохранения requirements"""
 
         for project in self.config.projects:
-            command = f'cat {project.dir}/{REQUIREMENTS_FILE}'
-            response = self.send_command(command)
+            self.save_requirements(project)
+
+    def save_requirements(self, project: ProjectConfigSchema, output_dir: Path | None = None) -> Path | None:
+        """
+        Метод сохранения requirements одного проекта
+
+        :param project: Конфигурация проекта
+        :param output_dir: Локальная директория проекта (по умолчанию data_dir/<тип>/<имя проекта>)
+        :return: Локальная директория проекта или None, если файл получить не удалось
+        """
+
+        command = f'cat {project.dir}/{REQUIREMENTS_FILE}'
+        if output_dir is None:
             output_dir = self.data_dir / project.type / project.name
-            data = response.stdout.read().decode()
-
-            if not response.stderr.read().decode():
-                write_file(
-                    output_dir=output_dir,
-                    filename=REQUIREMENTS_FILE,
-                    data=data,
-                )
+        with self.metrics.timer('ssh_fetch', host=self.config.host, project=project.name):
+            response = self.send_command(command)
+            raw_data = response.stdout.read()
+            error = response.stderr.read()
+
+        self.metrics.increment('ssh_bytes_received', len(raw_data) + len(error), host=self.config.host)
+        data = raw_data.decode()
+        if error.decode():
+            return None
+
+        write_file(
+            output_dir=output_dir,
+            filename=REQUIREMENTS_FILE,
+            data=data,
+        )
+
+        return output_dir
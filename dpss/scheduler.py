@@ -0,0 +1,397 @@
+"""
+Модуль приоритетного планировщика сканирования парка хостов
+"""
+
+import queue
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+from dpss.const import SCHEDULER_HOST_CONCURRENCY, SCHEDULER_WORKERS, TIMESTAMP_FORMAT, ReportTypes
+from dpss.daemon import SessionPool
+from dpss.dpss import DependencySecurityScanner
+from dpss.history import ScanHistory
+from dpss.metrics import Metrics
+from dpss.models import ScanConfigSchema, ProjectConfigSchema, ProjectFindingsSchema, SoftComponentSchema
+from dpss.records import (
+    make_detected_vulnerabilities,
+    make_finding_rows,
+    make_project_findings,
+    merge_found_vulnerabilities,
+)
+from dpss.reporter import Reporter
+from dpss.utils import delete_dir
+from dpss.vulnerdb import VulnerabilityDB
+
+
+class ScheduledProject:
+    """Запись проекта в расписании сканирования"""
+
+    __slots__ = ('scan_config', 'project', 'last_scan')
+
+    def __init__(self, scan_config: ScanConfigSchema, project: ProjectConfigSchema, last_scan: datetime | None) -> None:
+        """
+        Инициализация записи
+
+        :param scan_config: Конфигурация сканирования хоста проекта
+        :param project: Конфигурация проекта
+        :param last_scan: Дата последнего сканирования проекта или None, если он еще не сканировался
+        """
+
+        self.scan_config = scan_config
+        self.project = project
+        self.last_scan = last_scan
+
+    @property
+    def host(self) -> tuple[str, int]:
+        """Хост проекта"""
+
+        return self.scan_config.host, self.scan_config.port
+
+    def sort_key(self) -> tuple:
+        """
+        Метод получения ключа сортировки: сначала высокий приоритет, затем давно не сканированные
+
+        :return: Ключ сортировки
+        """
+
+        return -self.project.priority, self.last_scan is not None, self.last_scan or datetime.min
+
+
+class ScanScheduler:
+    """
+    Класс приоритетного сканирования проектов нескольких хостов
+
+    Проекты запускаются в порядке приоритета и давности последнего сканирования
+    с ограничением общего количества одновременных проектов и количества проектов
+    на один хост. После наступления срока новые проекты не запускаются, уже
+    начатые доводятся до конца, а пропущенные сохраняются в skipped.
+    """
+
+    def __init__(
+            self,
+            scan_configs: list[ScanConfigSchema],
+            db_path: str | Path,
+            data_dir: Path,
+            vulners_package_dir: Path,
+            cache_path: str | Path | None = None,
+            history_path: str | Path | None = None,
+            max_workers: int = SCHEDULER_WORKERS,
+            host_concurrency: int = SCHEDULER_HOST_CONCURRENCY,
+            deadline: float | None = None,
+            report_type: str = ReportTypes.JSON,
+            on_findings: Callable[[ProjectFindingsSchema], None] | None = None,
+            metrics: Metrics | None = None,
+    ) -> None:
+        """
+        Инициализация объекта класса
+
+        :param scan_configs: Конфигурации сканирования хостов
+        :param db_path: Путь до файла с БД
+        :param data_dir: Директория для сохранения данных проектов
+        :param vulners_package_dir: Директория с пакетом уязвимостей
+        :param cache_path: Путь до файла с кэшем результатов сопоставления (по умолчанию кэш отключен)
+        :param history_path: Путь до файла с историей сканирований, по которой определяется давность
+            сканирования проектов; результаты сохраняются в историю
+        :param max_workers: Максимальное количество одновременно сканируемых проектов
+        :param host_concurrency: Максимальное количество одновременно сканируемых проектов одного хоста
+        :param deadline: Время на весь запуск в секундах, после которого новые проекты не запускаются
+        :param report_type: Тип итогового отчета
+        :param on_findings: Обработчик, вызываемый с уязвимостями каждого проекта сразу после их нахождения
+        :param metrics: Набор метрик сканирования (по умолчанию создается новый и доступен в metrics)
+        """
+
+        self.scan_configs = scan_configs
+        self.db_path = db_path
+        self.data_dir = data_dir
+        self.vulners_package_dir = vulners_package_dir
+        self.cache_path = cache_path
+        self.history_path = history_path
+        self.max_workers = max_workers
+        self.host_concurrency = host_concurrency
+        self.deadline = deadline
+        self.report_type = report_type
+        self.on_findings = on_findings
+        self.metrics = metrics or Metrics()
+        self.vulner_db = None
+        self.history = None
+        self.scan_ids = {}
+        self.skipped = []
+        self.errors = []
+        self.found_vulnerabilities = {}
+        self.report = None
+
+    def run(self) -> None:
+        """Метод запуска сканирования"""
+
+        for item, found_vulnerabilities in self._iter_project_vulnerabilities():
+            merge_found_vulnerabilities(self.found_vulnerabilities, found_vulnerabilities)
+            if self.on_findings is not None:
+                self.on_findings(
+                    make_project_findings(item.project.name, found_vulnerabilities, host=item.scan_config.host)
+                )
+
+        self.make_report()
+
+    def iter_findings(self) -> Iterator[ProjectFindingsSchema]:
+        """
+        Метод потокового получения уязвимостей по проектам
+
+        :return: Генератор уязвимостей проектов в порядке готовности
+        """
+
+        for item, found_vulnerabilities in self._iter_project_vulnerabilities():
+            findings = make_project_findings(item.project.name, found_vulnerabilities, host=item.scan_config.host)
+            if self.on_findings is not None:
+                self.on_findings(findings)
+
+            yield findings
+
+    def _iter_project_vulnerabilities(self) -> Iterator[tuple[ScheduledProject, dict]]:
+        """
+        Метод запуска сканирования по расписанию
+
+        :return: Генератор записей проектов и найденных в них уязвимостей, сгруппированных по идентификатору
+        """
+
+        self.skipped = []
+        self.errors = []
+        # Соединение sqlite привязано к потоку, поэтому все запросы к БД выполняются в одном выделенном потоке
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dpss-db')
+        sessions = SessionPool(self.data_dir, self.metrics)
+        try:
+            executor.submit(self.open_databases).result()
+            schedule = executor.submit(self.make_schedule).result()
+            yield from self._iter_scheduled(schedule, sessions, executor)
+        finally:
+            sessions.close()
+            executor.submit(self.close_databases).result()
+            executor.shutdown()
+
+    def open_databases(self) -> None:
+        """Метод открытия БД уязвимостей и истории сканирований, выполняется в потоке БД"""
+
+        self.vulner_db = VulnerabilityDB(
+            db_path=self.db_path,
+            package_folder=self.vulners_package_dir,
+            cache_path=self.cache_path,
+            metrics=self.metrics,
+        ).__enter__()
+        if self.history_path is not None:
+            self.history = ScanHistory(self.history_path).__enter__()
+
+    def close_databases(self) -> None:
+        """Метод закрытия БД уязвимостей и истории сканирований, выполняется в потоке БД"""
+
+        if self.history is not None:
+            self.history.__exit__(None, None, None)
+            self.history = None
+        if self.vulner_db is not None:
+            self.vulner_db.__exit__(None, None, None)
+            self.vulner_db = None
+
+    def make_schedule(self) -> list[ScheduledProject]:
+        """
+        Метод составления очередности сканирования проектов
+
+        :return: Список проектов в порядке сканирования
+        """
+
+        last_scan_dates = {}
+        if self.history is not None:
+            last_scan_dates = self.history.get_last_scan_dates()
+            # Дата в конфигурации вычисляется один раз при импорте модуля, поэтому записывается время запуска
+            scan_date = datetime.now().strftime(TIMESTAMP_FORMAT)
+            self.scan_ids = {
+                id(scan_config): self.history.start_scan(scan_config.name, scan_date)
+                for scan_config in self.scan_configs
+            }
+
+        schedule = [
+            ScheduledProject(
+                scan_config=scan_config,
+                project=project,
+                last_scan=self.parse_scan_date(last_scan_dates.get((scan_config.host, project.name))),
+            )
+            for scan_config in self.scan_configs
+            for project in scan_config.projects
+        ]
+        schedule.sort(key=ScheduledProject.sort_key)
+
+        return schedule
+
+    @staticmethod
+    def parse_scan_date(scan_date: str | None) -> datetime | None:
+        """
+        Метод разбора даты сканирования из истории
+
+        :param scan_date: Дата сканирования
+        :return: Дата или None, если ее нет или она в неизвестном формате
+        """
+
+        if scan_date is None:
+            return None
+
+        try:
+            return datetime.strptime(scan_date, TIMESTAMP_FORMAT)
+        except ValueError:
+            return None
+
+    def _iter_scheduled(
+            self,
+            schedule: list[ScheduledProject],
+            sessions: SessionPool,
+            executor: ThreadPoolExecutor,
+    ) -> Iterator[tuple[ScheduledProject, dict]]:
+        """
+        Метод выполнения расписания рабочими потоками
+
+        :param schedule: Список проектов в порядке сканирования
+        :param sessions: Пул SSH сессий
+        :param executor: Исполнитель потока БД
+        :return: Генератор записей проектов и найденных в них уязвимостей, сгруппированных по идентификатору
+        """
+
+        deadline = None if self.deadline is None else time.monotonic() + self.deadline
+        condition = threading.Condition()
+        active_hosts = Counter()
+        results = queue.Queue()
+        state = {'stopped': False}
+
+        def take_project() -> ScheduledProject | None:
+            with condition:
+                while schedule and not state['stopped']:
+                    timeout = None if deadline is None else deadline - time.monotonic()
+                    if timeout is not None and timeout <= 0:
+                        self.skipped.extend(item.project for item in schedule)
+                        schedule.clear()
+                        break
+
+                    # Берем самый приоритетный проект, хост которого не исчерпал лимит
+                    for index, item in enumerate(schedule):
+                        if active_hosts[item.host] < self.host_concurrency:
+                            active_hosts[item.host] += 1
+                            return schedule.pop(index)
+
+                    condition.wait(timeout)
+
+                condition.notify_all()
+                return None
+
+        def work() -> None:
+            try:
+                while (item := take_project()) is not None:
+                    try:
+                        results.put(self.scan_project(item, sessions, executor))
+                    except Exception as error:
+                        self.errors.append((item.scan_config.host, item.project.name, repr(error)))
+                    finally:
+                        with condition:
+                            active_hosts[item.host] -= 1
+                            condition.notify_all()
+            finally:
+                results.put(None)
+
+        workers = [
+            threading.Thread(target=work, name=f'dpss-scheduler-{index}', daemon=True)
+            for index in range(self.max_workers)
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            finished = 0
+            while finished < len(workers):
+                result = results.get()
+                if result is None:
+                    finished += 1
+                    continue
+
+                yield result
+        finally:
+            with condition:
+                state['stopped'] = True
+                condition.notify_all()
+            for worker in workers:
+                worker.join()
+
+    def scan_project(
+            self,
+            item: ScheduledProject,
+            sessions: SessionPool,
+            executor: ThreadPoolExecutor,
+    ) -> tuple[ScheduledProject, dict]:
+        """
+        Метод сканирования одного проекта: получение файлов, генерация SBOM и сопоставление с БД
+
+        Файлы проекта сохраняются в отдельную директорию, поэтому одновременно сканируемые
+        одноименные проекты разных хостов не перезаписывают файлы друг друга.
+
+        :param item: Запись проекта в расписании
+        :param sessions: Пул SSH сессий
+        :param executor: Исполнитель потока БД
+        :return: Запись проекта и найденные уязвимости, сгруппированные по идентификатору
+        """
+
+        scanner = sessions.get(item.scan_config)
+        scan_dir = self.data_dir / 'scans' / uuid.uuid4().hex
+        try:
+            with self.metrics.timer('stage', stage='fetch', project=item.project.name):
+                local_project_dir = scanner.save_requirements(
+                    item.project,
+                    output_dir=scan_dir / item.project.type / item.project.name,
+                )
+            if local_project_dir is None:
+                return item, {}
+
+            with self.metrics.timer('stage', stage='sbom', project=item.project.name):
+                DependencySecurityScanner.generate_sbom(local_project_dir, self.metrics)
+            with self.metrics.timer('stage', stage='parse', project=item.project.name):
+                components = DependencySecurityScanner.get_components_from_sbom(local_project_dir)
+        finally:
+            delete_dir(scan_dir)
+
+        with self.metrics.timer('stage', stage='match', project=item.project.name):
+            found_vulnerabilities = executor.submit(self.match_project, item, components).result()
+
+        return item, found_vulnerabilities
+
+    def match_project(self, item: ScheduledProject, components: list[SoftComponentSchema]) -> dict:
+        """
+        Метод сопоставления компонентов проекта с БД и сохранения в историю, выполняется в потоке БД
+
+        :param item: Запись проекта в расписании
+        :param components: Список компонентов проекта
+        :return: Найденные уязвимости, сгруппированные по идентификатору
+        """
+
+        found_vulnerabilities = DependencySecurityScanner.match_components(components, self.vulner_db)
+        if self.history is not None:
+            self.history.save_project(
+                scan_id=self.scan_ids[id(item.scan_config)],
+                host=item.scan_config.host,
+                project=item.project.name,
+                generation=self.vulner_db.generation,
+                components=[(component.name, component.version) for component in components],
+                findings=make_finding_rows(found_vulnerabilities),
+            )
+
+        return found_vulnerabilities
+
+    def make_report(self) -> None:
+        """Метод составления отчета о результатах сканирования"""
+
+        reporter = Reporter(
+            detected_vulnerabilities=make_detected_vulnerabilities(self.found_vulnerabilities),
+            vulnerabilities_package_path=self.vulners_package_dir,
+            report_type=self.report_type,
+            db_path=self.db_path,
+            metrics=self.metrics,
+        )
+
+        self.report = reporter.generate_report()
@@ -0,0 +1,263 @@
+"""
+Модуль трассировки операций сканирования и профилирования по запросу
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, ContextManager, Iterator
+
+from dpss.utils import make_path_from_str, prepare_output_dir
+
+if TYPE_CHECKING:
+    import cProfile
+
+# Имя профиля, собранного за все время сканирования
+SCAN_PROFILE = 'scan'
+
+
+class Span:
+    """Запись завершенной операции"""
+
+    __slots__ = ('name', 'attributes', 'parent', 'thread', 'start', 'duration', 'error')
+
+    def __init__(self, name: str, attributes: dict, parent: str | None, thread: str) -> None:
+        """
+        Инициализация записи
+
+        :param name: Имя операции
+        :param attributes: Атрибуты операции (проект, хост и т.п.)
+        :param parent: Имя внешней операции того же потока
+        :param thread: Имя потока
+        """
+
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.thread = thread
+        self.start = time.time()
+        self.duration = 0.0
+        self.error = None
+
+    def __repr__(self) -> str:
+        """Строковое представление записи"""
+
+        return f'Span({self.name}, {self.duration:.6f}s, {self.attributes})'
+
+    def to_dict(self) -> dict:
+        """
+        Метод преобразования записи в словарь
+
+        :return: Словарь с полями записи
+        """
+
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class Tracer:
+    """
+    Класс трассировки операций сканирования
+
+    Модули профилирования загружаются только при включенном профилировании.
+    Выключенный трассировщик возвращает общий пустой контекст и почти ничего не стоит.
+    Включенный записывает операции, вызывает обработчики и по запросу собирает профиль
+    cProfile и снимок памяти tracemalloc за время сканирования.
+
+    В процессе может работать только один профилировщик cProfile, а стадии конвейера
+    выполняются параллельно в разных потоках, поэтому профиль собирается один на все
+    сканирование: отдельный профиль операции приписал бы ей работу параллельных стадий.
+    Время стадий берется из операций (get_durations), а профиль показывает,
+    на какие функции оно ушло.
+    """
+
+    def __init__(
+            self,
+            enabled: bool = True,
+            hooks: list[Callable[[Span], None]] | None = None,
+            profile: bool = False,
+            trace_memory: bool = False,
+    ) -> None:
+        """
+        Инициализация трассировщика
+
+        :param enabled: Флаг включения трассировки
+        :param hooks: Обработчики, вызываемые с каждой завершенной операцией
+        :param profile: Флаг сбора профиля cProfile за время сканирования
+        :param trace_memory: Флаг сбора снимка памяти tracemalloc
+        """
+
+        self.enabled = enabled
+        self.hooks = hooks or []
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.spans = []
+        self.profiles = {}
+        self.memory_snapshot = None
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.is_memory_traced = False
+        self.profiler = None
+        self.disabled_span = nullcontext()
+
+    def span(self, name: str, **attributes) -> ContextManager:
+        """
+        Метод трассировки операции
+
+        :param name: Имя операции
+        :param attributes: Атрибуты операции
+        :return: Контекст операции
+        """
+
+        if not self.enabled:
+            return self.disabled_span
+
+        return self._span(name, attributes)
+
+    @contextmanager
+    def _span(self, name: str, attributes: dict) -> Iterator[Span]:
+        """
+        Метод записи операции
+
+        :param name: Имя операции
+        :param attributes: Атрибуты операции
+        :return: Запись операции
+        """
+
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+
+        span = Span(
+            name=name,
+            attributes=attributes,
+            parent=stack[-1].name if stack else None,
+            thread=threading.current_thread().name,
+        )
+
+        stack.append(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as error:
+            span.error = repr(error)
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            stack.pop()
+
+            with self.lock:
+                self.spans.append(span)
+            for hook in self.hooks:
+                hook(span)
+
+    def start_profiler(self) -> 'cProfile.Profile | None':
+        """
+        Метод запуска профилировщика сканирования
+
+        :return: Запущенный профилировщик или None, если уже работает другой
+        """
+
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Профилировщик уже запущен вне трассировщика
+            return None
+
+        return profiler
+
+    def add_profile(self, name: str, profiler: 'cProfile.Profile') -> None:
+        """
+        Метод объединения профиля с профилями предыдущих сканирований
+
+        :param name: Имя профиля
+        :param profiler: Остановленный профилировщик
+        """
+
+        import pstats
+
+        with self.lock:
+            if name in self.profiles:
+                self.profiles[name].add(profiler)
+            else:
+                self.profiles[name] = pstats.Stats(profiler)
+
+    def start(self) -> None:
+        """Метод начала трассировки сканирования"""
+
+        if not self.enabled:
+            return
+
+        if self.profile and self.profiler is None:
+            self.profiler = self.start_profiler()
+
+        if not self.trace_memory:
+            return
+
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.is_memory_traced = True
+
+    def finish(self) -> None:
+        """Метод завершения трассировки сканирования, сохраняет профиль и снимок памяти"""
+
+        if not self.enabled:
+            return
+
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.add_profile(SCAN_PROFILE, self.profiler)
+            self.profiler = None
+
+        if not self.trace_memory:
+            return
+
+        import tracemalloc
+
+        if tracemalloc.is_tracing():
+            self.memory_snapshot = tracemalloc.take_snapshot()
+            if self.is_memory_traced:
+                tracemalloc.stop()
+                self.is_memory_traced = False
+
+    def get_durations(self) -> dict[str, float]:
+        """
+        Метод получения суммарной длительности операций по имени
+
+        :return: Словарь с длительностью в секундах по имени операции
+        """
+
+        durations = {}
+        with self.lock:
+            for span in self.spans:
+                durations[span.name] = durations.get(span.name, 0.0) + span.duration
+
+        return durations
+
+    def dump_profiles(self, output_dir: str | Path) -> list[Path]:
+        """
+        Метод записи профилей сканирования в файлы для pstats или snakeviz
+
+        :param output_dir: Директория для записи
+        :return: Список путей до файлов профилей
+        """
+
+        output_dir = make_path_from_str(output_dir)
+        prepare_output_dir(output_dir)
+        paths = []
+        with self.lock:
+            for name, stats in self.profiles.items():
+                path = output_dir / f'{name}.prof'
+                stats.dump_stats(path)
+                paths.append(path)
+
+        return paths
+
+
+# Трассировщик по умолчанию, выключен
+NULL_TRACER = Tracer(enabled=False)
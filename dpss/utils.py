@@ -2,14 +2,32 @@
 Модуль со вспомогательным инструментарием
 """
 
+import functools
 import json
+import re
 import shutil
 from pathlib import Path
+from typing import Iterable
 
 import orjson
 from looseversion import LooseVersion
 
+from dpss.const import INF, INFINITE_VERSION, SEVERITY_LEVELS, VERSION_CACHE_SIZE
 from dpss.models import VulnerableIntervalSchema, VersionBorder
+from dpss.records import VulnerableInterval
+
+PACKAGE_NAME_SEPARATORS = re.compile(r'[-_.]+')
+
+# Синонимы условий границ интервалов, приводимые к VersionBorder
+BORDER_ALIASES = {
+    '>=': VersionBorder.GTE.value,
+    '>': VersionBorder.GT.value,
+    '<=': VersionBorder.LTE.value,
+    '<': VersionBorder.LT.value,
+}
+LEFT_BORDERS = (VersionBorder.GT, VersionBorder.GTE)
+RIGHT_BORDERS = (VersionBorder.LT, VersionBorder.LTE)
+
 
 def make_path_from_str(path_string: str | Path) -> Path:
     """
@@ -127,7 +145,19 @@ def orjson_load_file(path_to_file: Path | str) -> dict | list[dict | str]:
     return data
 
 
-def check_is_vulnerable(pkg_version, vulnerable_interval: VulnerableIntervalSchema) -> bool:
+@functools.lru_cache(maxsize=VERSION_CACHE_SIZE)
+def parse_version(version: str) -> LooseVersion:
+    """
+    Функция разбора строки версии, результат кэшируется на время жизни процесса
+
+    :param version: Строка версии
+    :return: Разобранная версия
+    """
+
+    return LooseVersion(version)
+
+
+def check_is_vulnerable(pkg_version, vulnerable_interval: VulnerableIntervalSchema | VulnerableInterval) -> bool:
     """
     Функция проверки принадлежности пакета к уязвимому интервалу версий
 
@@ -138,15 +168,143 @@ def check_is_vulnerable(pkg_version, vulnerable_interval: VulnerableIntervalSche
 
     left_case = False
     right_case = False
+    pkg_version = parse_version(pkg_version)
     match vulnerable_interval.left_border:
         case VersionBorder.GT:
-            left_case = LooseVersion(vulnerable_interval.left_version) < pkg_version
+            left_case = parse_version(vulnerable_interval.left_version) < pkg_version
         case VersionBorder.GTE:
-            left_case = LooseVersion(vulnerable_interval.left_version) <= pkg_version
+            left_case = parse_version(vulnerable_interval.left_version) <= pkg_version
     match vulnerable_interval.right_border:
         case VersionBorder.LT:
-            right_case = LooseVersion(vulnerable_interval.right_version) > pkg_version
+            right_case = parse_version(vulnerable_interval.right_version) > pkg_version
         case VersionBorder.LTE:
-            right_case = LooseVersion(vulnerable_interval.right_version) >= pkg_version
+            right_case = parse_version(vulnerable_interval.right_version) >= pkg_version
 
     return left_case and right_case
+
+
+def canonicalize_interval(opener: str, left: str, right: str | None, closer: str) -> tuple[str, str, str, str]:
+    """
+    Функция приведения границ уязвимого интервала к каноническому виду
+
+    :param opener: Условие левой границы
+    :param left: Версия левой границы
+    :param right: Версия правой границы, пустая означает бесконечность
+    :param closer: Условие правой границы
+    :return: Кортеж из условия и версии левой границы, версии и условия правой границы
+    """
+
+    opener = opener.strip().lower()
+    closer = closer.strip().lower()
+    right = str(right).strip() if right else INF
+
+    return (
+        BORDER_ALIASES.get(opener, opener),
+        str(left).strip(),
+        INF if right.lower() == INF else right,
+        BORDER_ALIASES.get(closer, closer),
+    )
+
+
+def get_border_version(version: str) -> LooseVersion:
+    """
+    Функция разбора версии границы интервала с учетом бесконечности
+
+    :param version: Версия границы
+    :return: Разобранная версия
+    """
+
+    return parse_version(INFINITE_VERSION if version == INF else version)
+
+
+def merge_intervals(intervals: list[tuple[str, str, str, str]]) -> list[tuple[str, str, str, str]]:
+    """
+    Функция объединения пересекающихся и смежных интервалов
+
+    Интервалы с неизвестными условиями границ не совпадают ни с одной версией
+    и возвращаются без изменений.
+
+    :param intervals: Список интервалов в каноническом виде
+    :return: Список непересекающихся интервалов
+    :raises TypeError: Если версии границ несравнимы между собой
+    """
+
+    valid = [interval for interval in intervals if interval[0] in LEFT_BORDERS and interval[3] in RIGHT_BORDERS]
+    invalid = [interval for interval in intervals if interval not in valid]
+    ordered = sorted(
+        valid,
+        key=lambda interval: (get_border_version(interval[1]), interval[0] != VersionBorder.GTE),
+    )
+
+    merged = []
+    for opener, left, right, closer in ordered:
+        if merged:
+            current = merged[-1]
+            current_right = get_border_version(current[2])
+            left_version = get_border_version(left)
+            is_touching = left_version == current_right and (
+                current[3] == VersionBorder.LTE or opener == VersionBorder.GTE
+            )
+            if left_version < current_right or is_touching:
+                right_version = get_border_version(right)
+                if right_version > current_right or (right_version == current_right and closer == VersionBorder.LTE):
+                    current[2], current[3] = right, closer
+                continue
+
+        merged.append([opener, left, right, closer])
+
+    return [tuple(interval) for interval in merged] + invalid
+
+
+def get_intervals_bounds(intervals: list[tuple[str, str, str, str]]) -> tuple[str, str, str, str] | None:
+    """
+    Функция получения общих границ интервалов: от наименьшей левой до наибольшей правой
+
+    :param intervals: Список интервалов в каноническом виде
+    :return: Интервал, охватывающий все интервалы, или None, если границы определить нельзя
+    :raises TypeError: Если версии границ несравнимы между собой
+    """
+
+    # Интервалы с неизвестными условиями границ не совпадают ни с одной версией и не расширяют границы
+    valid = [interval for interval in intervals if interval[0] in LEFT_BORDERS and interval[3] in RIGHT_BORDERS]
+    if not valid:
+        return None
+
+    opener, left = min(
+        ((interval[0], interval[1]) for interval in valid),
+        key=lambda border: (get_border_version(border[1]), border[0] != VersionBorder.GTE),
+    )
+    right, closer = max(
+        ((interval[2], interval[3]) for interval in valid),
+        key=lambda border: (get_border_version(border[0]), border[1] == VersionBorder.LTE),
+    )
+
+    return opener, left, right, closer
+
+
+def normalize_package_name(pkg_name: str) -> str:
+    """
+    Функция нормализации имени пакета по PEP 503
+
+    :param pkg_name: Имя пакета
+    :return: Нормализованное имя пакета
+    """
+
+    return PACKAGE_NAME_SEPARATORS.sub('-', pkg_name).lower()
+
+
+def get_max_severity(severities: Iterable[str | None]) -> str:
+    """
+    Функция получения наивысшей критичности из рейтингов уязвимости
+
+    :param severities: Критичности из рейтингов уязвимости
+    :return: Наивысшая известная критичность или 'none'
+    """
+
+    max_level = 0
+    for severity in severities:
+        severity = (severity or '').lower()
+        if severity in SEVERITY_LEVELS:
+            max_level = max(max_level, SEVERITY_LEVELS.index(severity))
+
+    return SEVERITY_LEVELS[max_level]
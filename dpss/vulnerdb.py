@@ -1,9 +1,29 @@
+import hashlib
 import sqlite3
+import zlib
 from pathlib import Path
+from typing import Iterator
 
-from dpss.models import VulnerableIntervalSchema
+import orjson
+
+from dpss.cache import MatchCache
+from dpss.records import VulnerableInterval
 from dpss.const import INF, INFINITE_VERSION
-from dpss.utils import orjson_load_file
+from dpss.feed import open_feed
+from dpss.metrics import Metrics
+from dpss.tracing import Tracer, NULL_TRACER
+from dpss.utils import (
+    canonicalize_interval,
+    check_is_vulnerable,
+    get_intervals_bounds,
+    get_max_severity,
+    merge_intervals,
+    normalize_package_name,
+)
+
+
+class OutdatedSchemaError(RuntimeError):
+    """Исключение для БД устаревшей схемы, которую нельзя пересобрать без пакета уязвимостей"""
 
 
 class VulnerabilityDB:
@@ -12,7 +32,7 @@ class VulnerabilityDB:
     SELECT_PKG_INFO_QUERY = '''
     SELECT vulnerability, source, name, opener, version_left, version_right, closer
     FROM packages
-    WHERE name == "{pkg_name}";
+    WHERE normalized_name = ?;
     '''
 
     CREATE_TABLE_PACKAGES = '''
@@ -21,6 +41,7 @@ class VulnerabilityDB:
         vulnerability TEXT NOT NULL,
         source TEXT NOT NULL,
         name TEXT NOT NULL,
+        normalized_name TEXT NOT NULL,
         opener TEXT NOT NULL,
         version_left TEXT NOT NULL,
         version_right TEXT NOT NULL,
@@ -28,21 +49,129 @@ class VulnerabilityDB:
     );
     '''
 
-    # Создаем индекс для столбца "name"
-    CREATE_INDEX_PACKAGES = 'CREATE INDEX idx_name ON packages (name);'
+    # Индекс по имени пакета, нормализованному по PEP 503: любое написание имени находится одним запросом
+    CREATE_INDEX_PACKAGES = 'CREATE INDEX idx_normalized_name ON packages (normalized_name);'
+
+    # Индекс для выборки и замены интервалов отдельных уязвимостей при обновлении пакета
+    CREATE_INDEX_VULNERABILITIES = 'CREATE INDEX idx_vulnerability ON packages (vulnerability);'
 
     INSERT_PACKAGE_INFO = '''
-    INSERT INTO packages (vulnerability, source, name, opener, version_left, version_right, closer)
-    VALUES (?, ?, ?, ?, ?, ?, ?);
+    INSERT INTO packages (vulnerability, source, name, normalized_name, opener, version_left, version_right, closer)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+    '''
+
+    CREATE_TABLE_BOUNDS = '''
+    CREATE TABLE IF NOT EXISTS package_bounds (
+        normalized_name TEXT PRIMARY KEY,
+        opener TEXT NOT NULL,
+        version_left TEXT NOT NULL,
+        version_right TEXT NOT NULL,
+        closer TEXT NOT NULL
+    );
+    '''
+
+    SELECT_BOUNDS_QUERY = 'SELECT normalized_name, opener, version_left, version_right, closer FROM package_bounds;'
+
+    SELECT_INTERVALS_QUERY = 'SELECT normalized_name, opener, version_left, version_right, closer FROM packages;'
+
+    SELECT_INTERVALS_BY_NAME_QUERY = '''
+    SELECT normalized_name, opener, version_left, version_right, closer
+    FROM packages
+    WHERE normalized_name IN ({placeholders});
+    '''
+
+    INSERT_BOUNDS_INFO = '''
+    INSERT OR REPLACE INTO package_bounds (normalized_name, opener, version_left, version_right, closer)
+    VALUES (?, ?, ?, ?, ?);
+    '''
+
+    DELETE_BOUNDS_QUERY = 'DELETE FROM package_bounds WHERE normalized_name IN ({placeholders});'
+
+    CREATE_TABLE_META = '''
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
     '''
 
+    SELECT_META_VALUE = 'SELECT value FROM meta WHERE key = ?;'
+
+    INSERT_META_VALUE = 'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?);'
 
-    def __init__(self, db_path: Path | str, package_folder: str | Path = None) -> None:
+    CREATE_TABLE_DETAILS = '''
+    CREATE TABLE IF NOT EXISTS vulnerability_details (
+        vulnerability TEXT PRIMARY KEY,
+        source TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        data BLOB NOT NULL
+    );
+    '''
+
+    INSERT_DETAILS_INFO = '''
+    INSERT OR REPLACE INTO vulnerability_details (vulnerability, source, severity, digest, data)
+    VALUES (?, ?, ?, ?, ?);
+    '''
+
+    SELECT_DIGESTS_QUERY = 'SELECT vulnerability, digest FROM vulnerability_details;'
+
+    SELECT_PACKAGES_BY_VULNERABILITY_QUERY = '''
+    SELECT vulnerability, source, name, opener, version_left, version_right, closer
+    FROM packages
+    WHERE vulnerability IN ({placeholders});
+    '''
+
+    DELETE_PACKAGES_QUERY = 'DELETE FROM packages WHERE vulnerability IN ({placeholders});'
+
+    DELETE_DETAILS_QUERY = 'DELETE FROM vulnerability_details WHERE vulnerability IN ({placeholders});'
+
+    SELECT_DETAILS_QUERY = '''
+    SELECT vulnerability, data
+    FROM vulnerability_details
+    WHERE vulnerability IN ({placeholders});
+    '''
+
+    SELECT_SEVERITY_QUERY = '''
+    SELECT vulnerability, severity
+    FROM vulnerability_details
+    WHERE vulnerability IN ({placeholders});
+    '''
+
+    DROP_TABLES = (
+        'DROP TABLE IF EXISTS packages;',
+        'DROP TABLE IF EXISTS vulnerability_details;',
+        'DROP TABLE IF EXISTS package_bounds;',
+        'DROP TABLE IF EXISTS meta;',
+    )
+
+    GENERATION_KEY = 'generation'
+    SCHEMA_VERSION_KEY = 'schema_version'
+
+    # Версия схемы БД, при ее изменении БД пересобирается из явно переданного пакета уязвимостей
+    SCHEMA_VERSION = '6'
+
+    # Ограничение количества параметров в одном запросе sqlite
+    QUERY_BATCH_SIZE = 900
+
+    def __init__(
+            self,
+            db_path: Path | str,
+            package_folder: str | Path = None,
+            cache_path: Path | str | None = None,
+            metrics: Metrics | None = None,
+            tracer: Tracer | None = None,
+            read_only: bool = False,
+    ) -> None:
         """
         Инициализация класса
 
         :param db_path: Путь до файла с БД
-        :param package_folder: Путь до директории с БД
+        :param package_folder: Путь до пакета уязвимостей: директории, zip или tar архива
+            (по умолчанию директория БД, используется только для сборки новой БД)
+        :param cache_path: Путь до файла с кэшем результатов сопоставления (по умолчанию кэш отключен)
+        :param metrics: Набор метрик для учета запросов и проверенных интервалов
+        :param tracer: Трассировщик запросов к БД (по умолчанию выключен)
+        :param read_only: Флаг открытия существующей БД только для чтения, без сборки и пересборки
         """
         if isinstance(db_path, str):
             db_path = Path(db_path)
@@ -52,80 +181,600 @@ class VulnerabilityDB:
 
         self.db_path = db_path
         self.package_folder = package_folder or db_path.parent
+        self.is_package_folder_set = package_folder is not None
+        self.cache_path = cache_path
+        self.match_cache = None
+        self.metrics = metrics or Metrics()
+        self.tracer = tracer or NULL_TRACER
+        self.read_only = read_only
+        self.package_bounds = None
 
     def __enter__(self):
         """Инициализация контекста"""
 
+        if self.read_only:
+            self.connection = sqlite3.connect(f'{self.db_path.resolve().as_uri()}?mode=ro', uri=True)
+            if self.get_meta_value(self.SCHEMA_VERSION_KEY) != self.SCHEMA_VERSION:
+                self.raise_outdated_schema()
+            if self.cache_path is not None:
+                self.match_cache = MatchCache(cache_path=self.cache_path, generation=self.generation).__enter__()
+            return self
+
         is_db_exist = self.db_path.exists()
         self.connection = sqlite3.connect(self.db_path)
         if not is_db_exist:
-            self.update_db()
+            with self.metrics.timer('db_build'):
+                self.update_db()
+        elif self.get_meta_value(self.SCHEMA_VERSION_KEY) != self.SCHEMA_VERSION:
+            # Заполненная БД заменяется только собранной из явно переданного непустого пакета
+            if not self.is_feed_usable():
+                self.raise_outdated_schema()
+            with self.metrics.timer('db_build'):
+                self.rebuild_db()
+        if self.cache_path is not None:
+            self.match_cache = MatchCache(cache_path=self.cache_path, generation=self.generation).__enter__()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Финализация контекста"""
 
+        if self.match_cache is not None:
+            self.match_cache.__exit__(exc_type, exc_val, exc_tb)
+            self.match_cache = None
         self.connection.close()
 
+    def is_feed_usable(self) -> bool:
+        """
+        Метод проверки, что пакет уязвимостей передан явно и содержит уязвимости
+
+        Только такой пакет может заменить данные заполненной БД: директория БД по умолчанию
+        уязвимостей не содержит, и загрузка из нее удалила бы все уязвимости.
+
+        :return: Можно ли обновлять заполненную БД из пакета
+        """
+
+        return self.is_package_folder_set and self.has_advisories()
+
+    def has_advisories(self) -> bool:
+        """
+        Метод проверки, что пакет уязвимостей существует и содержит хотя бы одну уязвимость
+
+        :return: Содержит ли пакет уязвимости
+        """
+
+        if not self.package_folder.exists():
+            return False
+
+        try:
+            with open_feed(self.package_folder) as feed:
+                return next(feed.iter_advisories(), None) is not None
+        except ValueError:
+            return False
+
+    def raise_outdated_schema(self) -> None:
+        """Метод закрытия подключения и выброса исключения об устаревшей схеме БД"""
+
+        schema_version = self.get_meta_value(self.SCHEMA_VERSION_KEY)
+        self.connection.close()
+        raise OutdatedSchemaError(
+            f'DB schema of {self.db_path} is outdated ({schema_version}, required {self.SCHEMA_VERSION}), '
+            f'rebuild it with a vulnerabilities package'
+        )
+
+    @property
+    def generation(self) -> str:
+        """
+        Поколение БД, меняется при каждой пересборке
+
+        :return: Хэш загруженных данных или отпечаток файла для БД, собранных без него
+        """
+
+        generation = self.get_meta_value(self.GENERATION_KEY)
+        if generation is not None:
+            return generation
+
+        db_stat = self.db_path.stat()
+        return f'{db_stat.st_mtime_ns}-{db_stat.st_size}'
+
+    def get_meta_value(self, key: str) -> str | None:
+        """
+        Метод получения служебного значения БД
+
+        :param key: Ключ значения
+        :return: Значение или None, если оно не записано
+        """
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(self.SELECT_META_VALUE, (key,))
+            row = cursor.fetchone()
+        except sqlite3.OperationalError:
+            row = None
+
+        return row[0] if row is not None else None
+
+    def get_vulnerability_details(self, vulner_ids: list[str]) -> dict[str, dict]:
+        """
+        Метод получения подробной информации об уязвимостях
+
+        :param vulner_ids: Список идентификаторов уязвимостей
+        :return: Словарь с информацией для отчета по идентификатору уязвимости
+        """
+
+        return {
+            vulnerability: orjson.loads(zlib.decompress(data))
+            for vulnerability, data in self._select_by_vulnerabilities(self.SELECT_DETAILS_QUERY, vulner_ids)
+        }
+
+    def get_vulnerability_severities(self, vulner_ids: list[str]) -> dict[str, str]:
+        """
+        Метод получения наивысшей критичности уязвимостей без загрузки подробной информации
+
+        :param vulner_ids: Список идентификаторов уязвимостей
+        :return: Словарь с критичностью по идентификатору уязвимости
+        """
+
+        return dict(self._select_by_vulnerabilities(self.SELECT_SEVERITY_QUERY, vulner_ids))
+
+    def get_vulnerabilities_packages(self, vulner_ids: list[str]) -> list:
+        """
+        Метод получения уязвимых интервалов пакетов по списку уязвимостей
+
+        :param vulner_ids: Список идентификаторов уязвимостей
+        :return: Список кортежей из идентификатора уязвимости, источника, имени пакета и уязвимого интервала
+        """
+
+        return [
+            self.make_vulnerability(pkg)
+            for pkg in self._select_by_vulnerabilities(self.SELECT_PACKAGES_BY_VULNERABILITY_QUERY, vulner_ids)
+        ]
+
+    def _select_by_vulnerabilities(self, query: str, vulner_ids: list[str]) -> list[tuple]:
+        """
+        Метод выборки строк таблицы подробностей по списку идентификаторов пачками
+
+        :param query: Запрос с подстановкой {placeholders}
+        :param vulner_ids: Список идентификаторов уязвимостей
+        :return: Список строк
+        """
+
+        rows = []
+        cursor = self.connection.cursor()
+        vulner_ids = list(dict.fromkeys(vulner_ids))
+        for index in range(0, len(vulner_ids), self.QUERY_BATCH_SIZE):
+            batch = vulner_ids[index:index + self.QUERY_BATCH_SIZE]
+            try:
+                cursor.execute(query.format(placeholders=', '.join('?' * len(batch))), batch)
+            except sqlite3.OperationalError:
+                # БД собрана без таблицы подробностей
+                return rows
+
+            batch_rows = cursor.fetchall()
+            self.metrics.increment('db_queries')
+            self.metrics.increment('db_rows_scanned', len(batch_rows))
+            rows.extend(batch_rows)
+
+        return rows
+
     def get_package_vulnerabilities(self, pkg_name: str) -> list:
         """
         Метод получения информации об уязвимостях пакета
 
+        Интервалы возвращаются проверенными схемами VulnerableIntervalSchema, в отличие
+        от методов сопоставления, которые работают с внутренними записями.
+
         :param pkg_name: Имя пакета
+        :return: Список кортежей из идентификатора уязвимости, источника, имени пакета и уязвимого интервала
+        """
+
+        result_data = []
+        for pkg in self._select_package_rows(self.get_lookup_name(pkg_name)):
+            vulnerability, source, name, vulnerable_interval = self.make_vulnerability(pkg)
+            result_data.append((vulnerability, source, name, vulnerable_interval.to_schema(validate=True)))
+
+        return result_data
+
+    def get_matched_vulnerabilities(self, pkg_name: str, pkg_version: str) -> list:
+        """
+        Метод получения уязвимостей, в интервал которых попадает версия пакета
+
+        :param pkg_name: Имя пакета
+        :param pkg_version: Версия пакета
         :return: Список найденных уязвимостей
         """
 
-        cursor = self.connection.cursor()
-        cursor.execute(self.SELECT_PKG_INFO_QUERY.format(pkg_name=pkg_name))
-        vulnerable_packages = cursor.fetchall()
+        lookup_name = self.get_lookup_name(pkg_name)
+        if self.match_cache is not None:
+            matched_rows = self.match_cache.get(lookup_name, pkg_version)
+            if matched_rows is not None:
+                self.metrics.increment('match_cache_hits')
+                return [self.make_vulnerability(pkg) for pkg in matched_rows]
 
-        result_data = []
-        for pkg in vulnerable_packages:
-            vulnerability, source, name, opener, version_left, version_right, closer = pkg
-            if version_right == INF:
-                version_right = INFINITE_VERSION
-            result_data.append((
-                vulnerability,
-                source,
-                name,
-                VulnerableIntervalSchema(
-                    left_border=opener,
-                    right_version=version_right,
-                    left_version=version_left,
-                    right_border=closer,
-                ),
-            ))
+            self.metrics.increment('match_cache_misses')
+
+        matched_rows, result_data = self._match_package(lookup_name, pkg_version)
+        if self.match_cache is not None:
+            self.match_cache.put(lookup_name, pkg_version, matched_rows)
 
         return result_data
 
+    def get_matched_rows(self, pkg_name: str, pkg_version: str) -> list[tuple]:
+        """
+        Метод получения строк БД с интервалами, в которые попадает версия пакета, без кэша
+
+        Строки компактнее описаний уязвимостей, поэтому используются для передачи
+        результатов между процессами.
+
+        :param pkg_name: Имя пакета
+        :param pkg_version: Версия пакета
+        :return: Список строк БД
+        """
+
+        return self._match_package(self.get_lookup_name(pkg_name), pkg_version)[0]
+
+    @staticmethod
+    def get_lookup_name(pkg_name: str) -> str:
+        """
+        Метод получения имени пакета, по которому выполняется поиск в БД и кэше сопоставления
+
+        :param pkg_name: Имя пакета
+        :return: Имя пакета, нормализованное по PEP 503
+        """
+
+        return normalize_package_name(pkg_name)
+
+    def _match_package(self, lookup_name: str, pkg_version: str) -> tuple[list[tuple], list[tuple]]:
+        """
+        Метод проверки версии пакета по всем его уязвимым интервалам
+
+        :param lookup_name: Имя пакета, по которому выполняется поиск в БД
+        :param pkg_version: Версия пакета
+        :return: Подходящие строки БД и соответствующие им описания уязвимостей
+        """
+
+        matched_rows = []
+        result_data = []
+        if not self.is_in_package_bounds(lookup_name, pkg_version):
+            self.metrics.increment('bounds_rejected')
+            return matched_rows, result_data
+
+        with self.tracer.span('lookup', package=lookup_name):
+            package_rows = self._select_package_rows(lookup_name)
+        self.metrics.increment('intervals_evaluated', len(package_rows))
+        for pkg in package_rows:
+            vulnerability = self.make_vulnerability(pkg)
+            if check_is_vulnerable(pkg_version, vulnerability[3]):
+                matched_rows.append(pkg)
+                result_data.append(vulnerability)
+
+        return matched_rows, result_data
+
+    def is_in_package_bounds(self, normalized_name: str, pkg_version: str) -> bool:
+        """
+        Метод проверки, что версия пакета может попасть хотя бы в один его уязвимый интервал
+
+        Общие границы интервалов всех пакетов загружаются из БД один раз, поэтому версии
+        вне границ отсекаются без запроса к БД и проверки отдельных интервалов.
+
+        :param normalized_name: Имя пакета, нормализованное по PEP 503
+        :param pkg_version: Версия пакета
+        :return: Попадает ли версия в общие границы; True, если границы неизвестны
+        """
+
+        if self.package_bounds is None:
+            self.package_bounds = self.load_package_bounds()
+
+        bounds = self.package_bounds.get(normalized_name)
+        if bounds is None:
+            return True
+
+        try:
+            return check_is_vulnerable(pkg_version, bounds)
+        except TypeError:
+            # Версия несравнима с границами, интервалы проверяются по отдельности
+            return True
+
+    def load_package_bounds(self) -> dict[str, VulnerableInterval]:
+        """
+        Метод загрузки общих границ уязвимых интервалов пакетов
+
+        :return: Словарь с интервалом общих границ по нормализованному имени пакета
+        """
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(self.SELECT_BOUNDS_QUERY)
+        except sqlite3.OperationalError:
+            # БД собрана без таблицы границ
+            return {}
+
+        rows = cursor.fetchall()
+        self.metrics.increment('db_queries')
+        self.metrics.increment('db_rows_scanned', len(rows))
+
+        return {
+            name: VulnerableInterval(
+                left_border=opener,
+                left_version=version_left,
+                right_version=INFINITE_VERSION if version_right == INF else version_right,
+                right_border=closer,
+            )
+            for name, opener, version_left, version_right, closer in rows
+        }
+
+    def update_package_bounds(self, names: list[str] | None = None) -> None:
+        """
+        Метод пересчета общих границ уязвимых интервалов пакетов по таблице packages
+
+        :param names: Нормализованные имена пакетов для пересчета (по умолчанию все пакеты)
+        """
+
+        cursor = self.connection.cursor()
+        intervals = {}
+        if names is None:
+            cursor.execute(self.SELECT_INTERVALS_QUERY)
+            rows = cursor.fetchall()
+        else:
+            rows = []
+            names = list(dict.fromkeys(names))
+            for index in range(0, len(names), self.QUERY_BATCH_SIZE):
+                batch = names[index:index + self.QUERY_BATCH_SIZE]
+                placeholders = ', '.join('?' * len(batch))
+                cursor.execute(self.DELETE_BOUNDS_QUERY.format(placeholders=placeholders), batch)
+                cursor.execute(self.SELECT_INTERVALS_BY_NAME_QUERY.format(placeholders=placeholders), batch)
+                rows.extend(cursor.fetchall())
+
+        for name, *interval in rows:
+            intervals.setdefault(name, []).append(tuple(interval))
+
+        bounds_data = []
+        for name, package_intervals in intervals.items():
+            try:
+                bounds = get_intervals_bounds(package_intervals)
+            except TypeError:
+                # Версии границ несравнимы, для пакета проверяются все интервалы
+                continue
+
+            if bounds is not None:
+                bounds_data.append((name, *bounds))
+
+        cursor.executemany(self.INSERT_BOUNDS_INFO, bounds_data)
+        self.package_bounds = None
+
+    def _select_package_rows(self, normalized_name: str) -> list[tuple]:
+        """
+        Метод получения строк БД с уязвимыми интервалами пакета одним запросом по индексу
+
+        :param normalized_name: Имя пакета, нормализованное по PEP 503
+        :return: Список строк БД
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.SELECT_PKG_INFO_QUERY, (normalized_name,))
+        rows = cursor.fetchall()
+        self.metrics.increment('db_queries')
+        self.metrics.increment('db_rows_scanned', len(rows))
+
+        return rows
+
+    @staticmethod
+    def make_vulnerability(pkg: tuple) -> tuple:
+        """
+        Метод преобразования строки БД в описание уязвимости
+
+        :param pkg: Строка БД
+        :return: Кортеж из идентификатора уязвимости, источника, имени пакета и уязвимого интервала
+        """
+
+        vulnerability, source, name, opener, version_left, version_right, closer = pkg
+        if version_right == INF:
+            version_right = INFINITE_VERSION
+
+        return (
+            vulnerability,
+            source,
+            name,
+            VulnerableInterval(
+                left_border=opener,
+                left_version=version_left,
+                right_version=version_right,
+                right_border=closer,
+            ),
+        )
+
+    def iter_advisories(self) -> Iterator[dict]:
+        """Метод последовательного чтения уязвимостей из пакета (директории или архива)"""
+
+        with open_feed(self.package_folder) as feed:
+            for data in feed.iter_advisories():
+                self.metrics.increment('advisory_files_read')
+                yield data
+
     def prepare_pkg_data(self) -> list[tuple]:
         """Метод подготовки данных из пакета для отгрузки в БД"""
 
         result_data = []
-        for file_path in self.package_folder.iterdir():
-            data = orjson_load_file(file_path)
-            vulner_id = data['identifier']
-            source_name = data['source'][0]['source_name']
-            for package in data['affects']:
-                result_data.append((
-                    vulner_id,
-                    source_name,
-                    package['name'],
-                    package['version']['start_condition'],
-                    package['version']['start_value'],
-                    package['version']['end_value'],
-                    package['version']['end_condition'],
-                ))
+        for data in self.iter_advisories():
+            result_data.extend(self.make_package_rows(data))
 
         return result_data
 
+    @staticmethod
+    def make_package_rows(data: dict) -> list[tuple]:
+        """
+        Метод подготовки строк уязвимых интервалов пакетов
+
+        Границы приводятся к каноническому виду, повторы удаляются, а пересекающиеся
+        и смежные интервалы одного пакета объединяются.
+
+        :param data: Данные уязвимости из пакета
+        :return: Список строк для таблицы packages с нормализованным по PEP 503 именем пакета
+        """
+
+        vulner_id = data['identifier']
+        source_name = data['source'][0]['source_name']
+        package_intervals = {}
+        for package in data['affects']:
+            interval = canonicalize_interval(
+                package['version']['start_condition'],
+                package['version']['start_value'],
+                package['version']['end_value'],
+                package['version']['end_condition'],
+            )
+            package_intervals.setdefault(package['name'], {})[interval] = None
+
+        result_data = []
+        for name, intervals in package_intervals.items():
+            intervals = list(intervals)
+            try:
+                intervals = merge_intervals(intervals)
+            except TypeError:
+                # Версии границ несравнимы, интервалы сохраняются без объединения
+                pass
+
+            normalized_name = normalize_package_name(name)
+            result_data.extend((vulner_id, source_name, name, normalized_name, *interval) for interval in intervals)
+
+        return result_data
+
+    @staticmethod
+    def make_details_row(data: dict) -> tuple:
+        """
+        Метод подготовки строки с подробной информацией об уязвимости
+
+        :param data: Данные уязвимости из пакета
+        :return: Строка для таблицы vulnerability_details
+        """
+
+        details = {
+            'identifier': data['identifier'],
+            'published': data['published'],
+            'source_name': data['source'][0]['source_name'],
+            'source_url': data['source'][0]['source_url'],
+            'description': data['description'],
+            'cwes': data.get('cwes'),
+            'ratings': data.get('ratings') or [],
+            'references': data.get('references'),
+        }
+
+        return (
+            data['identifier'],
+            details['source_name'],
+            get_max_severity(rating.get('severity') for rating in details['ratings']),
+            VulnerabilityDB.make_advisory_digest(data),
+            zlib.compress(orjson.dumps(details)),
+        )
+
+    @staticmethod
+    def make_advisory_digest(data: dict) -> str:
+        """
+        Метод вычисления отпечатка содержимого уязвимости
+
+        :param data: Данные уязвимости из пакета
+        :return: Хэш данных, не зависящий от порядка ключей
+        """
+
+        return hashlib.sha256(orjson.dumps(data, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
     def update_db(self) -> None:
         """Метод обновления базы данных"""
 
         cursor = self.connection.cursor()
         cursor.execute(self.CREATE_TABLE_PACKAGES)
         cursor.execute(self.CREATE_INDEX_PACKAGES)
+        cursor.execute(self.CREATE_INDEX_VULNERABILITIES)
+        cursor.execute(self.CREATE_TABLE_DETAILS)
+        cursor.execute(self.CREATE_TABLE_BOUNDS)
+        cursor.execute(self.CREATE_TABLE_META)
+
+        prepared_data = []
+        details_data = []
+        for data in self.iter_advisories():
+            prepared_data.extend(self.make_package_rows(data))
+            details_data.append(self.make_details_row(data))
 
-        prepared_data = self.prepare_pkg_data()
         cursor.executemany(self.INSERT_PACKAGE_INFO, prepared_data)
+        cursor.executemany(self.INSERT_DETAILS_INFO, details_data)
+        self.update_package_bounds()
+
+        # Поколение БД используется для инвалидации кэша результатов сопоставления
+        generation = hashlib.sha256(orjson.dumps(prepared_data)).hexdigest()
+        cursor.execute(self.INSERT_META_VALUE, (self.GENERATION_KEY, generation))
+        cursor.execute(self.INSERT_META_VALUE, (self.SCHEMA_VERSION_KEY, self.SCHEMA_VERSION))
         self.connection.commit()
+
+    def rebuild_db(self) -> None:
+        """Метод пересборки базы данных с нуля"""
+
+        cursor = self.connection.cursor()
+        for query in self.DROP_TABLES:
+            cursor.execute(query)
+
+        self.update_db()
+
+    def ingest_advisories(self) -> list[str]:
+        """
+        Метод загрузки в БД только новых и измененных уязвимостей пакета
+
+        Уязвимости сравниваются с БД по отпечатку содержимого, интервалы и подробности
+        заменяются только у изменившихся, удаленные из пакета уязвимости удаляются из БД.
+
+        :return: Список идентификаторов новых и измененных уязвимостей
+        :raises ValueError: Если пакет уязвимостей не передан явно, не найден или пуст
+        """
+
+        if not self.is_feed_usable():
+            raise ValueError(
+                f'Vulnerabilities package {self.package_folder} is not set explicitly, missing or empty, '
+                f'refusing to update {self.db_path}'
+            )
+
+        cursor = self.connection.cursor()
+        cursor.execute(self.SELECT_DIGESTS_QUERY)
+        stored_digests = dict(cursor.fetchall())
+
+        changed_ids = []
+        prepared_data = []
+        details_data = []
+        for data in self.iter_advisories():
+            details_row = self.make_details_row(data)
+            vulner_id, _, _, digest, _ = details_row
+            if stored_digests.pop(vulner_id, None) == digest:
+                continue
+
+            changed_ids.append(vulner_id)
+            prepared_data.extend(self.make_package_rows(data))
+            details_data.append(details_row)
+
+        # Оставшиеся отпечатки принадлежат уязвимостям, которых больше нет в пакете
+        outdated_ids = changed_ids + list(stored_digests)
+        if not outdated_ids:
+            return changed_ids
+
+        # Границы пересчитываются для пакетов удаляемых и добавляемых интервалов
+        affected_names = [row[3] for row in prepared_data]
+        outdated_rows = self._select_by_vulnerabilities(self.SELECT_PACKAGES_BY_VULNERABILITY_QUERY, outdated_ids)
+        affected_names.extend(normalize_package_name(row[2]) for row in outdated_rows)
+        for index in range(0, len(outdated_ids), self.QUERY_BATCH_SIZE):
+            batch = outdated_ids[index:index + self.QUERY_BATCH_SIZE]
+            placeholders = ', '.join('?' * len(batch))
+            cursor.execute(self.DELETE_PACKAGES_QUERY.format(placeholders=placeholders), batch)
+            cursor.execute(self.DELETE_DETAILS_QUERY.format(placeholders=placeholders), batch)
+
+        cursor.executemany(self.INSERT_PACKAGE_INFO, prepared_data)
+        cursor.executemany(self.INSERT_DETAILS_INFO, details_data)
+        cursor.execute(self.CREATE_TABLE_BOUNDS)
+        self.update_package_bounds(affected_names)
+
+        generation = hashlib.sha256(
+            orjson.dumps([self.generation, sorted(row[:4] for row in details_data), sorted(stored_digests)])
+        ).hexdigest()
+        cursor.execute(self.INSERT_META_VALUE, (self.GENERATION_KEY, generation))
+        self.connection.commit()
+
+        if self.match_cache is not None:
+            # Вердикты, посчитанные до обновления, больше недействительны
+            self.match_cache.__exit__(None, None, None)
+            self.match_cache = MatchCache(cache_path=self.cache_path, generation=generation).__enter__()
+
+        return changed_ids
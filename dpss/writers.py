@@ -0,0 +1,323 @@
+"""
+Модуль потоковой записи отчетов
+"""
+
+import functools
+import html
+from abc import ABC, abstractmethod
+from importlib import resources
+from string import Template
+from typing import BinaryIO, TextIO
+from urllib.parse import urlsplit
+
+import orjson
+
+from dpss.models import VulnerDataSchema
+from dpss.utils import get_max_severity
+
+HTML_TEMPLATE_FILE = 'template.html'
+HTML_ROW_MARKER = '<!-- dpss:row -->'
+HTML_FOOTER_MARKER = '<!-- dpss:footer -->'
+
+# Ссылки из пакета уязвимостей выводятся ссылками только для этих схем, иначе как текст
+SAFE_URL_SCHEMES = ('http', 'https')
+
+MARKDOWN_HEADER = Template(
+    '# Dependency security report\n'
+    '\n'
+    'Created: $creation_date\n'
+    '\n'
+    '| Identifier | Severity | Score | Published | Affected packages | Description |\n'
+    '|---|---|---|---|---|---|\n'
+)
+MARKDOWN_ROW = Template('| $identifier | $severity | $score | $published | $packages | $description |\n')
+MARKDOWN_FOOTER = Template('\nTotal vulnerabilities: $total\n')
+
+
+@functools.cache
+def get_html_templates() -> tuple[Template, Template, Template]:
+    """
+    Функция загрузки шаблона HTML отчета, выполняется один раз за процесс
+
+    :return: Шаблоны заголовка, строки уязвимости и окончания отчета
+    """
+
+    template = resources.files('dpss').joinpath(HTML_TEMPLATE_FILE).read_text(encoding='UTF-8')
+    header, rest = template.split(HTML_ROW_MARKER)
+    row, footer = rest.split(HTML_FOOTER_MARKER)
+
+    return Template(header), Template(row.strip('\n') + '\n'), Template(footer.lstrip('\n'))
+
+
+def is_safe_url(url: str) -> bool:
+    """
+    Функция проверки, что ссылку можно вывести в отчет как ссылку
+
+    :param url: Ссылка
+    :return: Использует ли ссылка схему http или https
+    """
+
+    try:
+        return urlsplit(url).scheme.lower() in SAFE_URL_SCHEMES
+    except ValueError:
+        return False
+
+
+class ReportWriter(ABC):
+    """Базовый класс потоковой записи отчета"""
+
+    # Записи в бинарный поток принимают уязвимости в виде словарей, минуя схемы pydantic
+    binary = False
+
+    # Флаг дозаписи в конец существующего файла
+    append = False
+
+    def __init__(self, output: TextIO | BinaryIO) -> None:
+        """
+        Инициализация класса
+
+        :param output: Поток для записи (файл, сокет через makefile, StringIO или BytesIO)
+        """
+
+        self.output = output
+        self.total = 0
+
+    @abstractmethod
+    def write_header(self, creation_date: str) -> None:
+        """
+        Метод записи заголовка отчета
+
+        :param creation_date: Дата создания отчета
+        """
+
+    @abstractmethod
+    def write_vulnerability(self, vulner: VulnerDataSchema | dict) -> None:
+        """
+        Метод записи одной уязвимости
+
+        :param vulner: Информация об уязвимости
+        """
+
+    @abstractmethod
+    def write_footer(self) -> None:
+        """Метод записи окончания отчета"""
+
+    @staticmethod
+    def get_row_values(vulner: VulnerDataSchema) -> dict:
+        """
+        Метод подготовки значений строки уязвимости
+
+        :param vulner: Информация об уязвимости
+        :return: Словарь значений для подстановки в шаблон
+        """
+
+        ratings = vulner.ratings or []
+        scores = [rating.score for rating in ratings if rating.score is not None]
+
+        return {
+            'identifier': vulner.identifier,
+            'source_url': str(vulner.source_url or ''),
+            'severity': get_max_severity(rating.severity for rating in ratings),
+            'score': max(scores) if scores else '',
+            'published': vulner.published,
+            'packages': [
+                f'{soft.name}=={soft.version} '
+                f'({soft.vulnerable_interval.left_border} {soft.vulnerable_interval.left_version}, '
+                f'{soft.vulnerable_interval.right_border} {soft.vulnerable_interval.right_version})'
+                for soft in vulner.affected_packages
+            ],
+            'description': vulner.description,
+            'cwes': vulner.cwes or [],
+            'references': [reference.get('url') or '' for reference in vulner.references or []],
+        }
+
+
+class HTMLReportWriter(ReportWriter):
+    """Класс потоковой записи HTML отчета"""
+
+    def write_header(self, creation_date: str) -> None:
+        """
+        Метод записи заголовка отчета
+
+        :param creation_date: Дата создания отчета
+        """
+
+        header, _, _ = get_html_templates()
+        self.output.write(header.safe_substitute(creation_date=html.escape(creation_date)))
+
+    def write_vulnerability(self, vulner: VulnerDataSchema) -> None:
+        """
+        Метод записи одной уязвимости
+
+        :param vulner: Информация об уязвимости
+        """
+
+        _, row, _ = get_html_templates()
+        values = self.get_row_values(vulner)
+        self.output.write(
+            row.safe_substitute(
+                identifier=html.escape(values['identifier']),
+                source_url=html.escape(values['source_url']) if is_safe_url(values['source_url']) else '#',
+                severity=values['severity'],
+                score=values['score'],
+                published=html.escape(values['published']),
+                packages='<br>'.join(html.escape(package) for package in values['packages']),
+                description=html.escape(values['description']),
+                cwes='<br>'.join(html.escape(cwe) for cwe in values['cwes']),
+                references='<br>'.join(
+                    f'<a href="{html.escape(url)}">{html.escape(url)}</a>' if is_safe_url(url) else html.escape(url)
+                    for url in values['references']
+                ),
+            )
+        )
+        self.total += 1
+
+    def write_footer(self) -> None:
+        """Метод записи окончания отчета"""
+
+        _, _, footer = get_html_templates()
+        self.output.write(footer.safe_substitute(total=self.total))
+
+
+class MarkdownReportWriter(ReportWriter):
+    """Класс потоковой записи Markdown отчета"""
+
+    def write_header(self, creation_date: str) -> None:
+        """
+        Метод записи заголовка отчета
+
+        :param creation_date: Дата создания отчета
+        """
+
+        self.output.write(MARKDOWN_HEADER.safe_substitute(creation_date=self.escape(creation_date)))
+
+    def write_vulnerability(self, vulner: VulnerDataSchema) -> None:
+        """
+        Метод записи одной уязвимости
+
+        :param vulner: Информация об уязвимости
+        """
+
+        values = self.get_row_values(vulner)
+        identifier = self.escape(values['identifier'])
+        if is_safe_url(values['source_url']):
+            identifier = f'[{identifier}]({self.escape_url(values["source_url"])})'
+        self.output.write(
+            MARKDOWN_ROW.safe_substitute(
+                identifier=identifier,
+                severity=values['severity'],
+                score=values['score'],
+                published=self.escape(values['published']),
+                packages='<br>'.join(self.escape(package) for package in values['packages']),
+                description=self.escape(values['description']),
+            )
+        )
+        self.total += 1
+
+    def write_footer(self) -> None:
+        """Метод записи окончания отчета"""
+
+        self.output.write(MARKDOWN_FOOTER.safe_substitute(total=self.total))
+
+    @staticmethod
+    def escape(value: str) -> str:
+        """
+        Метод экранирования значения ячейки таблицы Markdown
+
+        Markdown пропускает встроенный HTML, поэтому данные из пакета уязвимостей
+        экранируются так же, как в HTML отчете.
+
+        :param value: Значение
+        :return: Экранированное значение в одну строку
+        """
+
+        return html.escape(value).replace('|', '\\|').replace('\r', ' ').replace('\n', ' ')
+
+    @staticmethod
+    def escape_url(url: str) -> str:
+        """
+        Метод экранирования адреса ссылки Markdown внутри ячейки таблицы
+
+        :param url: Адрес ссылки
+        :return: Адрес, который не закрывает ссылку и ячейку раньше времени
+        """
+
+        return url.replace('\\', '\\\\').replace(')', '\\)').replace(']', '\\]').replace('|', '\\|')
+
+
+class JSONReportWriter(ReportWriter):
+    """Класс потоковой записи компактного JSON отчета"""
+
+    binary = True
+
+    def write_header(self, creation_date: str) -> None:
+        """
+        Метод записи заголовка отчета
+
+        :param creation_date: Дата создания отчета
+        """
+
+        self.output.write(b'{"creation_date":' + orjson.dumps(creation_date) + b',"vulnerabilities":[')
+
+    def write_vulnerability(self, vulner: dict) -> None:
+        """
+        Метод записи одной уязвимости
+
+        :param vulner: Информация об уязвимости
+        """
+
+        if self.total:
+            self.output.write(b',')
+        self.output.write(orjson.dumps(vulner))
+        self.total += 1
+
+    def write_footer(self) -> None:
+        """Метод записи окончания отчета"""
+
+        self.output.write(b']}')
+
+
+class JSONLinesReportWriter(ReportWriter):
+    """
+    Класс потоковой записи отчета в формате JSON Lines
+
+    Каждая уязвимость пишется отдельной самодостаточной строкой, поэтому
+    файл можно безопасно дописывать несколькими отчетами.
+    """
+
+    binary = True
+    append = True
+
+    def __init__(self, output: BinaryIO) -> None:
+        """
+        Инициализация класса
+
+        :param output: Бинарный поток для записи
+        """
+
+        super().__init__(output)
+        self.creation_date = None
+
+    def write_header(self, creation_date: str) -> None:
+        """
+        Метод записи заголовка отчета
+
+        :param creation_date: Дата создания отчета
+        """
+
+        self.creation_date = creation_date
+
+    def write_vulnerability(self, vulner: dict) -> None:
+        """
+        Метод записи одной уязвимости
+
+        :param vulner: Информация об уязвимости
+        """
+
+        self.output.write(
+            orjson.dumps({'creation_date': self.creation_date, **vulner}, option=orjson.OPT_APPEND_NEWLINE)
+        )
+        self.total += 1
+
+    def write_footer(self) -> None:
+        """Метод записи окончания отчета"""
@@ -36,7 +36,9 @@ if __name__ == '__main__':
         license='',
         url='https://github.com/mottyas/depss',
         download_url='https://github.com/mottyas/depss/archive/refs/heads/main.zip',
-        entry_points={},
+        entry_points={
+            'console_scripts': ['dpss = dpss.cli:main'],
+        },
         classifiers=[
             'Intended Audience :: Developers',
             'Programming Language :: Python :: 3.12'
@@ -0,0 +1,236 @@
+"""
+Общие фикстуры тестов: пакет уязвимостей и собранная из него БД
+"""
+
+import io
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
+
+import orjson
+import pytest
+
+from dpss.feed import get_advisory_file_name
+from dpss.models import ProjectConfigSchema, ScanConfigSchema
+from dpss.sbom import GeneratorSBOM
+from dpss.scanner import Scanner
+from dpss.vulnerdb import VulnerabilityDB
+
+SOURCE_NAME = 'test'
+
+# Генератор SBOM вместо cyclonedx-py: пары name==version из requirements.txt в формате CycloneDX
+SBOM_SCRIPT = '''
+import json, sys
+components = []
+for line in open(sys.argv[1]).read().splitlines():
+    name, _, version = line.strip().partition('==')
+    if name:
+        components.append({'name': name, 'version': version, 'purl': f'pkg:pypi/{name}@{version}', 'type': 'library'})
+print(json.dumps({'components': components}))
+'''
+
+
+def make_advisory(
+        identifier: str,
+        name: str,
+        intervals: list[tuple[str, str, str, str]],
+        description: str = 'description',
+        severity: str = 'high',
+) -> dict:
+    """
+    Функция построения данных уязвимости в формате пакета
+
+    :param identifier: Идентификатор уязвимости
+    :param name: Имя пакета
+    :param intervals: Список интервалов (условие и версия левой границы, версия и условие правой границы)
+    :param description: Описание уязвимости
+    :param severity: Критичность
+    :return: Данные уязвимости
+    """
+
+    return {
+        'identifier': identifier,
+        'published': '2024-01-01',
+        'description': description,
+        'source': [{'source_name': SOURCE_NAME, 'source_url': f'https://example.com/{identifier}'}],
+        'affects': [
+            {
+                'name': name,
+                'version': {
+                    'start_condition': opener,
+                    'start_value': left,
+                    'end_value': right,
+                    'end_condition': closer,
+                },
+            }
+            for opener, left, right, closer in intervals
+        ],
+        'ratings': [
+            {
+                'method': 'CVSSv31',
+                'score': 7.5,
+                'severity': severity,
+                'source_name': SOURCE_NAME,
+                'source_url': f'https://example.com/{identifier}',
+                'vector': 'CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:N/A:N',
+                'version': 3.1,
+            },
+        ],
+        'references': [{'url': f'https://example.com/{identifier}/ref'}],
+    }
+
+
+def write_advisory(feed_dir: Path, advisory: dict) -> Path:
+    """
+    Функция записи уязвимости в директорию пакета
+
+    :param feed_dir: Директория пакета
+    :param advisory: Данные уязвимости
+    :return: Путь до файла уязвимости
+    """
+
+    feed_dir.mkdir(parents=True, exist_ok=True)
+    file_path = feed_dir / get_advisory_file_name(SOURCE_NAME, advisory['identifier'])
+    file_path.write_bytes(orjson.dumps(advisory))
+    return file_path
+
+
+@pytest.fixture
+def feed_dir(tmp_path: Path) -> Path:
+    """Пакет уязвимостей из двух пакетов с тремя уязвимостями"""
+
+    feed_dir = tmp_path / 'feed'
+    write_advisory(feed_dir, make_advisory('VULN-1', 'Pillow', [('gte', '1.0', '2.0', 'lt')]))
+    write_advisory(feed_dir, make_advisory('VULN-2', 'typing_extensions', [('gte', '4.0', '5.0', 'lt')]))
+    write_advisory(feed_dir, make_advisory('VULN-3', 'Pillow', [('gt', '5.0', '', 'lt')]))
+    return feed_dir
+
+
+@pytest.fixture
+def db_path(tmp_path: Path, feed_dir: Path) -> Path:
+    """Собранная из пакета БД уязвимостей"""
+
+    db_path = tmp_path / 'db' / 'vulner.db'
+    db_path.parent.mkdir()
+    with VulnerabilityDB(db_path=db_path, package_folder=feed_dir):
+        pass
+
+    return db_path
+
+
+@pytest.fixture
+def count_rows(db_path: Path) -> Callable[[str], int]:
+    """Функция подсчета строк таблицы БД уязвимостей"""
+
+    def count(table: str) -> int:
+        with VulnerabilityDB(db_path=db_path, read_only=True) as vulner_db:
+            return vulner_db.connection.execute(f'SELECT COUNT(*) FROM {table};').fetchone()[0]
+
+    return count
+
+
+class FakeRemoteHosts:
+    """Удаленные хосты с requirements проектов вместо SSH серверов"""
+
+    def __init__(self) -> None:
+        """Инициализация хостов"""
+
+        self.files = {}
+        self.delay = 0.0
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+        self.fetched = []
+
+    def add_project(self, host: str, project_dir: str, requirements: dict[str, str]) -> None:
+        """
+        Метод добавления requirements проекта на хост
+
+        :param host: Хост
+        :param project_dir: Директория проекта на хосте
+        :param requirements: Версии пакетов по имени
+        """
+
+        data = ''.join(f'{name}=={version}\n' for name, version in requirements.items())
+        self.files[(host, f'{project_dir}/requirements.txt')] = data.encode()
+
+    def exec_command(self, host: str, command: str) -> SimpleNamespace:
+        """
+        Метод выполнения команды cat на хосте
+
+        :param host: Хост
+        :param command: Команда
+        :return: Ответ с потоками stdout и stderr
+        """
+
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+            self.fetched.append((host, command))
+        try:
+            time.sleep(self.delay)
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+        data = self.files.get((host, command.removeprefix('cat ')))
+        if data is None:
+            return SimpleNamespace(stdout=io.BytesIO(), stderr=io.BytesIO(b'No such file or directory'))
+
+        return SimpleNamespace(stdout=io.BytesIO(data), stderr=io.BytesIO())
+
+
+class FakeSSHClient:
+    """Клиент SSH без подключения: команды сканера выполняются на FakeRemoteHosts"""
+
+    def __init__(self) -> None:
+        """Инициализация клиента"""
+
+        self.closed = False
+
+    def get_transport(self):
+        """Метод получения транспорта соединения"""
+
+        return None if self.closed else type('Transport', (), {'is_active': lambda transport: True})()
+
+    def close(self) -> None:
+        """Метод закрытия соединения"""
+
+        self.closed = True
+
+
+@pytest.fixture
+def remote(monkeypatch) -> FakeRemoteHosts:
+    """Удаленные хосты: подключения сканера и генерация SBOM подменены без сети и cyclonedx-py"""
+
+    remote = FakeRemoteHosts()
+    monkeypatch.setattr(Scanner, '_get_connection', lambda scanner: FakeSSHClient())
+    monkeypatch.setattr(Scanner, 'send_command', lambda scanner, command: remote.exec_command(scanner.config.host, command))
+    monkeypatch.setattr(
+        GeneratorSBOM,
+        'get_command',
+        lambda generator: [sys.executable, '-c', SBOM_SCRIPT, generator.source_path / 'requirements.txt'],
+    )
+    return remote
+
+
+def make_scan_config(host: str, projects: dict[str, str], **kwargs) -> ScanConfigSchema:
+    """
+    Функция построения конфигурации сканирования хоста
+
+    :param host: Хост
+    :param projects: Директории проектов на хосте по имени проекта
+    :param kwargs: Дополнительные поля конфигураций проектов
+    :return: Конфигурация сканирования
+    """
+
+    return ScanConfigSchema(
+        host=host,
+        user='user',
+        secret='secret',
+        name='scan',
+        projects=[ProjectConfigSchema(name=name, dir=project_dir, **kwargs) for name, project_dir in projects.items()],
+    )
@@ -0,0 +1,60 @@
+"""
+Тесты асинхронного API сканирования
+"""
+
+import asyncio
+
+from dpss.aio import AsyncDependencySecurityScanner, AsyncScanLimits
+from tests.conftest import make_scan_config
+
+
+def test_concurrent_hosts_with_same_named_projects(tmp_path, remote, db_path, feed_dir):
+    remote.delay = 0.05
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5'})
+    remote.add_project('host-b', '/srv/web', {'typing_extensions': '4.1'})
+    data_dir = tmp_path / 'data'
+    limits = AsyncScanLimits(ssh_operations=4, sbom_processes=2)
+    scanners = [
+        AsyncDependencySecurityScanner(
+            scan_config=make_scan_config(host, {'web': '/srv/web'}),
+            db_path=db_path,
+            data_dir=data_dir,
+            vulners_package_dir=feed_dir,
+            limits=limits,
+        )
+        for host in ('host-a', 'host-b')
+    ]
+
+    async def collect(scanner: AsyncDependencySecurityScanner) -> list:
+        return [findings async for findings in scanner.iter_findings()]
+
+    async def main() -> list:
+        return await asyncio.gather(*(collect(scanner) for scanner in scanners))
+
+    results = asyncio.run(main())
+
+    assert [
+        [(findings.host, findings.project, [vulner.vulner_id for vulner in findings.vulnerabilities]) for findings in result]
+        for result in results
+    ] == [[('host-a', 'web', ['VULN-1'])], [('host-b', 'web', ['VULN-2'])]]
+    # Директории сканирований удаляются после завершения
+    assert not any((data_dir / 'scans').iterdir())
+
+
+def test_run_builds_report(tmp_path, remote, db_path, feed_dir):
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5', 'typing_extensions': '4.1'})
+    remote.add_project('host-a', '/srv/api', {'pillow': '5.5'})
+    found = []
+    scanner = AsyncDependencySecurityScanner(
+        scan_config=make_scan_config('host-a', {'web': '/srv/web', 'api': '/srv/api', 'missing': '/srv/missing'}),
+        db_path=db_path,
+        data_dir=tmp_path / 'data',
+        vulners_package_dir=feed_dir,
+        on_findings=found.append,
+    )
+
+    asyncio.run(scanner.run())
+
+    assert sorted(findings.project for findings in found) == ['api', 'web']
+    assert sorted(scanner.found_vulnerabilities) == ['VULN-1', 'VULN-2', 'VULN-3']
+    assert sorted(vulner.identifier for vulner in scanner.report.vulnerabilities) == ['VULN-1', 'VULN-2', 'VULN-3']
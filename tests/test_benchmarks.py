@@ -0,0 +1,59 @@
+"""
+Тесты генераторов синтетических данных и сравнения результатов замеров
+"""
+
+import orjson
+
+from benchmarks.generators import generate_feed, generate_sbom
+from benchmarks.run import compare_results
+from dpss.sbom import ComponentsAnalyzer
+from dpss.vulnerdb import VulnerabilityDB
+
+
+def read_feed(feed_dir) -> dict[str, bytes]:
+    """
+    Функция чтения файлов пакета уязвимостей
+
+    :param feed_dir: Директория пакета
+    :return: Содержимое файлов по имени
+    """
+
+    return {file_path.name: file_path.read_bytes() for file_path in feed_dir.iterdir()}
+
+
+def test_generators_are_reproducible(tmp_path):
+    first_feed = generate_feed(tmp_path / 'first', advisories=20, packages=10, seed=1)
+    second_feed = generate_feed(tmp_path / 'second', advisories=20, packages=10, seed=1)
+    other_feed = generate_feed(tmp_path / 'other', advisories=20, packages=10, seed=2)
+
+    assert len(read_feed(first_feed)) == 20
+    assert read_feed(first_feed) == read_feed(second_feed)
+    assert read_feed(first_feed) != read_feed(other_feed)
+
+    first_sbom = generate_sbom(tmp_path / 'first.json', components=5, packages=10, seed=1)
+    second_sbom = generate_sbom(tmp_path / 'second.json', components=5, packages=10, seed=1)
+    assert first_sbom.read_bytes() == second_sbom.read_bytes()
+    assert len(orjson.loads(first_sbom.read_bytes())['components']) == 5
+
+
+def test_generated_data_is_analyzed(tmp_path):
+    feed_dir = generate_feed(tmp_path / 'feed', advisories=200, packages=20, intervals=3)
+    sbom_path = generate_sbom(tmp_path / 'sbom.json', components=20, packages=20)
+    db_path = tmp_path / 'vulner.db'
+    with VulnerabilityDB(db_path=db_path, package_folder=feed_dir) as vulner_db:
+        assert vulner_db.has_advisories()
+
+    analyzer = ComponentsAnalyzer(sbom_source=sbom_path, db_path=db_path, package_folder=feed_dir)
+
+    assert len(analyzer.get_components()) == 20
+    assert analyzer.find_vulnerabilities_in_components()
+
+
+def test_compare_results_reports_only_slowdowns():
+    baseline = {'results': {'match': {'median': 1.0}, 'report': {'median': 1.0}, 'removed': {'median': 1.0}}}
+    current = {'results': {'match': {'median': 1.5}, 'report': {'median': 1.1}, 'added': {'median': 9.0}}}
+
+    regressions = compare_results(current, baseline, threshold=0.2)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith('match: ')
@@ -0,0 +1,37 @@
+"""
+Тесты постоянного кэша результатов сопоставления
+"""
+
+from dpss.cache import MatchCache
+from dpss.vulnerdb import VulnerabilityDB
+from tests.conftest import make_advisory, write_advisory
+
+
+def test_entries_are_dropped_on_generation_change(tmp_path):
+    cache_path = tmp_path / 'cache.db'
+    rows = [('VULN-1', 'test', 'Pillow', 'gte', '1.0', '2.0', 'lt')]
+    with MatchCache(cache_path, generation='first') as cache:
+        cache.put('pillow', '1.5', rows)
+        assert cache.get('pillow', '1.5') == rows
+        assert cache.get('pillow', '1.6') is None
+
+    with MatchCache(cache_path, generation='first') as cache:
+        assert cache.get('pillow', '1.5') == rows
+
+    with MatchCache(cache_path, generation='second') as cache:
+        assert cache.get('pillow', '1.5') is None
+        assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_cached_verdicts_are_invalidated_by_feed_update(tmp_path, db_path, feed_dir):
+    cache_path = tmp_path / 'cache.db'
+    with VulnerabilityDB(db_path=db_path, package_folder=feed_dir, cache_path=cache_path) as vulner_db:
+        assert [row[0] for row in vulner_db.get_matched_vulnerabilities('Pillow', '1.5')] == ['VULN-1']
+        assert [row[0] for row in vulner_db.get_matched_vulnerabilities('pillow', '1.5')] == ['VULN-1']
+        assert vulner_db.match_cache.hits == 1
+
+    write_advisory(feed_dir, make_advisory('VULN-4', 'pillow', [('gte', '1.5', '1.6', 'lt')]))
+    with VulnerabilityDB(db_path=db_path, package_folder=feed_dir, cache_path=cache_path) as vulner_db:
+        assert vulner_db.ingest_advisories() == ['VULN-4']
+        assert sorted(row[0] for row in vulner_db.get_matched_vulnerabilities('Pillow', '1.5')) == ['VULN-1', 'VULN-4']
+        assert vulner_db.match_cache.hits == 0
@@ -0,0 +1,75 @@
+"""
+Тесты консольной утилиты
+"""
+
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import orjson
+import pytest
+
+from benchmarks.startup import CHECK_MODULES_CODE, FORBIDDEN_MODULES
+from dpss.cli import main
+from dpss.const import ReportTypes
+from dpss.vulnerdb import VulnerabilityDB
+
+SBOM = {
+    'components': [
+        {'name': 'Pillow', 'version': '1.5', 'purl': 'pkg:pypi/Pillow@1.5', 'type': 'library'},
+        {'name': 'requests', 'version': '2.0', 'purl': 'pkg:pypi/requests@2.0', 'type': 'library'},
+    ],
+}
+
+
+@pytest.fixture
+def sbom_path(tmp_path):
+    """SBOM файл с одним уязвимым компонентом"""
+
+    sbom_path = tmp_path / 'sbom.json'
+    sbom_path.write_bytes(orjson.dumps(SBOM))
+    return sbom_path
+
+
+def test_sbom_report_is_written(tmp_path, sbom_path, db_path, feed_dir):
+    output = tmp_path / 'report.jsonl'
+
+    assert main([str(sbom_path), '--db', str(db_path), '--type', ReportTypes.JSONL, '--output', str(output)]) == 0
+
+    assert [orjson.loads(line)['identifier'] for line in output.read_bytes().splitlines()] == ['VULN-1']
+
+
+def test_report_is_written_to_stdout(sbom_path, db_path, feed_dir, capsys):
+    assert main([str(sbom_path), '--db', str(db_path), '--feed', str(feed_dir), '--type', ReportTypes.MARKDOWN]) == 0
+
+    assert '[VULN-1](https://example.com/VULN-1)' in capsys.readouterr().out
+
+
+def test_local_analysis_does_not_import_ssh_stack():
+    result = subprocess.run(
+        [sys.executable, '-c', CHECK_MODULES_CODE.format(modules=FORBIDDEN_MODULES)],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent.parent,
+    )
+
+    assert result.stdout.strip() == ''
+
+
+def test_outdated_db_without_feed_is_an_argument_error(tmp_path, sbom_path, db_path, capsys):
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(VulnerabilityDB.INSERT_META_VALUE, (VulnerabilityDB.SCHEMA_VERSION_KEY, '1'))
+    empty_feed = tmp_path / 'empty'
+    empty_feed.mkdir()
+
+    with pytest.raises(SystemExit) as error:
+        main([str(sbom_path), '--db', str(db_path)])
+    assert error.value.code == 2
+    assert '--feed' in capsys.readouterr().err
+
+    with pytest.raises(SystemExit) as error:
+        main([str(sbom_path), '--db', str(db_path), '--feed', str(empty_feed)])
+    assert error.value.code == 2
+    assert str(empty_feed) in capsys.readouterr().err
@@ -0,0 +1,115 @@
+"""
+Тесты HTTP API долгоживущего сервиса сканирования
+"""
+
+import threading
+import urllib.error
+import urllib.request
+
+import orjson
+import pytest
+
+from dpss.daemon import ScanDaemon
+from tests.conftest import make_scan_config
+
+
+@pytest.fixture
+def daemon(tmp_path, remote, db_path, feed_dir):
+    """Запущенный на свободном порту сервис сканирования"""
+
+    with ScanDaemon(db_path=db_path, data_dir=tmp_path / 'data', package_folder=feed_dir, port=0) as daemon:
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield daemon
+        finally:
+            daemon.shutdown()
+            thread.join()
+
+
+def request(daemon: ScanDaemon, path: str, body: bytes | None = None) -> tuple[int, bytes]:
+    """
+    Функция отправки запроса к сервису
+
+    :param daemon: Запущенный сервис
+    :param path: Путь запроса
+    :param body: Тело POST запроса, для GET запроса не передается
+    :return: Код и тело ответа
+    """
+
+    host, port = daemon.server.server_address[:2]
+    try:
+        with urllib.request.urlopen(f'http://{host}:{port}{path}', data=body, timeout=10) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.read()
+
+
+def get_vulnerabilities(findings: list[dict]) -> list[tuple[str, list[tuple[str, str]]]]:
+    """
+    Функция получения идентификаторов уязвимостей и уязвимых пакетов из ответа
+
+    :param findings: Найденные уязвимости из ответа
+    :return: Список пар (идентификатор, пакеты)
+    """
+
+    return [
+        (vulner['vulner_id'], [(soft['name'], soft['version']) for soft in vulner['affected_soft']])
+        for vulner in findings
+    ]
+
+
+def test_requirements_endpoint(daemon):
+    status, body = request(daemon, '/requirements', b'Pillow==1.5\ntyping_extensions==3.0\n')
+
+    assert status == 200
+    assert get_vulnerabilities(orjson.loads(body)) == [('VULN-1', [('Pillow', '1.5')])]
+    assert not any((daemon.data_dir / 'requests').iterdir())
+
+
+def test_sbom_endpoint(daemon):
+    sbom = {'components': [{
+        'name': 'typing_extensions',
+        'version': '4.1',
+        'purl': 'pkg:pypi/typing_extensions@4.1',
+        'type': 'library',
+    }]}
+
+    status, body = request(daemon, '/sbom', orjson.dumps(sbom))
+
+    assert status == 200
+    assert get_vulnerabilities(orjson.loads(body)) == [('VULN-2', [('typing_extensions', '4.1')])]
+
+
+def test_project_endpoint_reuses_session(daemon, remote):
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5'})
+    remote.add_project('host-a', '/srv/api', {'typing_extensions': '4.1'})
+    scan_config = make_scan_config('host-a', {'web': '/srv/web', 'api': '/srv/api'})
+
+    for _ in range(2):
+        status, body = request(daemon, '/project', scan_config.model_dump_json().encode())
+        assert status == 200
+        assert [
+            (findings['host'], findings['project'], get_vulnerabilities(findings['vulnerabilities']))
+            for findings in orjson.loads(body)
+        ] == [
+            ('host-a', 'web', [('VULN-1', [('Pillow', '1.5')])]),
+            ('host-a', 'api', [('VULN-2', [('typing_extensions', '4.1')])]),
+        ]
+
+    assert len(daemon.sessions.sessions) == 1
+    assert not any((daemon.data_dir / 'requests').iterdir())
+
+
+def test_health_metrics_and_errors(daemon):
+    assert request(daemon, '/health') == (200, b'{"status":"ok"}')
+    request(daemon, '/requirements', b'Pillow==1.5\n')
+
+    status, body = request(daemon, '/metrics')
+    assert status == 200
+    assert b'dpss_' in body
+
+    assert request(daemon, '/unknown')[0] == 404
+    assert request(daemon, '/unknown', b'{}')[0] == 404
+    assert request(daemon, '/sbom', b'not json')[0] == 400
+    assert request(daemon, '/project', b'{"host": "host-a"}')[0] == 400
@@ -0,0 +1,77 @@
+"""
+Тесты конвейерного сканирования проектов
+"""
+
+import pytest
+
+from dpss.dpss import DependencySecurityScanner
+from tests.conftest import make_scan_config
+
+
+def make_scanner(tmp_path, db_path, feed_dir, projects: dict, **kwargs) -> DependencySecurityScanner:
+    """
+    Функция создания сканера проектов одного хоста
+
+    :param tmp_path: Временная директория теста
+    :param db_path: Путь до файла с БД
+    :param feed_dir: Директория с пакетом уязвимостей
+    :param projects: Пути до проектов по их именам
+    :return: Сканер проектов
+    """
+
+    return DependencySecurityScanner(
+        scan_config=make_scan_config('host-a', projects),
+        db_path=db_path,
+        data_dir=tmp_path / 'data',
+        vulners_package_dir=feed_dir,
+        **kwargs,
+    )
+
+
+def test_findings_are_streamed_per_project(tmp_path, remote, db_path, feed_dir):
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5', 'requests': '2.0'})
+    remote.add_project('host-a', '/srv/api', {'typing_extensions': '4.1'})
+    remote.add_project('host-a', '/srv/clean', {'requests': '2.0'})
+    found = []
+    scanner = make_scanner(
+        tmp_path, db_path, feed_dir, {'web': '/srv/web', 'api': '/srv/api', 'clean': '/srv/clean'},
+        on_findings=found.append,
+    )
+
+    findings = {item.project: item for item in scanner.iter_findings()}
+
+    assert {
+        project: [(vulner.vulner_id, [(soft.name, soft.version) for soft in vulner.affected_soft]) for vulner in item.vulnerabilities]
+        for project, item in findings.items()
+    } == {
+        'web': [('VULN-1', [('Pillow', '1.5')])],
+        'api': [('VULN-2', [('typing_extensions', '4.1')])],
+        'clean': [],
+    }
+    assert {item.host for item in findings.values()} == {'host-a'}
+    assert sorted(item.project for item in found) == ['api', 'clean', 'web']
+
+
+def test_run_merges_findings_into_report(tmp_path, remote, db_path, feed_dir):
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5'})
+    remote.add_project('host-a', '/srv/api', {'Pillow': '1.6'})
+    scanner = make_scanner(tmp_path, db_path, feed_dir, {'web': '/srv/web', 'api': '/srv/api'})
+
+    scanner.run()
+
+    assert sorted((soft.name, soft.version) for soft in scanner.found_vulnerabilities['VULN-1']['soft']) == [
+        ('Pillow', '1.5'), ('Pillow', '1.6'),
+    ]
+    assert [vulner.identifier for vulner in scanner.report.vulnerabilities] == ['VULN-1']
+
+
+def test_consumer_error_stops_streaming(tmp_path, remote, db_path, feed_dir):
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5'})
+
+    def on_findings(findings):
+        raise RuntimeError(f'cannot store {findings.project}')
+
+    scanner = make_scanner(tmp_path, db_path, feed_dir, {'web': '/srv/web'}, on_findings=on_findings)
+
+    with pytest.raises(RuntimeError, match='cannot store web'):
+        scanner.run()
@@ -0,0 +1,86 @@
+"""
+Тесты чтения пакета уязвимостей из директории и архивов
+"""
+
+import tarfile
+import zipfile
+
+import pytest
+
+from dpss.feed import DirectoryFeed, TarFeed, ZipFeed, get_advisory_file_name, open_feed
+from dpss.vulnerdb import VulnerabilityDB
+from tests.conftest import SOURCE_NAME
+
+
+def make_zip(feed_dir, archive_path):
+    """
+    Функция упаковки пакета в zip архив со вложенной директорией
+
+    :param feed_dir: Директория пакета
+    :param archive_path: Путь до архива
+    :return: Путь до архива
+    """
+
+    with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for file_path in feed_dir.iterdir():
+            archive.write(file_path, f'feed/{file_path.name}')
+    return archive_path
+
+
+def make_tar(feed_dir, archive_path, mode='w:gz'):
+    """
+    Функция упаковки пакета в tar архив со вложенной директорией
+
+    :param feed_dir: Директория пакета
+    :param archive_path: Путь до архива
+    :param mode: Режим записи архива
+    :return: Путь до архива
+    """
+
+    with tarfile.open(archive_path, mode) as archive:
+        archive.add(feed_dir, arcname='feed')
+    return archive_path
+
+
+@pytest.fixture(params=['dir', 'zip', 'tar', 'tar.gz'])
+def feed_path(request, tmp_path, feed_dir):
+    """Пакет уязвимостей в каждом из поддерживаемых форматов"""
+
+    if request.param == 'dir':
+        return feed_dir
+    if request.param == 'zip':
+        return make_zip(feed_dir, tmp_path / 'feed.zip')
+    if request.param == 'tar':
+        return make_tar(feed_dir, tmp_path / 'feed.tar', mode='w')
+    return make_tar(feed_dir, tmp_path / 'feed.tar.gz')
+
+
+def test_open_feed_detects_format(tmp_path, feed_dir):
+    expected = [
+        (feed_dir, DirectoryFeed),
+        (make_zip(feed_dir, tmp_path / 'feed.zip'), ZipFeed),
+        (make_tar(feed_dir, tmp_path / 'feed.tgz'), TarFeed),
+    ]
+    for path, feed_class in expected:
+        with open_feed(path) as feed:
+            assert type(feed) is feed_class
+
+    unsupported = tmp_path / 'feed.txt'
+    unsupported.write_text('not an archive')
+    with pytest.raises(ValueError, match='Unsupported'):
+        open_feed(unsupported)
+
+
+def test_feed_reads_all_and_single_advisories(feed_path):
+    with open_feed(feed_path) as feed:
+        assert sorted(advisory['identifier'] for advisory in feed.iter_advisories()) == ['VULN-1', 'VULN-2', 'VULN-3']
+        assert feed.load(get_advisory_file_name(SOURCE_NAME, 'VULN-2'))['affects'][0]['name'] == 'typing_extensions'
+        with pytest.raises(FileNotFoundError):
+            feed.load(get_advisory_file_name(SOURCE_NAME, 'UNKNOWN'))
+
+
+def test_db_is_built_from_archive(tmp_path, feed_path):
+    with VulnerabilityDB(db_path=tmp_path / 'vulner.db', package_folder=feed_path) as vulner_db:
+        assert vulner_db.is_feed_usable()
+        assert [row[0] for row in vulner_db.get_matched_vulnerabilities('Pillow', '5.1')] == ['VULN-3']
+        assert sorted(vulner_db.get_vulnerability_details(['VULN-1', 'VULN-2'])) == ['VULN-1', 'VULN-2']
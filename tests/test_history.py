@@ -0,0 +1,106 @@
+"""
+Тесты истории сканирований и инкрементального сопоставления
+"""
+
+import sqlite3
+
+from dpss.dpss import DependencySecurityScanner
+from dpss.history import ScanHistory
+from tests.conftest import make_scan_config
+
+
+def scan(tmp_path, db_path, feed_dir, host: str, projects: dict) -> DependencySecurityScanner:
+    """
+    Функция сканирования проектов хоста с сохранением истории
+
+    :param tmp_path: Временная директория теста
+    :param db_path: Путь до файла с БД
+    :param feed_dir: Директория с пакетом уязвимостей
+    :param host: Хост
+    :param projects: Пути до проектов по их именам
+    :return: Завершивший сканирование сканер
+    """
+
+    scanner = DependencySecurityScanner(
+        scan_config=make_scan_config(host, projects),
+        db_path=db_path,
+        data_dir=tmp_path / 'data',
+        vulners_package_dir=feed_dir,
+        history_path=tmp_path / 'history' / 'history.db',
+    )
+    scanner.run()
+    return scanner
+
+
+def get_delta(scanner: DependencySecurityScanner) -> dict:
+    """
+    Функция получения идентификаторов новых и устраненных уязвимостей по проектам
+
+    :param scanner: Завершивший сканирование сканер
+    :return: Пары списков новых и устраненных уязвимостей по имени проекта
+    """
+
+    return {
+        delta.project: (
+            [vulner.vulner_id for vulner in delta.new],
+            [vulner.vulner_id for vulner in delta.resolved],
+        )
+        for delta in scanner.delta.projects
+    }
+
+
+def test_delta_and_rematched_components(tmp_path, remote, db_path, feed_dir, monkeypatch):
+    matched = []
+    match_components = DependencySecurityScanner.match_components
+
+    def spy(components, vulner_db):
+        matched.extend(component.name for component in components)
+        return match_components(components, vulner_db)
+
+    monkeypatch.setattr(DependencySecurityScanner, 'match_components', staticmethod(spy))
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5', 'requests': '2.0'})
+    first = scan(tmp_path, db_path, feed_dir, 'host-a', {'web': '/srv/web'})
+
+    assert get_delta(first) == {'web': (['VULN-1'], [])}
+    assert sorted(matched) == ['Pillow', 'requests']
+
+    matched.clear()
+    remote.add_project('host-a', '/srv/web', {'Pillow': '2.5', 'requests': '2.0', 'typing_extensions': '4.1'})
+    second = scan(tmp_path, db_path, feed_dir, 'host-a', {'web': '/srv/web'})
+
+    # Неизмененный компонент берется из истории и заново не сопоставляется
+    assert sorted(matched) == ['Pillow', 'typing_extensions']
+    assert get_delta(second) == {'web': (['VULN-2'], ['VULN-1'])}
+    assert sorted(second.found_vulnerabilities) == ['VULN-2']
+
+
+def test_same_named_projects_of_hosts_have_separate_history(tmp_path, remote, db_path, feed_dir):
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5'})
+    remote.add_project('host-b', '/srv/web', {'typing_extensions': '4.1'})
+
+    scan(tmp_path, db_path, feed_dir, 'host-a', {'web': '/srv/web'})
+    second = scan(tmp_path, db_path, feed_dir, 'host-b', {'web': '/srv/web'})
+
+    # Проект другого хоста не считается предыдущим сканированием этого проекта
+    assert get_delta(second) == {'web': (['VULN-2'], [])}
+    with ScanHistory(tmp_path / 'history' / 'history.db') as history:
+        assert sorted(history.get_last_scan_dates()) == [('host-a', 'web'), ('host-b', 'web')]
+        assert sorted(row[:3] for row in history.find_inventory(['PILLOW', 'typing-extensions'])) == [
+            ('host-a', 'web', 'pillow'), ('host-b', 'web', 'typing-extensions'),
+        ]
+
+
+def test_history_without_host_is_migrated(tmp_path):
+    history_path = tmp_path / 'history.db'
+    with sqlite3.connect(history_path) as connection:
+        connection.execute('CREATE TABLE scans (id INTEGER PRIMARY KEY, name TEXT NOT NULL, date TEXT NOT NULL);')
+        connection.execute(
+            'CREATE TABLE project_scans (scan_id INTEGER NOT NULL, project TEXT NOT NULL, generation TEXT NOT NULL);'
+        )
+        connection.execute("INSERT INTO scans (id, name, date) VALUES (1, 'scan', '01_01_2024_00_00_00');")
+        connection.execute("INSERT INTO project_scans (scan_id, project, generation) VALUES (1, 'web', 'first');")
+
+    with ScanHistory(history_path) as history:
+        assert history.get_last_scan_dates() == {('', 'web'): '01_01_2024_00_00_00'}
+        assert history.get_last_project_scan('', 'web') == (1, 'first')
+        assert history.get_last_project_scan('host-a', 'web') is None
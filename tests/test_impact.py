@@ -0,0 +1,85 @@
+"""
+Тесты обратного поиска затронутых проектов
+"""
+
+import pytest
+
+from dpss.history import ScanHistory
+from dpss.impact import ImpactAnalyzer
+from tests.conftest import make_advisory, write_advisory
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    """История сканирований с одним проектом, использующим Pillow 1.5 и typing-extensions 4.1"""
+
+    history_path = tmp_path / 'history.db'
+    with ScanHistory(history_path) as history:
+        scan_id = history.start_scan('scan', '01_01_2024_00_00_00')
+        history.save_project(
+            scan_id=scan_id,
+            host='host-1',
+            project='web',
+            generation='generation',
+            components=[('Pillow', '1.5'), ('typing-extensions', '4.1')],
+            findings=[],
+        )
+
+    return history_path
+
+
+def test_update_finds_projects_affected_by_new_advisory(db_path, feed_dir, history_path):
+    write_advisory(feed_dir, make_advisory('VULN-4', 'typing-extensions', [('gte', '4.1', '4.2', 'lt')]))
+
+    analyzer = ImpactAnalyzer(db_path=db_path, history_path=history_path, package_folder=feed_dir)
+    affected = analyzer.update()
+
+    assert analyzer.changed_vulnerabilities == ['VULN-4']
+    assert [(project.project, [vulner.vulner_id for vulner in project.vulnerabilities]) for project in affected] == [
+        ('web', ['VULN-4']),
+    ]
+
+
+def test_update_without_changes_keeps_populated_db(db_path, feed_dir, history_path, count_rows):
+    bounds_count = count_rows('package_bounds')
+
+    analyzer = ImpactAnalyzer(db_path=db_path, history_path=history_path, package_folder=feed_dir)
+
+    assert analyzer.update() == []
+    assert count_rows('package_bounds') == bounds_count
+
+
+@pytest.mark.parametrize('feed_name', ['db', 'missing'])
+def test_update_refuses_feed_without_advisories(db_path, history_path, count_rows, feed_name):
+    # Директория БД уязвимостей не содержит, загрузка из нее удалила бы все уязвимости
+    package_folder = db_path.parent if feed_name == 'db' else db_path.parent / feed_name
+    counts = {table: count_rows(table) for table in ('packages', 'package_bounds', 'vulnerability_details')}
+
+    with pytest.raises(ValueError):
+        ImpactAnalyzer(db_path=db_path, history_path=history_path, package_folder=package_folder).update()
+
+    assert {table: count_rows(table) for table in counts} == counts
+    assert all(counts.values())
+
+
+def test_package_folder_is_required(db_path, history_path):
+    with pytest.raises(TypeError):
+        ImpactAnalyzer(db_path=db_path, history_path=history_path)
+
+
+def test_same_named_projects_are_reported_per_host(db_path, feed_dir, history_path):
+    with ScanHistory(history_path) as history:
+        scan_id = history.start_scan('scan', '02_01_2024_00_00_00')
+        history.save_project(
+            scan_id=scan_id,
+            host='host-2',
+            project='web',
+            generation='generation',
+            components=[('pillow', '1.2')],
+            findings=[],
+        )
+
+    affected = ImpactAnalyzer(db_path=db_path, history_path=history_path, package_folder=feed_dir).check(['VULN-1'])
+
+    assert [(project.host, project.project) for project in affected] == [('host-1', 'web'), ('host-2', 'web')]
+    assert [project.vulnerabilities[0].affected_soft[0].version for project in affected] == ['1.5', '1.2']
@@ -0,0 +1,113 @@
+"""
+Тесты распределенного сканирования через очередь заданий
+"""
+
+import threading
+import time
+
+from dpss.jobs import JobQueue, JobStatus, ScanCoordinator, ScanWorker
+from tests.conftest import make_scan_config
+
+
+def test_expired_lease_is_reissued_and_stale_result_rejected(tmp_path):
+    with JobQueue(tmp_path / 'jobs.db', lease_timeout=0.05) as queue:
+        queue.put('batch', make_scan_config('host-a', {'web': '/srv/web'}))
+        first_id, scan_config = queue.lease('worker-1')
+        assert queue.lease('worker-2') is None
+
+        time.sleep(0.1)
+        second_id, _ = queue.lease('worker-2')
+
+        assert second_id == first_id
+        assert scan_config.host == 'host-a'
+        assert not queue.extend_lease(first_id, 'worker-1')
+        assert not queue.complete(first_id, 'worker-1', {})
+        assert queue.complete(second_id, 'worker-2', {'web': []})
+        assert queue.get_status_counts('batch') == {JobStatus.DONE: 1}
+
+
+def test_failed_job_is_retried_until_max_attempts(tmp_path):
+    with JobQueue(tmp_path / 'jobs.db', max_attempts=2) as queue:
+        job_id = queue.put('batch', make_scan_config('host-a', {'web': '/srv/web'}))
+        for attempt in range(2):
+            assert queue.lease('worker')[0] == job_id
+            queue.fail(job_id, 'worker', f'error {attempt}')
+
+        assert queue.lease('worker') is None
+        assert queue.get_errors('batch') == [(job_id, 'error 1')]
+
+
+def test_wait_expires_lease_on_last_attempt(tmp_path):
+    queue_path = tmp_path / 'jobs.db'
+    coordinator = ScanCoordinator(
+        scan_configs=[make_scan_config('host-a', {'web': '/srv/web'})],
+        queue_path=queue_path,
+        db_path=tmp_path / 'vulner.db',
+        vulners_package_dir=tmp_path / 'feed',
+        max_attempts=1,
+    )
+    coordinator.submit()
+    with JobQueue(queue_path, lease_timeout=0.05, max_attempts=1) as queue:
+        queue.lease('worker')
+
+    # Обработчик завершился, не вернув результат: задание не должно ожидаться вечно
+    assert coordinator.wait(poll_interval=0.02, timeout=2)
+    with JobQueue(queue_path) as queue:
+        assert queue.get_errors(coordinator.batch) == [(1, 'Lease expired')]
+
+
+def test_worker_drops_result_of_lost_lease(tmp_path, monkeypatch):
+    queue_path = tmp_path / 'jobs.db'
+    with JobQueue(queue_path) as queue:
+        job_id = queue.put('batch', make_scan_config('host-a', {'web': '/srv/web'}))
+
+    def process(worker, job_id, scan_config):
+        # Пока задание выполнялось, аренду забрал другой обработчик
+        with JobQueue(queue_path) as queue:
+            queue.connection.execute('UPDATE jobs SET worker = ? WHERE id = ?;', ('worker-2', job_id))
+        return {'web': []}
+
+    monkeypatch.setattr(ScanWorker, 'process', process)
+    worker = ScanWorker(queue_path, tmp_path / 'vulner.db', tmp_path / 'data', tmp_path / 'feed', worker_id='worker-1')
+    worker.run(max_jobs=1)
+
+    assert worker.lost_jobs == [job_id]
+    with JobQueue(queue_path) as queue:
+        assert queue.get_status_counts('batch') == {JobStatus.LEASED: 1}
+
+
+def test_workers_with_shared_data_dir_scan_same_named_projects(tmp_path, remote, db_path, feed_dir):
+    remote.delay = 0.05
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5'})
+    remote.add_project('host-b', '/srv/web', {'typing_extensions': '4.1'})
+    queue_path = tmp_path / 'jobs.db'
+    data_dir = tmp_path / 'data'
+    coordinator = ScanCoordinator(
+        scan_configs=[make_scan_config('host-a', {'web': '/srv/web'}), make_scan_config('host-b', {'web': '/srv/web'})],
+        queue_path=queue_path,
+        db_path=db_path,
+        vulners_package_dir=feed_dir,
+    )
+    coordinator.submit()
+    workers = [
+        ScanWorker(queue_path, db_path, data_dir, feed_dir, worker_id=f'worker-{index}')
+        for index in range(2)
+    ]
+    threads = [
+        threading.Thread(target=worker.run, kwargs={'max_jobs': 1, 'idle_timeout': 2, 'poll_interval': 0.01})
+        for worker in workers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert coordinator.wait(poll_interval=0.02, timeout=5)
+    coordinator.collect()
+
+    assert coordinator.errors == []
+    assert {
+        vulnerability: [(soft.name, soft.version) for soft in data['soft']]
+        for vulnerability, data in coordinator.found_vulnerabilities.items()
+    } == {'VULN-1': [('Pillow', '1.5')], 'VULN-2': [('typing_extensions', '4.1')]}
+    assert not any((data_dir / 'jobs').iterdir())
@@ -0,0 +1,90 @@
+"""
+Тесты метрик сканирования
+"""
+
+import threading
+
+import orjson
+
+from dpss.dpss import DependencySecurityScanner
+from dpss.metrics import Metrics
+from tests.conftest import make_scan_config
+
+
+def test_counters_are_summed_by_labels():
+    metrics = Metrics()
+    metrics.increment('ssh_round_trips', host='host-a')
+    metrics.increment('ssh_round_trips', 2, host='host-b')
+
+    def increment():
+        for _ in range(1000):
+            metrics.increment('db_queries')
+
+    threads = [threading.Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.get_counter('ssh_round_trips', host='host-b') == 2
+    assert metrics.get_counter('ssh_round_trips') == 3
+    assert metrics.get_counter('db_queries') == 4000
+    assert metrics.get_counter('unknown') == 0
+
+
+def test_exports():
+    metrics = Metrics()
+    metrics.increment('db_queries', 3)
+    metrics.increment('ssh_round_trips', host='host "a"')
+    metrics.observe('stage', 0.5, stage='match')
+    metrics.observe('stage', 1.5, stage='match')
+
+    assert orjson.loads(metrics.to_json()) == {
+        'counters': [
+            {'name': 'db_queries', 'labels': {}, 'value': 3},
+            {'name': 'ssh_round_trips', 'labels': {'host': 'host "a"'}, 'value': 1},
+        ],
+        'timers': [{'name': 'stage', 'labels': {'stage': 'match'}, 'count': 2, 'sum': 2.0, 'max': 1.5}],
+    }
+    assert metrics.to_prometheus().splitlines() == [
+        '# TYPE dpss_db_queries_total counter',
+        'dpss_db_queries_total 3',
+        '# TYPE dpss_ssh_round_trips_total counter',
+        'dpss_ssh_round_trips_total{host="host \\"a\\""} 1',
+        '# TYPE dpss_stage_seconds summary',
+        'dpss_stage_seconds_count{stage="match"} 2',
+        'dpss_stage_seconds_sum{stage="match"} 2.000000',
+        '# TYPE dpss_stage_seconds_max gauge',
+        'dpss_stage_seconds_max{stage="match"} 1.500000',
+    ]
+
+
+def test_popped_counters_are_merged():
+    worker_metrics = Metrics()
+    worker_metrics.increment('db_queries', 2)
+    metrics = Metrics()
+    metrics.increment('db_queries')
+
+    metrics.merge_counters(worker_metrics.pop_counters())
+
+    assert metrics.get_counter('db_queries') == 3
+    assert worker_metrics.counters == {}
+
+
+def test_scan_collects_stage_metrics(tmp_path, remote, db_path, feed_dir):
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5', 'requests': '2.0'})
+    metrics = Metrics()
+    scanner = DependencySecurityScanner(
+        scan_config=make_scan_config('host-a', {'web': '/srv/web'}),
+        db_path=db_path,
+        data_dir=tmp_path / 'data',
+        vulners_package_dir=feed_dir,
+        metrics=metrics,
+    )
+
+    scanner.run()
+
+    timers = {(timer['name'], timer['labels'].get('stage')) for timer in metrics.to_dict()['timers']}
+    assert {('stage', 'fetch'), ('stage', 'sbom'), ('stage', 'match'), ('report_generate', None)} <= timers
+    assert metrics.get_counter('sbom_subprocesses') == 1
+    assert metrics.get_counter('db_queries') >= 1
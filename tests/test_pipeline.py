@@ -0,0 +1,93 @@
+"""
+Тесты конвейера с перекрывающимися стадиями обработки
+"""
+
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from dpss.pipeline import PipelineStage, StagedPipeline
+
+
+def test_results_of_all_stages_are_yielded():
+    pipeline = StagedPipeline(
+        [
+            PipelineStage('double', lambda item: item * 2, workers=3),
+            PipelineStage('skip_odd_tens', lambda item: None if item % 20 else item, workers=2),
+        ],
+        queue_size=2,
+    )
+
+    assert sorted(pipeline.run(range(50))) == list(range(0, 100, 20))
+    assert pipeline.error is None
+
+
+def test_context_is_opened_once_per_worker():
+    opened = []
+
+    @contextmanager
+    def context():
+        opened.append(threading.get_ident())
+        yield len(opened)
+
+    pipeline = StagedPipeline([PipelineStage('stage', lambda item, context: item, workers=2, context=context)])
+
+    assert sorted(pipeline.run(range(10))) == list(range(10))
+    assert len(opened) == 2
+
+
+def test_handler_error_is_raised_to_consumer():
+    processed = []
+
+    def handler(item):
+        if item == 3:
+            raise RuntimeError('broken item')
+        processed.append(item)
+        return item
+
+    pipeline = StagedPipeline([PipelineStage('stage', handler), PipelineStage('next', lambda item: item)], queue_size=1)
+
+    with pytest.raises(RuntimeError, match='broken item'):
+        list(pipeline.run(range(1000)))
+
+    # После ошибки оставшиеся элементы не обрабатываются
+    assert len(processed) < 1000
+    assert not any(thread.name.startswith('dpss-') for thread in threading.enumerate())
+
+
+def test_context_error_does_not_block_pipeline():
+    @contextmanager
+    def context():
+        raise ConnectionError('no connection')
+        yield
+
+    pipeline = StagedPipeline([PipelineStage('stage', lambda item, context: item, workers=2, context=context)], queue_size=1)
+
+    with pytest.raises(ConnectionError, match='no connection'):
+        list(pipeline.run(range(100)))
+
+
+def test_early_exit_stops_all_stages():
+    produced = []
+
+    def items():
+        for item in range(10_000):
+            produced.append(item)
+            yield item
+
+    pipeline = StagedPipeline([PipelineStage('stage', lambda item: item, workers=2)], queue_size=2)
+    results = pipeline.run(items())
+    assert next(results) is not None
+    results.close()
+
+    assert len(produced) < 10_000
+    assert pipeline.error is None
+    assert not any(thread.name.startswith('dpss-') for thread in threading.enumerate())
+
+
+def test_stage_without_workers_is_rejected():
+    with pytest.raises(ValueError):
+        PipelineStage('stage', lambda item: item, workers=0)
+    with pytest.raises(ValueError):
+        StagedPipeline([])
@@ -0,0 +1,76 @@
+"""
+Тесты легковесных внутренних записей сопоставления
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from dpss.models import DetectedVulnerabilitySchema, VersionBorder, VulnerableIntervalSchema
+from dpss.records import (
+    DetectedSoft,
+    VulnerableInterval,
+    make_detected_vulnerability,
+    make_finding_rows,
+    make_found_vulnerabilities,
+    merge_found_vulnerabilities,
+)
+from dpss.vulnerdb import VulnerabilityDB
+
+ROWS = [
+    ('VULN-1', 'test', 'Pillow', '1.5', 'gte', '1.0', '2.0', 'lt'),
+    ('VULN-1', 'test', 'pillow', '1.6', 'gte', '1.0', '2.0', 'lt'),
+    ('VULN-2', 'test', 'typing_extensions', '4.1', 'gte', '4.0', '5.0', 'lt'),
+]
+
+
+def test_records_convert_to_validated_schemas():
+    soft = DetectedSoft('Pillow', '1.5', VulnerableInterval('gte', '1.0', '2.0', 'lt'))
+
+    vulnerability = make_detected_vulnerability('VULN-1', 'test', [soft], validate=True)
+
+    assert isinstance(vulnerability, DetectedVulnerabilitySchema)
+    assert vulnerability.model_dump() == {
+        'vulner_id': 'VULN-1',
+        'source_name': 'test',
+        'affected_soft': [{
+            'vulnerable_interval': {
+                'left_border': VersionBorder('gte'),
+                'left_version': '1.0',
+                'right_version': '2.0',
+                'right_border': VersionBorder('lt'),
+            },
+            'name': 'Pillow',
+            'version': '1.5',
+        }],
+    }
+
+
+def test_invalid_record_fails_only_with_validation():
+    interval = VulnerableInterval('gte', 1.0, '2.0', 'lt')
+
+    assert interval.to_schema().left_version == 1.0
+    with pytest.raises(ValidationError):
+        interval.to_schema(validate=True)
+
+
+def test_finding_rows_round_trip():
+    found_vulnerabilities = make_found_vulnerabilities(ROWS)
+
+    assert list(found_vulnerabilities) == ['VULN-1', 'VULN-2']
+    assert [soft.version for soft in found_vulnerabilities['VULN-1']['soft']] == ['1.5', '1.6']
+    assert make_finding_rows(found_vulnerabilities) == ROWS
+
+
+def test_merge_extends_affected_soft():
+    merged = make_found_vulnerabilities(ROWS[:1])
+    merge_found_vulnerabilities(merged, make_found_vulnerabilities(ROWS[1:]))
+
+    assert make_finding_rows(merged) == ROWS
+
+
+def test_package_vulnerabilities_are_returned_as_schemas(db_path, feed_dir):
+    with VulnerabilityDB(db_path=db_path, package_folder=feed_dir) as vulner_db:
+        vulnerabilities = vulner_db.get_package_vulnerabilities('pillow')
+
+    assert sorted(vulnerability[0] for vulnerability in vulnerabilities) == ['VULN-1', 'VULN-3']
+    assert all(isinstance(vulnerability[3], VulnerableIntervalSchema) for vulnerability in vulnerabilities)
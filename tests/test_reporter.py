@@ -0,0 +1,132 @@
+"""
+Тесты генерации отчетов о найденных уязвимостях
+"""
+
+import io
+
+import orjson
+import pytest
+
+from dpss.const import ReportTypes
+from dpss.models import ReportModelSchema
+from dpss.records import make_detected_vulnerabilities, make_found_vulnerabilities
+from dpss.reporter import LazyReport, Reporter
+from dpss.vulnerdb import VulnerabilityDB
+from tests.conftest import make_advisory, write_advisory
+
+ROWS = [
+    ('VULN-1', 'test', 'Pillow', '1.5', 'gte', '1.0', '2.0', 'lt'),
+    ('VULN-2', 'test', 'typing_extensions', '4.1', 'gte', '4.0', '5.0', 'lt'),
+    ('VULN-3', 'test', 'Pillow', '5.5', 'gt', '5.0', '', 'lt'),
+]
+
+
+def make_lazy_report(db_path, feed_dir) -> LazyReport:
+    """
+    Функция создания ленивого отчета по найденным уязвимостям
+
+    :param db_path: Путь до файла с БД
+    :param feed_dir: Директория с пакетом уязвимостей
+    :return: Ленивый отчет
+    """
+
+    return LazyReport(
+        detected_vulnerabilities=make_detected_vulnerabilities(make_found_vulnerabilities(ROWS)),
+        vulnerabilities_package_path=feed_dir,
+        db_path=db_path,
+    )
+
+
+def make_reporter(db_path, feed_dir, report_type: str, output=None) -> Reporter:
+    """
+    Функция создания генератора отчета по найденным уязвимостям
+
+    :param db_path: Путь до файла с БД
+    :param feed_dir: Директория с пакетом уязвимостей
+    :param report_type: Тип отчета
+    :param output: Путь до файла или поток для записи отчета
+    :return: Генератор отчета
+    """
+
+    return Reporter(
+        detected_vulnerabilities=make_detected_vulnerabilities(make_found_vulnerabilities(ROWS)),
+        vulnerabilities_package_path=feed_dir,
+        report_type=report_type,
+        db_path=db_path,
+        output=output,
+    )
+
+
+def test_compact_json_matches_schema_report(db_path, feed_dir):
+    output = io.BytesIO()
+    make_reporter(db_path, feed_dir, ReportTypes.JSON, output).generate_report()
+    schema_report = make_reporter(db_path, feed_dir, ReportTypes.JSON).generate_report()
+
+    report = ReportModelSchema.model_validate(orjson.loads(output.getvalue()))
+
+    assert isinstance(schema_report, ReportModelSchema)
+    assert report.model_dump(exclude={'creation_date'}) == schema_report.model_dump(exclude={'creation_date'})
+    assert [vulner.identifier for vulner in report.vulnerabilities] == ['VULN-1', 'VULN-2', 'VULN-3']
+
+
+def test_json_lines_are_appended(tmp_path, db_path, feed_dir):
+    output_path = tmp_path / 'reports' / 'report.jsonl'
+    for _ in range(2):
+        assert make_reporter(db_path, feed_dir, ReportTypes.JSONL, output_path).generate_report() is None
+
+    lines = [orjson.loads(line) for line in output_path.read_bytes().splitlines()]
+
+    assert [line['identifier'] for line in lines] == ['VULN-1', 'VULN-2', 'VULN-3'] * 2
+    assert all(line['creation_date'] for line in lines)
+    assert lines[0]['affected_packages'][0]['vulnerable_interval'] == {
+        'left_border': 'gte', 'right_version': '2.0', 'left_version': '1.0', 'right_border': 'lt',
+    }
+
+
+def test_json_lines_without_output_are_returned(db_path, feed_dir):
+    report = make_reporter(db_path, feed_dir, ReportTypes.JSONL).generate_report()
+
+    assert [orjson.loads(line)['identifier'] for line in report.splitlines()] == ['VULN-1', 'VULN-2', 'VULN-3']
+
+
+@pytest.fixture
+def severity_feed_dir(tmp_path):
+    """Пакет уязвимостей с разной критичностью"""
+
+    feed_dir = tmp_path / 'severity_feed'
+    write_advisory(feed_dir, make_advisory('VULN-1', 'Pillow', [('gte', '1.0', '2.0', 'lt')], severity='critical'))
+    write_advisory(feed_dir, make_advisory('VULN-2', 'typing_extensions', [('gte', '4.0', '5.0', 'lt')], severity='low'))
+    write_advisory(feed_dir, make_advisory('VULN-3', 'Pillow', [('gt', '5.0', '', 'lt')], severity='critical'))
+    return feed_dir
+
+
+def test_lazy_report_pages(db_path, feed_dir):
+    report = make_lazy_report(db_path, feed_dir)
+
+    assert len(report) == 3
+    assert report.page_count(size=2) == 2
+    assert [
+        [vulner.identifier for vulner in page.vulnerabilities] for page in report.pages(size=2)
+    ] == [['VULN-1', 'VULN-2'], ['VULN-3']]
+    assert report.page(3, size=2).vulnerabilities == []
+    with pytest.raises(ValueError):
+        report.page(0)
+
+
+def test_lazy_report_summary_and_filter(tmp_path, severity_feed_dir):
+    db_path = tmp_path / 'severity.db'
+    with VulnerabilityDB(db_path=db_path, package_folder=severity_feed_dir):
+        pass
+    report = make_lazy_report(db_path, severity_feed_dir)
+
+    assert report.summary() == {'none': 0, 'low': 1, 'medium': 0, 'high': 0, 'critical': 2}
+    critical = report.filter(severity='CRITICAL')
+    assert [vulner.vulner_id for vulner in critical.vulnerabilities] == ['VULN-1', 'VULN-3']
+    assert [vulner.vulner_id for vulner in critical.filter(package='pillow').vulnerabilities] == ['VULN-1', 'VULN-3']
+    assert [vulner.vulner_id for vulner in report.filter(package='Typing-Extensions').vulnerabilities] == ['VULN-2']
+
+
+def test_lazy_report_reads_missing_severities_from_feed(severity_feed_dir):
+    report = make_lazy_report(None, severity_feed_dir)
+
+    assert report.get_severities() == {'VULN-1': 'critical', 'VULN-2': 'low', 'VULN-3': 'critical'}
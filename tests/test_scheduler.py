@@ -0,0 +1,96 @@
+"""
+Тесты приоритетного планировщика сканирования
+"""
+
+from dpss.history import ScanHistory
+from dpss.models import ProjectConfigSchema
+from dpss.scheduler import ScanScheduler
+from tests.conftest import make_scan_config
+
+
+def get_findings(findings) -> dict[tuple[str, str], list[str]]:
+    """
+    Функция получения идентификаторов уязвимостей по хосту и проекту
+
+    :param findings: Список уязвимостей проектов
+    :return: Отсортированные идентификаторы уязвимостей по хосту и имени проекта
+    """
+
+    return {
+        (project.host, project.project): sorted(vulner.vulner_id for vulner in project.vulnerabilities)
+        for project in findings
+    }
+
+
+def test_same_named_projects_of_different_hosts_do_not_mix(tmp_path, remote, db_path, feed_dir):
+    remote.delay = 0.05
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5'})
+    remote.add_project('host-b', '/srv/web', {'typing_extensions': '4.1'})
+    history_path = tmp_path / 'history.db'
+    data_dir = tmp_path / 'data'
+
+    scheduler = ScanScheduler(
+        scan_configs=[make_scan_config('host-a', {'web': '/srv/web'}), make_scan_config('host-b', {'web': '/srv/web'})],
+        db_path=db_path,
+        data_dir=data_dir,
+        vulners_package_dir=feed_dir,
+        history_path=history_path,
+        max_workers=2,
+    )
+    findings = list(scheduler.iter_findings())
+
+    assert get_findings(findings) == {('host-a', 'web'): ['VULN-1'], ('host-b', 'web'): ['VULN-2']}
+    assert scheduler.errors == []
+    # Директории проектов удаляются после генерации SBOM
+    assert not any((data_dir / 'scans').iterdir())
+    with ScanHistory(history_path) as history:
+        assert set(history.get_last_scan_dates()) == {('host-a', 'web'), ('host-b', 'web')}
+        assert history.find_inventory(['pillow']) == [('host-a', 'web', 'pillow', '1.5')]
+
+
+def test_host_concurrency_limit(tmp_path, remote, db_path, feed_dir):
+    remote.delay = 0.05
+    projects = {f'project-{index}': f'/srv/project-{index}' for index in range(4)}
+    for host in ('host-a', 'host-b'):
+        for project_dir in projects.values():
+            remote.add_project(host, project_dir, {'Pillow': '1.5'})
+
+    scheduler = ScanScheduler(
+        scan_configs=[make_scan_config('host-a', projects), make_scan_config('host-b', projects)],
+        db_path=db_path,
+        data_dir=tmp_path / 'data',
+        vulners_package_dir=feed_dir,
+        max_workers=8,
+        host_concurrency=2,
+    )
+    scheduler.run()
+
+    assert remote.peak == {'host-a': 2, 'host-b': 2}
+    assert len(scheduler.found_vulnerabilities['VULN-1']['soft']) == 8
+
+
+def test_priority_order_and_deadline(tmp_path, remote, db_path, feed_dir):
+    remote.delay = 0.1
+    scan_config = make_scan_config('host-a', {})
+    scan_config.projects = [
+        ProjectConfigSchema(name=f'project-{index}', dir=f'/srv/project-{index}', priority=index)
+        for index in range(5)
+    ]
+    for project in scan_config.projects:
+        remote.add_project('host-a', project.dir, {'Pillow': '1.5'})
+
+    scheduler = ScanScheduler(
+        scan_configs=[scan_config],
+        db_path=db_path,
+        data_dir=tmp_path / 'data',
+        vulners_package_dir=feed_dir,
+        max_workers=1,
+        deadline=0.25,
+    )
+    scanned = [project.project for project in scheduler.iter_findings()]
+
+    assert scanned == ['project-4', 'project-3', 'project-2'][:len(scanned)]
+    assert 1 <= len(scanned) < 5
+    assert [project.name for project in scheduler.skipped] == [
+        f'project-{index}' for index in range(4 - len(scanned), -1, -1)
+    ]
@@ -0,0 +1,78 @@
+"""
+Тесты сопоставления компонентов в пуле процессов
+"""
+
+import pytest
+
+from benchmarks.generators import generate_feed, generate_sbom
+from dpss.metrics import Metrics
+from dpss.sbom import ComponentsAnalyzer
+from dpss.vulnerdb import VulnerabilityDB
+
+
+@pytest.fixture(scope='module')
+def generated(tmp_path_factory):
+    """Синтетические пакет уязвимостей, собранная из него БД и SBOM"""
+
+    work_dir = tmp_path_factory.mktemp('sharding')
+    feed_dir = generate_feed(work_dir / 'feed', advisories=300, packages=40, intervals=2)
+    sbom_path = generate_sbom(work_dir / 'sbom.json', components=40, packages=40)
+    db_path = work_dir / 'vulner.db'
+    with VulnerabilityDB(db_path=db_path, package_folder=feed_dir):
+        pass
+
+    return feed_dir, sbom_path, db_path
+
+
+def analyze(generated, processes: int, cache_path=None) -> tuple[list[tuple], Metrics]:
+    """
+    Функция поиска уязвимостей в синтетическом SBOM
+
+    :param generated: Пакет уязвимостей, SBOM и БД
+    :param processes: Количество процессов сопоставления
+    :param cache_path: Путь до файла с кэшем результатов сопоставления
+    :return: Отсортированные найденные уязвимости и метрики анализа
+    """
+
+    feed_dir, sbom_path, db_path = generated
+    metrics = Metrics()
+    analyzer = ComponentsAnalyzer(
+        sbom_source=sbom_path,
+        db_path=db_path,
+        package_folder=feed_dir,
+        cache_path=cache_path,
+        metrics=metrics,
+        processes=processes,
+    )
+    vulnerabilities = sorted(
+        (vulner.vulner_id, soft.name, soft.version, repr(soft.vulnerable_interval))
+        for vulner in analyzer.iter_vulnerabilities()
+        for soft in vulner.affected_soft
+    )
+    return vulnerabilities, metrics
+
+
+def test_sharded_matching_equals_single_process(generated):
+    single, single_metrics = analyze(generated, processes=1)
+    sharded, sharded_metrics = analyze(generated, processes=2)
+
+    assert single
+    assert sharded == single
+    assert sharded_metrics.get_counter('match_shards') > 1
+    # Счетчики БД процессов пула учитываются в метриках родительского процесса
+    assert single_metrics.get_counter('intervals_evaluated') > 0
+    for counter in ('intervals_evaluated', 'bounds_rejected', 'components_matched'):
+        assert sharded_metrics.get_counter(counter) == single_metrics.get_counter(counter)
+    # Каждый процесс пула дополнительно один раз загружает границы пакетов
+    assert sharded_metrics.get_counter('db_queries') >= single_metrics.get_counter('db_queries')
+
+
+def test_sharded_matching_uses_cache(tmp_path, generated):
+    cache_path = tmp_path / 'cache.db'
+    first, first_metrics = analyze(generated, processes=2, cache_path=cache_path)
+    second, second_metrics = analyze(generated, processes=2, cache_path=cache_path)
+
+    assert second == first
+    assert first_metrics.get_counter('match_cache_hits') == 0
+    assert second_metrics.get_counter('match_cache_misses') == 0
+    assert second_metrics.get_counter('match_shards') == 0
@@ -0,0 +1,76 @@
+"""
+Тесты получения проектов сканером через локальный SSH сервер
+"""
+
+import paramiko
+import pytest
+
+from benchmarks.ssh_load import run_fetch, split_projects
+from benchmarks.ssh_server import FakeSSHServer, make_filesystem
+from dpss.const import REQUIREMENTS_FILE
+from dpss.metrics import Metrics
+from dpss.models import ProjectConfigSchema
+from dpss.scanner import Scanner
+
+
+@pytest.fixture(scope='module')
+def filesystem():
+    """Файлы и конфигурации синтетических проектов"""
+
+    return make_filesystem(projects=6, components=5, packages=20)
+
+
+@pytest.fixture
+def server(filesystem):
+    """Запущенный SSH сервер с файлами проектов"""
+
+    files, _ = filesystem
+    with FakeSSHServer(files) as server:
+        yield server
+
+
+def test_scanner_fetches_requirements(tmp_path, filesystem, server):
+    files, projects = filesystem
+    metrics = Metrics()
+    missing = ProjectConfigSchema(name='missing', dir='/srv/missing')
+    scanner = Scanner(scan_config=server.make_scan_config([*projects[:2], missing]), data_dir=tmp_path, metrics=metrics)
+    try:
+        local_project_dir = scanner.save_requirements(projects[0])
+        assert scanner.save_requirements(missing) is None
+        # Повторная команда идет через то же соединение
+        assert scanner.save_requirements(projects[1]) is not None
+    finally:
+        scanner.close_connection()
+
+    assert (local_project_dir / REQUIREMENTS_FILE).read_bytes() == files[f'{projects[0].dir}/{REQUIREMENTS_FILE}']
+    assert server.commands == 3
+    assert metrics.get_counter('ssh_connections') == 1
+    assert metrics.get_counter('ssh_round_trips') == 3
+
+
+def test_concurrent_fetch(tmp_path, filesystem, server):
+    _, projects = filesystem
+
+    result = run_fetch(server, projects, concurrency=3, data_dir=tmp_path, metrics=Metrics())
+
+    assert result['errors'] == []
+    assert result['fetch']['count'] == len(projects)
+    assert server.commands == len(projects)
+
+
+def test_wrong_secret_is_rejected(tmp_path, filesystem):
+    files, projects = filesystem
+    with FakeSSHServer(files, secret='other') as server:
+        scan_config = server.make_scan_config(projects)
+        scan_config.secret = 'bench'
+        with pytest.raises(paramiko.AuthenticationException):
+            Scanner(scan_config=scan_config, data_dir=tmp_path)
+
+        assert server.commands == 0
+
+
+def test_split_projects_skips_empty_parts(filesystem):
+    _, projects = filesystem
+
+    assert [len(chunk) for chunk in split_projects(projects, 4)] == [2, 2, 1, 1]
+    assert [len(chunk) for chunk in split_projects(projects[:2], 4)] == [1, 1]
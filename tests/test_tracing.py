@@ -0,0 +1,43 @@
+"""
+Тесты трассировки и профилирования сканирования
+"""
+
+from dpss.dpss import DependencySecurityScanner
+from dpss.tracing import SCAN_PROFILE, Tracer
+from tests.conftest import make_scan_config
+
+
+def test_scan_is_traced_with_one_scan_wide_profile(tmp_path, remote, db_path, feed_dir):
+    remote.add_project('host-a', '/srv/web', {'Pillow': '1.5'})
+    remote.add_project('host-a', '/srv/api', {'typing_extensions': '4.1'})
+    spans = []
+    tracer = Tracer(profile=True, trace_memory=True, hooks=[spans.append])
+    scanner = DependencySecurityScanner(
+        scan_config=make_scan_config('host-a', {'web': '/srv/web', 'api': '/srv/api'}),
+        db_path=db_path,
+        data_dir=tmp_path / 'data',
+        vulners_package_dir=feed_dir,
+        tracer=tracer,
+    )
+    # Трассировка начинается только при запуске сканирования
+    assert tracer.profiler is None
+
+    scanner.run()
+
+    assert {'connect', 'fetch', 'sbom', 'parse', 'match', 'report'} <= set(tracer.get_durations())
+    assert sorted(span.attributes['project'] for span in spans if span.name == 'fetch') == ['api', 'web']
+    assert list(tracer.profiles) == [SCAN_PROFILE]
+    assert tracer.profiler is None
+    assert tracer.memory_snapshot is not None
+    assert [path.name for path in tracer.dump_profiles(tmp_path / 'profiles')] == [f'{SCAN_PROFILE}.prof']
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False, profile=True)
+    tracer.start()
+    with tracer.span('fetch', project='web'):
+        pass
+    tracer.finish()
+
+    assert tracer.spans == []
+    assert tracer.profiles == {}
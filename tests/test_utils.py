@@ -0,0 +1,94 @@
+"""
+Тесты вспомогательного инструментария
+"""
+
+import random
+
+import pytest
+
+from dpss.const import INF, INFINITE_VERSION
+from dpss.records import VulnerableInterval
+from dpss.utils import check_is_vulnerable, get_intervals_bounds, merge_intervals, parse_version
+
+BORDERS = (('gte', 'lt'), ('gt', 'lt'), ('gte', 'lte'), ('gt', 'lte'))
+
+
+def make_interval(interval: tuple[str, str, str, str]) -> VulnerableInterval:
+    """
+    Функция построения записи интервала так же, как при чтении из БД
+
+    :param interval: Интервал в каноническом виде
+    :return: Запись уязвимого интервала
+    """
+
+    opener, left, right, closer = interval
+    return VulnerableInterval(opener, left, INFINITE_VERSION if right == INF else right, closer)
+
+
+def is_vulnerable(version: str, intervals: list[tuple[str, str, str, str]]) -> bool:
+    """
+    Функция проверки попадания версии хотя бы в один интервал
+
+    :param version: Версия пакета
+    :param intervals: Список интервалов в каноническом виде
+    :return: Попадает ли версия хотя бы в один интервал
+    """
+
+    return any(check_is_vulnerable(version, make_interval(interval)) for interval in intervals)
+
+
+def test_merge_intervals_joins_overlapping_and_touching():
+    intervals = [
+        ('gte', '1.0', '2.0', 'lt'),
+        ('gte', '2.0', '3.0', 'lt'),
+        ('gt', '5.0', '6.0', 'lt'),
+        ('gte', '1.5', '1.8', 'lte'),
+        ('gt', '3.0', '4.0', 'lt'),
+    ]
+
+    assert merge_intervals(intervals) == [
+        ('gte', '1.0', '3.0', 'lt'),
+        ('gt', '3.0', '4.0', 'lt'),
+        ('gt', '5.0', '6.0', 'lt'),
+    ]
+
+
+def test_merge_intervals_keeps_unknown_borders():
+    intervals = [('gte', '1.0', '2.0', 'lt'), ('eq', '1.0', '2.0', 'lt')]
+
+    assert merge_intervals(intervals) == intervals
+
+
+def test_get_intervals_bounds():
+    intervals = [('gt', '1.0', '2.0', 'lt'), ('gte', '1.0', '3', 'lte'), ('gt', '0.5', '3', 'lt')]
+
+    assert get_intervals_bounds(intervals) == ('gt', '0.5', '3', 'lte')
+    assert get_intervals_bounds([('eq', '1.0', '2.0', 'lt')]) is None
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_merged_intervals_match_same_versions(seed):
+    """Объединенные интервалы совпадают с теми же версиями, а общие границы охватывают все совпадения"""
+
+    rng = random.Random(seed)
+
+    def make_version() -> str:
+        return f'{rng.randint(0, 5)}.{rng.randint(0, 5)}'
+
+    for _ in range(500):
+        intervals = []
+        for _ in range(rng.randint(1, 5)):
+            left, right = sorted((make_version(), make_version()), key=parse_version)
+            opener, closer = rng.choice(BORDERS)
+            if rng.random() < 0.1:
+                right = INF
+            intervals.append((opener, left, right, closer))
+
+        merged = merge_intervals(intervals)
+        bounds = get_intervals_bounds(intervals)
+        for _ in range(20):
+            version = make_version()
+            expected = is_vulnerable(version, intervals)
+            assert is_vulnerable(version, merged) == expected, (intervals, merged, version)
+            if expected:
+                assert check_is_vulnerable(version, make_interval(bounds)), (intervals, bounds, version)
@@ -0,0 +1,82 @@
+"""
+Тесты хранения уязвимостей в БД и пересборки устаревшей схемы
+"""
+
+import sqlite3
+
+import pytest
+
+from dpss.vulnerdb import OutdatedSchemaError, VulnerabilityDB
+from tests.conftest import make_advisory, write_advisory
+
+
+def set_schema_version(db_path, version: str) -> None:
+    """
+    Функция записи версии схемы в БД
+
+    :param db_path: Путь до файла с БД
+    :param version: Версия схемы
+    """
+
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(VulnerabilityDB.INSERT_META_VALUE, (VulnerabilityDB.SCHEMA_VERSION_KEY, version))
+
+
+def test_details_are_stored_in_db(db_path, feed_dir):
+    with VulnerabilityDB(db_path=db_path, read_only=True) as vulner_db:
+        details = vulner_db.get_vulnerability_details(['VULN-1', 'VULN-3', 'UNKNOWN'])
+        severities = vulner_db.get_vulnerability_severities(['VULN-1'])
+
+    assert sorted(details) == ['VULN-1', 'VULN-3']
+    assert details['VULN-1']['identifier'] == 'VULN-1'
+    assert details['VULN-1']['references'] == [{'url': 'https://example.com/VULN-1/ref'}]
+    assert severities == {'VULN-1': 'high'}
+
+
+@pytest.mark.parametrize('read_only', [False, True])
+def test_outdated_db_is_kept_without_feed(db_path, count_rows, read_only):
+    rows = count_rows('packages')
+    set_schema_version(db_path, '1')
+
+    with pytest.raises(OutdatedSchemaError, match='outdated'):
+        with VulnerabilityDB(db_path=db_path, read_only=read_only):
+            pass
+
+    set_schema_version(db_path, VulnerabilityDB.SCHEMA_VERSION)
+    assert count_rows('packages') == rows
+
+
+def test_outdated_db_is_kept_with_empty_feed(tmp_path, db_path, count_rows):
+    rows = count_rows('packages')
+    set_schema_version(db_path, '1')
+    empty_feed = tmp_path / 'empty'
+    empty_feed.mkdir()
+
+    with pytest.raises(OutdatedSchemaError):
+        with VulnerabilityDB(db_path=db_path, package_folder=empty_feed):
+            pass
+
+    set_schema_version(db_path, VulnerabilityDB.SCHEMA_VERSION)
+    assert count_rows('packages') == rows
+
+
+def test_outdated_db_is_rebuilt_from_explicit_feed(db_path, feed_dir, count_rows):
+    rows = count_rows('packages')
+    set_schema_version(db_path, '1')
+
+    with VulnerabilityDB(db_path=db_path, package_folder=feed_dir) as vulner_db:
+        assert vulner_db.get_meta_value(VulnerabilityDB.SCHEMA_VERSION_KEY) == VulnerabilityDB.SCHEMA_VERSION
+        assert [row[0] for row in vulner_db.get_matched_vulnerabilities('Pillow', '1.5')] == ['VULN-1']
+
+    assert count_rows('packages') == rows
+
+
+@pytest.mark.parametrize('pkg_name', ['Zope.Interface', 'zope-interface', 'ZOPE_interface', 'zope--_.interface'])
+def test_lookup_uses_normalized_name(tmp_path, feed_dir, pkg_name):
+    write_advisory(feed_dir, make_advisory('VULN-4', 'zope.interface', [('gte', '1.0', '2.0', 'lt')]))
+    with VulnerabilityDB(db_path=tmp_path / 'vulner.db', package_folder=feed_dir) as vulner_db:
+        assert [row[:3] for row in vulner_db.get_matched_vulnerabilities(pkg_name, '1.5')] == [
+            ('VULN-4', 'test', 'zope.interface'),
+        ]
+        assert [row[0] for row in vulner_db.get_package_vulnerabilities(pkg_name)] == ['VULN-4']
+        assert vulner_db.get_matched_vulnerabilities('zope-interfaces', '1.5') == []
@@ -0,0 +1,92 @@
+"""
+Тесты потоковой записи отчетов
+"""
+
+import io
+
+import pytest
+
+from dpss.models import VulnerDataSchema
+from dpss.writers import HTMLReportWriter, MarkdownReportWriter
+
+INJECTION = '<script>alert(1)</script><img src=x onerror=alert(2)>'
+
+
+def make_vulner(source_url: str = 'https://example.com/VULN-1', references: list[dict] | None = None) -> VulnerDataSchema:
+    """
+    Функция построения уязвимости с данными, похожими на внедрение разметки
+
+    :param source_url: Ссылка на источник
+    :param references: Ссылки уязвимости
+    :return: Информация об уязвимости
+    """
+
+    return VulnerDataSchema.model_validate({
+        'identifier': 'VULN-1',
+        'published': '2024-01-01',
+        'source_name': 'test',
+        'source_url': source_url,
+        'description': f'Broken | table\n{INJECTION}',
+        'affected_packages': [{
+            'name': 'pillow',
+            'version': '1.5',
+            'vulnerable_interval': {
+                'left_border': 'gte',
+                'left_version': '1.0',
+                'right_version': '2.0',
+                'right_border': 'lt',
+            },
+        }],
+        'ratings': [{'score': 7.5, 'severity': 'high'}],
+        'references': references or [],
+    })
+
+
+def write_report(writer_class, vulner: VulnerDataSchema) -> str:
+    """
+    Функция записи отчета из одной уязвимости
+
+    :param writer_class: Класс записи отчета
+    :param vulner: Информация об уязвимости
+    :return: Текст отчета
+    """
+
+    output = io.StringIO()
+    writer = writer_class(output)
+    writer.write_header('01_01_2024_00_00_00')
+    writer.write_vulnerability(vulner)
+    writer.write_footer()
+    return output.getvalue()
+
+
+@pytest.mark.parametrize('writer_class', [HTMLReportWriter, MarkdownReportWriter])
+def test_description_html_is_escaped(writer_class):
+    report = write_report(writer_class, make_vulner())
+
+    assert '<script>' not in report
+    assert '<img' not in report
+    assert '&lt;script&gt;alert(1)&lt;/script&gt;' in report
+
+
+def test_markdown_row_stays_in_table():
+    report = write_report(MarkdownReportWriter, make_vulner('https://example.com/a)b]c|d'))
+    row = next(line for line in report.splitlines() if 'VULN-1' in line)
+
+    assert '[VULN-1](https://example.com/a\\)b\\]c\\|d)' in row
+    assert 'Broken \\| table' in row
+    assert row.count(' | ') == 5
+
+
+def test_unsafe_links_are_not_rendered():
+    vulner = make_vulner(
+        source_url='javascript:alert(1)',
+        references=[{'url': 'javascript:alert(2)'}, {'url': None}, {'url': 'https://example.com/ref'}],
+    )
+
+    html_report = write_report(HTMLReportWriter, vulner)
+    markdown_report = write_report(MarkdownReportWriter, vulner)
+
+    assert 'href="javascript' not in html_report
+    assert '<a href="https://example.com/ref">' in html_report
+    assert '](javascript' not in markdown_report
+    assert '| VULN-1 |' in markdown_report